@@ -0,0 +1,121 @@
+"""RPA -> OA request throughput with and without the pooled A2A client.
+
+Starts local uvicorn stand-ins of run_OA.py (the OrchestratorAgent behind to_a2a, with a
+stub model instead of the LLM) and sends requests the way the RPA does: a remote agent
+per request, either each with its own HTTP client and agent card fetch (as before) or on
+the shared pooled client with the cached card, against one or several endpoints.
+
+Run from the repository root:
+    python -m benchmarks.bench_a2a_client --requests 200 --concurrency 16 --servers 2
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+import httpx
+from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH, RemoteA2aAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from resource_provider.a2a_client import PooledRemoteA2aAgent, shared_client
+
+BASE_PORT = 18001
+
+
+def serve(port: int, latency_ms: float):
+    import uvicorn
+    from google.adk.a2a.utils.agent_to_a2a import to_a2a
+
+    from benchmarks.bench_sla_fastpath import StubLlm
+    from orchestrator.agent import OrchestratorAgent
+
+    agent = OrchestratorAgent(model=StubLlm(model="stub", latency_s=latency_ms / 1e3))
+    uvicorn.run(to_a2a(agent, host="127.0.0.1", port=port), host="127.0.0.1", port=port, log_level="warning")
+
+
+async def wait_ready(endpoints: list, timeout_s: float = 60.0):
+    deadline = time.monotonic() + timeout_s
+    async with httpx.AsyncClient() as client:
+        for endpoint in endpoints:
+            while True:
+                try:
+                    if (await client.get(endpoint + AGENT_CARD_WELL_KNOWN_PATH)).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"{endpoint} did not start")
+                await asyncio.sleep(0.2)
+
+
+async def send(agent, text: str) -> float:
+    runner = InMemoryRunner(agent=agent, app_name="bench")
+    session = await runner.session_service.create_session(app_name="bench", user_id="bench")
+    start = time.perf_counter()
+    async for _ in runner.run_async(user_id="bench", session_id=session.id,
+                                    new_message=types.Content(role="user", parts=[types.Part(text=text)])):
+        pass
+    return time.perf_counter() - start
+
+
+async def run(mode: str, endpoints: list, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    client = shared_client(endpoints) if mode != "unpooled" else None
+
+    async def one(i: int) -> float:
+        async with semaphore:
+            if client is None:
+                agent = RemoteA2aAgent(name="orchestrator_agent", agent_card=endpoints[0] + AGENT_CARD_WELL_KNOWN_PATH)
+                try:
+                    return await send(agent, f"Status report {i}")
+                finally:
+                    await agent.cleanup()
+            agent = PooledRemoteA2aAgent(name="orchestrator_agent", agent_card=endpoints[0] + AGENT_CARD_WELL_KNOWN_PATH,
+                                         client=client)
+            return await send(agent, f"Status report {i}")
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    per_endpoint = [e.requests for e in client.transport.endpoints] if client else None
+    if client:
+        await client.aclose()
+    return {"rps": requests / elapsed, "mean_ms": sum(latencies) / len(latencies) * 1e3, "per_endpoint": per_endpoint}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--servers", type=int, default=2)
+    parser.add_argument("--oa-latency-ms", type=float, default=0.0)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.oa_latency_ms)
+        return
+
+    endpoints = [f"http://127.0.0.1:{BASE_PORT + i}" for i in range(args.servers)]
+    servers = [subprocess.Popen([sys.executable, "-m", "benchmarks.bench_a2a_client", "--serve", str(BASE_PORT + i),
+                                 "--oa-latency-ms", str(args.oa_latency_ms)], stdout=subprocess.DEVNULL)
+               for i in range(args.servers)]
+    try:
+        asyncio.run(wait_ready(endpoints))
+        print(f"requests={args.requests} concurrency={args.concurrency}")
+        print(f"{'mode':<22}{'req/s':>8}{'mean ms':>10}  per endpoint")
+        modes = [("unpooled", endpoints[:1]), ("pooled", endpoints[:1])]
+        if args.servers > 1:
+            modes.append((f"pooled x{args.servers} endpoints", endpoints))
+        for label, mode_endpoints in modes:
+            row = asyncio.run(run(label, mode_endpoints, args.requests, args.concurrency))
+            print(f"{label:<22}{row['rps']:>8.1f}{row['mean_ms']:>10.1f}  {row['per_endpoint'] or ''}")
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
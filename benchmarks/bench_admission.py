@@ -0,0 +1,174 @@
+"""Throughput and tail latency of a burst of RPA requests with and without admission control.
+
+Starts a local stand-in of run_OA.py per mode: the OrchestratorAgent behind to_a2a, with
+a stub model that calls one tool and answers. The stub sleeps `--llm-latency-ms` per call
+and serves `--model-slots` calls at a time, like a model server with that many parallel
+slots. The pre-check and the response cache are off, so every request costs an agent run.
+A burst of `--burst` requests is then sent at once, as JSON-RPC SendStreamingMessage
+calls like the RPAs' A2A client sends:
+
+* SLA alerts about the frontend or the backend, each quoting its own latency
+* deployments of distinct services
+* the same status question
+
+Modes: "direct" (every request runs at once, as before), "queue" (at most
+`--max-concurrent` runs, SLA alerts first, more than `--max-queued` waiting are shed with
+503) and "coalesce" (the queue, with equivalent requests sharing a run). "runs" counts the
+agent runs the burst cost; "shed" requests were answered 503 with Retry-After.
+
+Run from the repository root:
+    python -m benchmarks.bench_admission --burst 64 --llm-latency-ms 200 --model-slots 2
+"""
+import argparse
+import asyncio
+import random
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+PORT = 18061
+MODES = ("direct", "queue", "coalesce")
+
+
+def serve(port: int, mode: str, args):
+    import uvicorn
+    from google.adk.a2a.utils.agent_to_a2a import to_a2a
+    from pydantic import PrivateAttr
+
+    from benchmarks.bench_sla_fastpath import StubLlm, build_cluster
+    from orchestrator import tools
+    from orchestrator.admission import AdmissionMiddleware
+    from orchestrator.agent import OrchestratorAgent
+    from orchestrator.state_store import InProcessStore
+    from shared.instrumentation import instrument_app
+
+    class SlottedStubLlm(StubLlm):
+        slots: int = 1
+        _slots: asyncio.Semaphore = PrivateAttr(default=None)
+
+        async def generate_content_async(self, llm_request, stream=False):
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self.slots)
+            async with self._slots:
+                async for response in super().generate_content_async(llm_request, stream):
+                    yield response
+
+    tools.store = InProcessStore(build_cluster())
+    model = SlottedStubLlm(model="stub", latency_s=args.llm_latency_ms / 1e3, slots=args.model_slots)
+    agent = OrchestratorAgent(model=model, precheck=False, cache=None)
+    app = instrument_app(to_a2a(agent, host="127.0.0.1", port=port))
+    if mode != "direct":
+        app.add_middleware(AdmissionMiddleware, max_concurrent=args.max_concurrent, max_queued=args.max_queued,
+                           coalesce=mode == "coalesce", services=lambda: tools.store.read().services,
+                           version=lambda: tools.store.version)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def workload(burst: int, seed: int) -> list:
+    """(priority class, text) of each request in the burst."""
+    rng = random.Random(seed)
+    requests = []
+    for i in range(burst):
+        draw = rng.random()
+        if draw < 0.6:
+            service = rng.choice(("frontend", "backend"))
+            requests.append(("sla", f"Service {service} violates its latency SLA: p95 {rng.randint(150, 900)}ms. "
+                                    "Is it within its SLA now?"))
+        elif draw < 0.85:
+            requests.append(("change", f"Deploy service svc-{i} with 2 replicas, 0.5 CPU and 1 GiB memory each."))
+        else:
+            requests.append(("other", "Give me a short status report of the cluster."))
+    return requests
+
+
+def rpc(text: str) -> dict:
+    message = {"messageId": str(uuid.uuid4()), "role": "ROLE_USER", "parts": [{"text": text}]}
+    return {"jsonrpc": "2.0", "id": str(uuid.uuid4()), "method": "SendStreamingMessage",
+            "params": {"message": message, "configuration": {}}}
+
+
+async def send_burst(endpoint: str, requests: list) -> list:
+    """(priority class, seconds, HTTP status) per request, all sent at once."""
+    async with httpx.AsyncClient(timeout=600, limits=httpx.Limits(max_connections=len(requests)),
+                                 headers={"A2A-Version": "1.0"}) as client:
+        async def one(priority: str, text: str):
+            start = time.perf_counter()
+            response = await client.post(endpoint, json=rpc(text))
+            return priority, time.perf_counter() - start, response.status_code
+
+        return await asyncio.gather(*(one(priority, text) for priority, text in requests))
+
+
+def llm_calls(endpoint: str) -> float:
+    page = httpx.get(f"{endpoint}/metrics").text
+    return sum(float(line.rsplit(" ", 1)[1]) for line in page.splitlines() if line.startswith("llm_calls_total"))
+
+
+def wait_ready(endpoint: str, timeout_s: float = 120.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{endpoint}/metrics").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"{endpoint} did not start")
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--burst", type=int, default=64)
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--model-slots", type=int, default=2)
+    parser.add_argument("--max-concurrent", type=int, default=2)
+    parser.add_argument("--max-queued", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.mode, args)
+        return
+
+    requests = workload(args.burst, args.seed)
+    endpoint = f"http://127.0.0.1:{PORT}"
+    print(f"burst={args.burst} ({sum(p == 'sla' for p, _ in requests)} SLA alerts) llm latency="
+          f"{args.llm_latency_ms:g}ms model slots={args.model_slots} max concurrent={args.max_concurrent} "
+          f"max queued={args.max_queued}")
+    print(f"{'mode':<10}{'runs':>6}{'answered':>10}{'shed':>6}{'req/s':>8}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}"
+          f"{'SLA p95 s':>11}")
+    for mode in args.modes.split(","):
+        server = subprocess.Popen([sys.executable, "-W", "ignore", "-m", "benchmarks.bench_admission",
+                                   "--serve", str(PORT), "--mode", mode, *sys.argv[1:]],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_ready(endpoint)
+            calls = llm_calls(endpoint)
+            start = time.perf_counter()
+            results = asyncio.run(send_burst(endpoint, requests))
+            elapsed = time.perf_counter() - start
+            # The stub model makes two calls per run
+            runs = (llm_calls(endpoint) - calls) / 2
+        finally:
+            server.terminate()
+            server.wait()
+        answered = [seconds for _, seconds, status in results if status == 200]
+        sla_answered = [seconds for priority, seconds, status in results if status == 200 and priority == "sla"]
+        shed = sum(status == 503 for *_, status in results)
+        print(f"{mode:<10}{runs:>6.0f}{len(answered):>10}{shed:>6}{len(answered) / elapsed:>8.1f}"
+              f"{percentile(answered, 0.5):>8.2f}{percentile(answered, 0.95):>8.2f}{percentile(answered, 0.99):>8.2f}"
+              f"{percentile(sla_answered, 0.95):>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
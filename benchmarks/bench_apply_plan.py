@@ -0,0 +1,91 @@
+"""Model turns, tokens and latency of a five-step remediation: separate tool calls vs one apply_plan.
+
+The OrchestratorAgent runs on the scripted mock model (benchmarks.mock_llm), which
+replays the same fix either as five scale/move/rebalance tool calls followed by a
+get_sla_violations check, or as a single apply_plan call whose response already holds
+the resulting metrics. Each model call sleeps `--llm-latency-ms`.
+
+Run from the repository root:
+    python -m benchmarks.bench_apply_plan --requests 10 --llm-latency-ms 200
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks import mock_llm
+from orchestrator import tools
+from orchestrator.k8s_sim import Cluster
+from orchestrator.state_store import InProcessStore
+
+REQUEST = "Fix the SLA violations of the backend."
+
+
+def build_cluster() -> Cluster:
+    cluster = Cluster(seed=0)
+    for i in range(6):
+        cluster.add_node(f"node-{i}", cpu_capacity=8.0, memory_capacity=32.0)
+    cluster.deploy_service("frontend", 8, cpu_request=1.0, memory_request=1.0, strategy="best-fit")
+    cluster.deploy_service("backend", 4, cpu_request=1.0, memory_request=1.0, strategy="best-fit")
+    return cluster
+
+
+def plan(cluster: Cluster) -> list:
+    frontend = sorted(cluster.services["frontend"].pods)
+    return [
+        {"action": "scale_service", "service_name": "backend", "replicas": 6},
+        {"action": "move_pod", "pod_id": frontend[0], "target_node": "node-5"},
+        {"action": "move_pod", "pod_id": frontend[1], "target_node": "node-5"},
+        {"action": "scale_service", "service_name": "frontend", "replicas": 9},
+        {"action": "rebalance_cluster", "cpu_threshold_pct": 80.0},
+    ]
+
+
+def scripts(actions: list) -> dict:
+    # The action names are the tool names
+    steps = [{"tool": a["action"], "args": {k: v for k, v in a.items() if k != "action"}} for a in actions]
+    return {
+        "steps": [{"match": "", "steps": steps + [{"tool": "get_sla_violations", "args": {}},
+                                                  {"text": "Applied the fix; SLAs are met."}]}],
+        "plan": [{"match": "", "steps": [{"tool": "apply_plan", "args": {"actions": actions}},
+                                         {"text": "Applied the fix; SLAs are met."}]}],
+    }
+
+
+async def run(script: str, requests: int) -> dict:
+    from google.adk.models.lite_llm import LiteLlm
+    from google.adk.runners import InMemoryRunner
+
+    from orchestrator.agent import OrchestratorAgent
+    from run_RPA_batch import run_request
+
+    agent = OrchestratorAgent(model=LiteLlm(model=f"mock/{script}"), precheck=False, cache=None)
+    runner = InMemoryRunner(agent=agent)
+    totals = {"llm_calls": 0, "total_tokens": 0, "seconds": 0.0}
+    for i in range(requests):
+        tools.store = InProcessStore(build_cluster())
+        start = time.perf_counter()
+        result = await run_request(runner, {"id": str(i), "prompt": REQUEST})
+        totals["seconds"] += time.perf_counter() - start
+        if result["status"] != "ok":
+            raise RuntimeError(result["error"])
+        totals["llm_calls"] += result["usage"]["llm_calls"]
+        totals["total_tokens"] += result["usage"]["total_tokens"]
+    return {key: value / requests for key, value in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    mock_llm.register(scripts(plan(build_cluster())), latency_ms=args.llm_latency_ms)
+    print(f"requests={args.requests} llm_latency_ms={args.llm_latency_ms} (per request averages)")
+    print(f"{'mode':<16}{'model turns':>12}{'tokens':>10}{'seconds':>10}")
+    for label, script in (("separate calls", "steps"), ("apply_plan", "plan")):
+        row = asyncio.run(run(script, args.requests))
+        print(f"{label:<16}{row['llm_calls']:>12.1f}{row['total_tokens']:>10.0f}{row['seconds']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Memory and throughput of the object-based Cluster against the NumPy ArrayCluster.
+
+Run from the repository root:
+    python -m benchmarks.bench_backends --nodes 2000 --pods 100000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from orchestrator.k8s_array import ArrayCluster
+from orchestrator.k8s_sim import Cluster
+
+
+def build(cls, nodes: int, pods: int, services: int = 10):
+    cluster = cls()
+    for i in range(nodes):
+        cluster.add_node(f"node-{i}", cpu_capacity=64.0, memory_capacity=256.0)
+    for s in range(services):
+        cluster.deploy_service(f"svc-{s}", pods // services, cpu_request=0.5, memory_request=1.0)
+    return cluster
+
+
+def run(cls, nodes: int, pods: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    # Memory is measured on a separate build because tracemalloc slows allocation down a lot
+    tracemalloc.start()
+    cluster = build(cls, nodes, pods)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del cluster
+
+    timings = {}
+    start = time.perf_counter()
+    cluster = build(cls, nodes, pods)
+    timings["deploy"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(10):
+        cluster.get_metrics()
+    timings["get_metrics"] = (time.perf_counter() - start) / 10
+
+    pod_ids = [pod_id for pod_id, _ in zip(cluster.services["svc-0"].pods, range(1000))]
+    names = list(cluster.nodes)
+    start = time.perf_counter()
+    moved = 0
+    for pod_id in pod_ids:
+        try:
+            cluster.move_pod(pod_id, rng.choice(names))
+            moved += 1
+        except ValueError:
+            pass
+    timings["move_pod"] = (time.perf_counter() - start) / len(pod_ids)
+
+    start = time.perf_counter()
+    for s in range(10):
+        cluster.scale_service(f"svc-{s}", pods // 10 // 2)
+    timings["scale_down"] = time.perf_counter() - start
+    return {"memory_mb": memory / 2**20, "moved": moved, **timings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--pods", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"nodes={args.nodes} pods={args.pods}")
+    print(f"{'backend':<14}{'memory MB':>10}{'deploy s':>10}{'metrics ms':>12}{'move us':>10}{'scale-down s':>14}")
+    for label, cls in (("Cluster", Cluster), ("ArrayCluster", ArrayCluster)):
+        row = run(cls, args.nodes, args.pods, args.seed)
+        print(f"{label:<14}{row['memory_mb']:>10.1f}{row['deploy']:>10.3f}{row['get_metrics'] * 1e3:>12.2f}"
+              f"{row['move_pod'] * 1e6:>10.1f}{row['scale_down']:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
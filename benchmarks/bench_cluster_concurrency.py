@@ -0,0 +1,212 @@
+"""Stress test of concurrent Cluster mutations: many threads, capacity invariants checked throughout.
+
+Worker threads issue a random mix of scale_service, move_pod, deploy_service, rebalance and
+get_metrics calls on one cluster, the way parallel tool calls do. A checker thread keeps
+taking a consistent view (Cluster.verify_consistency holds every node lock) and fails the
+run if any node is oversubscribed or a pod is lost, duplicated or double-counted. The same
+workload then runs with one global lock around every call for comparison. With short calls
+only, the global lock is as fast or somewhat faster: under the GIL the calls cannot run in
+parallel anyway, and taking the fine-grained locks costs more.
+
+The second table is where the fine-grained locks pay off: one thread keeps scaling a
+service between 0 and `--long-pods` replicas (seconds per call on a large cluster) while
+`--movers` threads move single pods, as an agent's move_pod calls do next to a scale-up
+of another service. Under one global lock every move waits for the whole scale call;
+with per-node locks it only waits for the nodes it touches.
+
+Run from the repository root:
+    python -m benchmarks.bench_cluster_concurrency --threads 16 --ops 2000 --long-pods 4000
+"""
+import statistics
+import argparse
+import random
+import threading
+import time
+
+from orchestrator.k8s_sim import Cluster
+
+# (cpu, memory) requests of the services being hammered; memory-heavy ones make move_pod's
+# memory check matter
+SERVICES = {"web": (0.5, 1.0), "api": (1.0, 2.0), "cache": (0.25, 6.0), "batch": (2.0, 1.0)}
+
+
+def build(nodes: int) -> Cluster:
+    cluster = Cluster(seed=0)
+    for i in range(nodes):
+        cluster.add_node(f"node-{i}", cpu_capacity=8.0, memory_capacity=16.0)
+    for name, (cpu, memory) in SERVICES.items():
+        cluster.deploy_service(name, nodes, cpu, memory, strategy="spread")
+    return cluster
+
+
+def check(cluster: Cluster):
+    cluster.verify_consistency()
+    # Same locks as verify_consistency, so no bind or move is half done while counting
+    with cluster._locked(list(cluster.nodes.values())), cluster._index_lock:
+        placed = sum(len(node.pods) for node in cluster.nodes.values())
+        running = sum(service.running_count for service in cluster.services.values())
+    if placed != running:
+        raise AssertionError(f"{placed} pods on nodes but {running} running pods in services")
+
+
+def worker(cluster: Cluster, ops: int, seed: int, guard, errors: list):
+    rng = random.Random(seed)
+    nodes = list(cluster.nodes)
+    for _ in range(ops):
+        op = rng.random()
+        service = rng.choice(list(SERVICES))
+        try:
+            with guard:
+                if op < 0.3:
+                    cluster.scale_service(service, max(0, len(cluster.services[service].pods) + rng.randint(-8, 8)))
+                elif op < 0.7:
+                    with cluster._index_lock:
+                        pod_id = rng.choice(list(cluster._pod_index))
+                    cluster.move_pod(pod_id, rng.choice(nodes))
+                elif op < 0.72:
+                    cluster.deploy_service(service, rng.randint(10, 60), *SERVICES[service])
+                elif op < 0.75:
+                    cluster.rebalance(70.0)
+                else:
+                    cluster.get_metrics()
+        except ValueError:
+            # Expected refusals: full targets, Pending pods, pods deleted by another thread
+            pass
+        except Exception as e:
+            errors.append(repr(e))
+            return
+
+
+def run(threads: int, ops: int, nodes: int, global_lock: bool) -> dict:
+    cluster = build(nodes)
+    guard = threading.Lock() if global_lock else _NoLock()
+    errors: list = []
+    done = threading.Event()
+    checks = [0]
+
+    def checker():
+        while not done.is_set():
+            try:
+                check(cluster)
+            except AssertionError as e:
+                errors.append(str(e))
+                return
+            checks[0] += 1
+            time.sleep(0.01)
+
+    monitor = threading.Thread(target=checker)
+    workers = [threading.Thread(target=worker, args=(cluster, ops, seed, guard, errors)) for seed in range(threads)]
+    start = time.perf_counter()
+    monitor.start()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    monitor.join()
+    try:
+        check(cluster)
+    except AssertionError as e:
+        errors.append(str(e))
+    return {"ops_per_s": threads * ops / elapsed, "checks": checks[0], "errors": errors,
+            "pods": len(cluster._pod_index)}
+
+
+def run_long_call(nodes: int, long_pods: int, movers: int, duration_s: float, global_lock: bool) -> dict:
+    cluster = Cluster(seed=0)
+    for i in range(nodes):
+        cluster.add_node(f"node-{i}", cpu_capacity=64.0, memory_capacity=256.0)
+    cluster.deploy_service("web", nodes, 0.5, 1.0, strategy="spread")
+    web = list(cluster.services["web"].pods)
+    guard = threading.Lock() if global_lock else _NoLock()
+    done = threading.Event()
+    latencies: list = []
+    errors: list = []
+    scales = [0]
+
+    def scaler():
+        replicas = long_pods
+        while not done.is_set():
+            with guard:
+                if "batch" in cluster.services:
+                    cluster.scale_service("batch", replicas)
+                else:
+                    cluster.deploy_service("batch", replicas, 0.1, 0.1)
+            replicas = long_pods - replicas
+            scales[0] += 1
+
+    def mover(seed: int):
+        rng = random.Random(seed)
+        names = list(cluster.nodes)
+        while not done.is_set():
+            start = time.perf_counter()
+            try:
+                with guard:
+                    cluster.move_pod(rng.choice(web), rng.choice(names))
+            except ValueError:
+                pass
+            except Exception as e:
+                errors.append(repr(e))
+                return
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=scaler)] + [threading.Thread(target=mover, args=(i,)) for i in range(movers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration_s)
+    done.set()
+    for thread in threads:
+        thread.join()
+    try:
+        check(cluster)
+    except AssertionError as e:
+        errors.append(str(e))
+    latencies.sort()
+    return {"moves_per_s": len(latencies) / duration_s, "p50_ms": statistics.median(latencies) * 1e3,
+            "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1e3, "scales": scales[0], "errors": errors}
+
+
+class _NoLock:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--nodes", type=int, default=100)
+    parser.add_argument("--long-nodes", type=int, default=500)
+    parser.add_argument("--long-pods", type=int, default=4000)
+    parser.add_argument("--movers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=4.0)
+    args = parser.parse_args()
+
+    print(f"threads={args.threads} ops/thread={args.ops} nodes={args.nodes}")
+    print(f"{'locking':<14}{'ops/s':>9}{'checks':>8}{'pods':>7}  invariants")
+    failed = False
+    for label, global_lock in (("fine-grained", False), ("global lock", True)):
+        row = run(args.threads, args.ops, args.nodes, global_lock)
+        failed |= bool(row["errors"])
+        print(f"{label:<14}{row['ops_per_s']:>9.0f}{row['checks']:>8}{row['pods']:>7}  "
+              f"{'; '.join(row['errors'][:3]) or 'ok'}")
+
+    print(f"\nmove_pod next to scaling a service to {args.long_pods} replicas: nodes={args.long_nodes} "
+          f"movers={args.movers} ({args.duration:g}s)")
+    print(f"{'locking':<14}{'moves/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'scales':>8}  invariants")
+    for label, global_lock in (("fine-grained", False), ("global lock", True)):
+        row = run_long_call(args.long_nodes, args.long_pods, args.movers, args.duration, global_lock)
+        failed |= bool(row["errors"])
+        print(f"{label:<14}{row['moves_per_s']:>9.0f}{row['p50_ms']:>9.2f}{row['p99_ms']:>9.1f}{row['scales']:>8}  "
+              f"{'; '.join(row['errors'][:3]) or 'ok'}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Replays an hour of traffic through the discrete-event simulator.
+
+A traffic spike and a node failure are injected; a rule-based controller applies the
+SLA pre-check's remediations every `--control-interval` seconds, and the time it takes
+to restore the SLAs is reported together with the simulator's event throughput.
+
+Run from the repository root:
+    python -m benchmarks.bench_des --hours 1 --frontend-rps 300 --backend-rps 200
+"""
+import argparse
+import time
+
+from orchestrator import sla
+from orchestrator.des import Simulation
+from orchestrator.k8s_sim import Cluster
+
+
+def build_cluster(nodes: int) -> Cluster:
+    cluster = Cluster(seed=0)
+    for i in range(nodes):
+        cluster.add_node(f"node-{i}", cpu_capacity=8.0, memory_capacity=32.0)
+    cluster.deploy_service("frontend", 10, cpu_request=0.5, memory_request=1.0, strategy="spread")
+    cluster.deploy_service("backend", 10, cpu_request=0.5, memory_request=1.0, strategy="spread")
+    cluster.deploy_service("database", 4, cpu_request=2.0, memory_request=8.0, strategy="spread")
+    return cluster
+
+
+def controller(sim: Simulation):
+    """Applies the candidate remediations of the rule-based SLA check."""
+    report = sla.evaluate(sim.cluster.get_metrics(), sim.slas)
+    for remediation in report["remediations"]:
+        if remediation["tool"] == "scale_service":
+            sim.cluster.scale_service(**remediation["args"])
+        elif remediation["tool"] == "rebalance_cluster":
+            sim.cluster.rebalance(**remediation["args"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--nodes", type=int, default=20)
+    parser.add_argument("--frontend-rps", type=float, default=300.0)
+    parser.add_argument("--backend-rps", type=float, default=200.0)
+    parser.add_argument("--control-interval", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    duration = args.hours * 3600
+    sim = Simulation(build_cluster(args.nodes), seed=args.seed)
+    sim.set_traffic("frontend", args.frontend_rps)
+    sim.set_traffic("backend", args.backend_rps)
+    # Frontend traffic doubles for ten minutes, later a node fails and comes back after five
+    sim.set_traffic("frontend", args.frontend_rps * 2, at=duration * 0.25)
+    sim.set_traffic("frontend", args.frontend_rps, at=duration * 0.25 + 600)
+    sim.fail_node("node-0", at=duration * 0.6, recover_after=300)
+    sim.every(args.control_interval, controller)
+
+    start = time.perf_counter()
+    events = sim.run(duration)
+    elapsed = time.perf_counter() - start
+
+    print(f"simulated {duration:.0f}s in {elapsed:.2f}s ({duration / elapsed:.0f}x real time)")
+    print(f"events: {events} ({events / elapsed * 60 / 1e6:.2f}M per minute)")
+    print(f"final replicas: " + ", ".join(f"{name}={len(svc.pods)}" for name, svc in sim.cluster.services.items()))
+    for incident in sim.incidents:
+        end = f"{incident['end']:.0f}s" if incident["end"] is not None else "unresolved"
+        print(f"incident at {incident['start']:.0f}s ({', '.join(incident['services']) or 'nodes'}): "
+              f"restored at {end}")
+    restore = sim.restore_times()
+    if restore:
+        print(f"time to restore SLAs: mean {sum(restore) / len(restore):.0f}s, max {max(restore):.0f}s")
+
+
+if __name__ == "__main__":
+    main()
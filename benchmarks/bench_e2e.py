@@ -0,0 +1,117 @@
+"""End-to-end throughput and latency of RPA -> A2A -> OA requests, reported as JSON.
+
+Both agents run their real ADK/LiteLLM code paths on the scripted mock model
+(benchmarks.mock_llm), so the numbers are the broker's own overhead plus the configured
+model latency. The OA is served by `--servers` uvicorn processes of the same app as
+run_OA.py, on a seeded cluster. The RPA runs in this process and sends requests the way
+run_RPA_batch.py does, at most `--concurrency` in flight. Model response caches are off
+unless `--llm-cache` is given, so every request pays for its model calls.
+
+Run from the repository root:
+    python -m benchmarks.bench_e2e --requests 200 --concurrency 16 --llm-latency-ms 50 --output e2e.json
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks import mock_llm
+from benchmarks.harness import emit, latency_stats, report, result
+
+BASE_PORT = 18101
+REQUEST = "Deploy a web service with 2 CPUs and 2GB of memory. Target latency is < 50ms."
+
+
+def serve(port: int, nodes: int):
+    import uvicorn
+    from google.adk.a2a.utils.agent_to_a2a import to_a2a
+    from google.adk.models.lite_llm import LiteLlm
+
+    from orchestrator import tools
+    from orchestrator.agent import OrchestratorAgent
+    from shared.instrumentation import instrument_app
+
+    tools.store.mutate(lambda cluster: [cluster.add_node(f"node-{i}", cpu_capacity=64.0, memory_capacity=256.0)
+                                        for i in range(nodes)])
+    agent = OrchestratorAgent(model=LiteLlm(model="mock/oa"))
+    uvicorn.run(instrument_app(to_a2a(agent, host="127.0.0.1", port=port)), host="127.0.0.1", port=port, log_level="warning")
+
+
+async def run(runner, requests: int, concurrency: int) -> dict:
+    from run_RPA_batch import run_request
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> dict:
+        async with semaphore:
+            return await run_request(runner, {"id": str(i), "prompt": REQUEST})
+
+    # Warm-up: connections, agent cards and imports are not what is being measured
+    await asyncio.gather(*(one(-i) for i in range(1, min(concurrency, requests) + 1)))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    ok = [r for r in results if r["status"] == "ok"]
+    return {
+        "rps": round(requests / elapsed, 2),
+        "errors": requests - len(ok),
+        **latency_stats([r["latency_s"] for r in ok] or [0.0], unit="ms"),
+        "rpa_llm_calls_per_request": round(sum(r["usage"]["llm_calls"] for r in results) / requests, 2),
+        "rpa_tokens_per_request": round(sum(r["usage"]["total_tokens"] for r in results) / requests, 1),
+    }
+
+
+async def run_all(endpoints: list, requests: int, levels: list, llm_cache: str) -> list:
+    from google.adk.runners import InMemoryRunner
+
+    from resource_provider.agent import ResourceProviderAgent
+
+    # One event loop for every level: the RPA's pooled HTTP client belongs to the loop it was created on
+    rpa = ResourceProviderAgent({"oa_endpoints": endpoints, "model": "mock/rpa", "llm_cache": llm_cache})
+    runner = InMemoryRunner(agent=rpa)
+    return [await run(runner, requests, concurrency) for concurrency in levels]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--servers", type=int, default=1)
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-cache", default="off", help="Model cache of both agents, e.g. 'memory' (default: off)")
+    parser.add_argument("--output", "-o", help="JSON file for the report (default: stdout)")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    mock_llm.register(latency_ms=args.llm_latency_ms)
+    if args.serve:
+        serve(args.serve, args.nodes)
+        return
+
+    from benchmarks.bench_a2a_client import wait_ready
+
+    endpoints = [f"http://127.0.0.1:{BASE_PORT + i}" for i in range(args.servers)]
+    env = {**os.environ, "OA_LLM_CACHE": args.llm_cache, "OA_STATE_STORE": "memory"}
+    servers = [subprocess.Popen([sys.executable, "-m", "benchmarks.bench_e2e", "--serve", str(BASE_PORT + i),
+                                 "--nodes", str(args.nodes), "--llm-latency-ms", str(args.llm_latency_ms)],
+                                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+               for i in range(args.servers)]
+    results = []
+    try:
+        asyncio.run(wait_ready(endpoints))
+        rows = asyncio.run(run_all(endpoints, args.requests, args.concurrency, args.llm_cache))
+        for concurrency, row in zip(args.concurrency, rows):
+            params = {"requests": args.requests, "concurrency": concurrency, "servers": args.servers,
+                      "nodes": args.nodes, "llm_latency_ms": args.llm_latency_ms, "llm_cache": args.llm_cache}
+            results.append(result("rpa_a2a_oa", params, row))
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+    emit(report("e2e", results), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Micro-benchmarks of k8s_sim operations at several cluster sizes, reported as JSON.
+
+For each size the cluster gets `--pods-per-node` pods per node across a few services, then:
+
+* schedule: placing a whole service in one deploy_service call (per-pod cost)
+* move: move_pod of a random running pod to a random node with room
+* scale: scale_service one replica up, then back down
+* get_metrics: metrics of an unchanged cluster (the cached path)
+* get_metrics_dirty: metrics right after a pod moved
+
+Run from the repository root:
+    python -m benchmarks.bench_k8s_micro --sizes 100 1000 5000 --output micro.json
+"""
+import argparse
+import random
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.harness import emit, latency_stats, report, result
+from orchestrator.k8s_sim import Cluster
+
+# (name, cpu, memory) of the services filling the cluster
+SERVICES = [("frontend", 0.5, 1.0), ("backend", 1.0, 2.0), ("database", 2.0, 4.0)]
+
+
+def build(nodes: int, pods_per_node: int) -> Cluster:
+    cluster = Cluster(seed=0)
+    for i in range(nodes):
+        cluster.add_node(f"node-{i}", cpu_capacity=32.0, memory_capacity=64.0)
+    for name, cpu, memory in SERVICES:
+        cluster.deploy_service(name, nodes * pods_per_node // len(SERVICES), cpu, memory)
+    return cluster
+
+
+def measure(fn: Callable[[], None], iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_size(nodes: int, pods_per_node: int, iterations: int, seed: int) -> List[Dict]:
+    rng = random.Random(seed)
+    params = {"nodes": nodes, "pods": nodes * pods_per_node // len(SERVICES) * len(SERVICES)}
+    results = []
+
+    start = time.perf_counter()
+    cluster = build(nodes, pods_per_node)
+    elapsed = time.perf_counter() - start
+    results.append(result("schedule", params, {"seconds": round(elapsed, 4),
+                                               "pods_per_s": round(params["pods"] / elapsed, 1),
+                                               "per_pod_us": round(elapsed / params["pods"] * 1e6, 3)}))
+
+    # Frontend pods come and go with the scale benchmark, so only the others are moved
+    pod_ids = [pod_id for pod_id, (pod, node) in cluster._pod_index.items()
+               if node is not None and pod.service_name != "frontend"]
+    node_names = list(cluster.nodes)
+
+    def move():
+        pod, _ = cluster.get_pod(rng.choice(pod_ids))
+        for _ in range(10):
+            target = cluster.nodes[rng.choice(node_names)]
+            if (target.cpu_usage + pod.cpu_request <= target.cpu_capacity
+                    and target.memory_usage + pod.memory_request <= target.memory_capacity):
+                cluster.move_pod(pod.id, target.name)
+                return
+
+    def scale():
+        count = len(cluster.services["frontend"].pods)
+        cluster.scale_service("frontend", count + 1)
+        cluster.scale_service("frontend", count)
+
+    def metrics_dirty():
+        move()
+        cluster.get_metrics()
+
+    cluster.get_metrics()
+    for name, fn in (("move", move), ("scale", scale), ("get_metrics", cluster.get_metrics),
+                     ("get_metrics_dirty", metrics_dirty)):
+        samples = measure(fn, iterations)
+        results.append(result(name, {**params, "iterations": iterations},
+                              {"ops_per_s": round(len(samples) / sum(samples), 1), **latency_stats(samples)}))
+    cluster.verify_consistency()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--pods-per-node", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="JSON file for the report (default: stdout)")
+    args = parser.parse_args()
+
+    results = []
+    for nodes in args.sizes:
+        results.extend(run_size(nodes, args.pods_per_node, args.iterations, args.seed))
+    emit(report("k8s_micro", results), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Model calls and latency saved by the response caches on repeated SLA checks.
+
+The same SLA request is sent again and again, each time in a new session (as A2A requests
+arrive), against a cluster with an incident so the model path is taken. Every
+`--mutate-every` requests the cluster is scaled, which changes its state key and must
+cause cache misses. A stub model stands in for the LLM, sleeping `--llm-latency-ms` per
+call. Runs without a model cache, with the in-memory LRU and with the SQLite backend. The
+read-only tool cache stays on throughout and its hit rate is reported too; it stays at 0
+here, since the stub's get_sla_violations reads live metrics and is not cached.
+
+Run from the repository root:
+    python -m benchmarks.bench_llm_cache --requests 100 --mutate-every 10 --llm-latency-ms 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from benchmarks.bench_sla_fastpath import REQUEST, StubLlm, build_cluster
+from orchestrator import tools
+from orchestrator.agent import OrchestratorAgent
+from orchestrator.state_store import InProcessStore
+from shared.cache import LRUCache, SQLiteCache
+
+
+async def replay(cache, requests: int, mutate_every: int, latency_s: float) -> dict:
+    cluster = build_cluster()
+    # A batch job saturating the nodes keeps the SLAs violated, so every request reaches the model
+    cluster.deploy_service("batch", 60, cpu_request=1.0, memory_request=1.0)
+    tools.store = InProcessStore(cluster)
+    tools.tool_cache.clear()
+    tools.tool_cache.hits = tools.tool_cache.misses = 0
+    model = StubLlm(model="stub", latency_s=latency_s)
+    runner = InMemoryRunner(agent=OrchestratorAgent(model=model, cache=cache), app_name="bench")
+    message = types.Content(role="user", parts=[types.Part(text=REQUEST)])
+
+    start = time.perf_counter()
+    for i in range(requests):
+        if i and mutate_every and i % mutate_every == 0:
+            cluster.scale_service("frontend", len(cluster.services["frontend"].pods) + 1)
+        session = await runner.session_service.create_session(app_name="bench", user_id="bench")
+        async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            pass
+    elapsed = time.perf_counter() - start
+    return {"llm_calls": model.calls, "total_s": elapsed, "mean_ms": elapsed / requests * 1e3,
+            "llm_cache": cache.cache_info() if cache else None, "tool_cache": tools.tool_cache.cache_info()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--mutate-every", type=int, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        modes = [("no cache", None), ("memory LRU", LRUCache()),
+                 ("sqlite", SQLiteCache(os.path.join(tmp, "llm_cache.db")))]
+        print(f"requests={args.requests} mutate_every={args.mutate_every} llm_latency_ms={args.llm_latency_ms}")
+        print(f"{'model cache':<12}{'llm calls':>10}{'total s':>9}{'mean ms':>9}{'llm hit%':>10}{'tool hit%':>11}")
+        for label, cache in modes:
+            row = asyncio.run(replay(cache, args.requests, args.mutate_every, args.llm_latency_ms / 1e3))
+            llm_hits = f"{row['llm_cache']['hit_rate'] * 100:.0f}" if row["llm_cache"] else "-"
+            print(f"{label:<12}{row['llm_calls']:>10}{row['total_s']:>9.2f}{row['mean_ms']:>9.1f}"
+                  f"{llm_hits:>10}{row['tool_cache']['hit_rate'] * 100:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""get_metrics cost at 1k and 10k nodes: full rebuild vs cached/vectorised.
+
+Run from the repository root:
+    python -m benchmarks.bench_metrics --sizes 1000 10000 --pods-per-node 10
+"""
+import argparse
+import random
+import time
+
+from orchestrator.k8s_array import ArrayCluster
+from orchestrator.k8s_sim import Cluster
+
+
+def full_rebuild(cluster: Cluster) -> dict:
+    """The pre-cache get_metrics: every node and every pod is walked on each call."""
+    metrics = {"timestamp": time.time(), "nodes": {}, "services": {}}
+    total_cpu_usage = total_cpu_cap = 0
+    for node_name, node in cluster.nodes.items():
+        cpu_util = node.cpu_usage / node.cpu_capacity if node.cpu_capacity > 0 else 0
+        metrics["nodes"][node_name] = {
+            "cpu_usage": node.cpu_usage,
+            "cpu_capacity": node.cpu_capacity,
+            "cpu_utilization_pct": cpu_util * 100,
+            "memory_usage": node.memory_usage,
+            "pod_count": len(node.pods),
+            "latency_ms": 20 + cpu_util * 100 + random.uniform(-5, 5),
+        }
+        total_cpu_usage += node.cpu_usage
+        total_cpu_cap += node.cpu_capacity
+    for svc_name, svc in cluster.services.items():
+        latencies = [metrics["nodes"][pod.node_id]["latency_ms"] for pod in svc.pods.values() if pod.node_id]
+        avg_latency = sum(latencies) / len(latencies) if latencies else 0
+        metrics["services"][svc_name] = {
+            "pod_count": len(svc.pods),
+            "running_pods": len(latencies),
+            "avg_latency_ms": avg_latency,
+            "request_completion_rate": max(0, 100 - avg_latency / 5),
+        }
+    metrics["cluster"] = {
+        "total_nodes": len(cluster.nodes),
+        "total_pods": sum(len(n.pods) for n in cluster.nodes.values()),
+        "overall_cpu_utilization_pct": total_cpu_usage / total_cpu_cap * 100 if total_cpu_cap else 0,
+    }
+    return metrics
+
+
+def build(cls, nodes: int, pods_per_node: int):
+    cluster = cls(seed=0)
+    for i in range(nodes):
+        cluster.add_node(f"node-{i}", cpu_capacity=16.0, memory_capacity=64.0)
+    for s in range(10):
+        cluster.deploy_service(f"svc-{s}", nodes * pods_per_node // 10, cpu_request=1.0, memory_request=2.0)
+    return cluster
+
+
+def timed(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--pods-per-node", type=int, default=10)
+    parser.add_argument("--calls", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>7}{'full ms':>10}{'cached ms':>11}{'1 move ms':>11}{'array ms':>10}")
+    for size in args.sizes:
+        cluster = build(Cluster, size, args.pods_per_node)
+        array = build(ArrayCluster, size, args.pods_per_node)
+        pod_ids = list(cluster.services["svc-0"].pods)
+        names = list(cluster.nodes)
+        rng = random.Random(0)
+
+        def move_then_read():
+            try:
+                cluster.move_pod(rng.choice(pod_ids), rng.choice(names))
+            except ValueError:
+                pass
+            cluster.get_metrics()
+
+        full = timed(lambda: full_rebuild(cluster), args.calls)
+        cached = timed(cluster.get_metrics, args.calls)
+        after_move = timed(move_then_read, args.calls)
+        vectorised = timed(array.get_metrics, args.calls)
+        print(f"{size:>7}{full:>10.2f}{cached:>11.2f}{after_move:>11.2f}{vectorised:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
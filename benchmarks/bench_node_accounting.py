@@ -0,0 +1,71 @@
+"""Compares incremental node usage counters against per-read summation.
+
+Run from the repository root:
+    python -m benchmarks.bench_node_accounting --nodes 500 --pods 10000
+"""
+import argparse
+import time
+
+from orchestrator.k8s_sim import Cluster, Node
+
+
+class SummingNode(Node):
+    """Pre-counter behaviour: usage is recomputed from every pod on each read."""
+
+    @property
+    def cpu_usage(self) -> float:
+        return sum(p.cpu_request for p in self.pods.values())
+
+    @property
+    def memory_usage(self) -> float:
+        return sum(p.memory_request for p in self.pods.values())
+
+    def add_pod(self, pod) -> bool:
+        if self.cpu_usage + pod.cpu_request > self.cpu_capacity:
+            return False
+        if self.memory_usage + pod.memory_request > self.memory_capacity:
+            return False
+        return super().add_pod(pod)
+
+
+def build(nodes: int, summing: bool, consistency_checks: bool = False) -> Cluster:
+    cluster = Cluster(consistency_checks=consistency_checks)
+    for i in range(nodes):
+        cluster.add_node(f"node-{i}", cpu_capacity=16.0, memory_capacity=64.0)
+        if summing:
+            cluster.nodes[f"node-{i}"].__class__ = SummingNode
+    return cluster
+
+
+def run(nodes: int, pods: int, summing: bool) -> float:
+    cluster = build(nodes, summing)
+    start = time.perf_counter()
+    cluster.deploy_service("web", replicas=pods, cpu_request=0.5, memory_request=1.0)
+    for _ in range(20):
+        cluster.get_metrics()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--pods", type=int, default=10000)
+    args = parser.parse_args()
+
+    # Sanity pass: counters must agree with a full recount after scale up/down and moves
+    cluster = build(20, summing=False, consistency_checks=True)
+    cluster.deploy_service("web", replicas=200, cpu_request=0.3, memory_request=0.7)
+    cluster.scale_service("web", 37)
+    pod = next(p for p in cluster.services["web"].pods.values() if p.node_id != "node-0")
+    cluster.move_pod(pod.id, "node-0")
+
+    summed = run(args.nodes, args.pods, summing=True)
+    counted = run(args.nodes, args.pods, summing=False)
+    print(f"nodes={args.nodes} pods={args.pods}")
+    print(f"  summation: {summed:8.3f}s")
+    print(f"  counters:  {counted:8.3f}s")
+    print(f"  speedup:   {summed / counted:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Backlog triage: one evaluate_service_cost call per spec vs one batched, cached call.
+
+Run from the repository root:
+    python -m benchmarks.bench_pricing --specs 10000 --distinct 200
+"""
+import argparse
+import random
+import time
+
+from resource_provider.pricing import PricingModel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--specs", type=int, default=10000)
+    parser.add_argument("--distinct", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    shapes = [{"cpu_request": rng.choice([0.25, 0.5, 1, 2, 4, 8]) * rng.randint(1, 4),
+               "memory_request": rng.choice([0.5, 1, 2, 4, 8, 16]) * rng.randint(1, 4)} for _ in range(args.distinct)]
+    backlog = [rng.choice(shapes) for _ in range(args.specs)]
+
+    model = PricingModel(cache_size=0)
+    start = time.perf_counter()
+    single = [model.evaluate(spec["cpu_request"], spec["memory_request"], hour=12) for spec in backlog]
+    per_spec = time.perf_counter() - start
+
+    model = PricingModel()
+    start = time.perf_counter()
+    batch = model.evaluate_batch(backlog, hour=12)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    model.evaluate_batch(backlog, hour=12)
+    warm = time.perf_counter() - start
+    assert single == batch
+
+    print(f"specs={args.specs} distinct={args.distinct}")
+    print(f"{'mode':<22}{'tool calls':>11}{'ms':>10}")
+    print(f"{'one call per spec':<22}{args.specs:>11}{per_spec * 1e3:>10.1f}")
+    print(f"{'batch (cold cache)':<22}{1:>11}{cold * 1e3:>10.1f}")
+    print(f"{'batch (warm cache)':<22}{1:>11}{warm * 1e3:>10.1f}")
+    print(f"cache: {model.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
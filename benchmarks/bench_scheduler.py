@@ -0,0 +1,85 @@
+"""Placement throughput and fragmentation of the scheduling strategies.
+
+Run from the repository root:
+    python -m benchmarks.bench_scheduler --nodes 2000 --pods 16000
+"""
+import argparse
+import random
+import time
+
+from orchestrator.k8s_sim import Cluster
+from orchestrator.scheduler import STRATEGIES
+
+# (cpu, memory) shapes of the services placed in round-robin
+SHAPES = [(0.5, 1.0), (1.0, 4.0), (2.0, 2.0), (0.25, 0.5), (4.0, 8.0)]
+
+
+class LinearScanCluster(Cluster):
+    """The original scheduler: one scan per pod for the first node the pod fits on."""
+
+    def _place_pods(self, pods, strategy=None) -> dict:
+        placed = {}
+        for pod in pods:
+            for node in self.nodes.values():
+                if self._bind(pod, node):
+                    placed[node.name] = placed.get(node.name, 0) + 1
+                    break
+        return placed
+
+
+def build(cls, nodes: int, seed: int) -> Cluster:
+    rng = random.Random(seed)
+    cluster = cls()
+    for i in range(nodes):
+        cpu = rng.choice([4.0, 8.0, 16.0, 32.0])
+        cluster.add_node(f"node-{i}", cpu_capacity=cpu, memory_capacity=cpu * rng.choice([2, 4, 8]))
+    return cluster
+
+
+def fragmentation(cluster: Cluster) -> dict:
+    """Share of free CPU stranded on nodes that cannot host the median pod shape."""
+    cpu, memory = sorted(SHAPES)[len(SHAPES) // 2]
+    free = stranded = 0.0
+    used = 0
+    for node in cluster.nodes.values():
+        node_free = node.cpu_capacity - node.cpu_usage
+        free += node_free
+        used += bool(node.pods)
+        if node.cpu_usage + cpu > node.cpu_capacity or node.memory_usage + memory > node.memory_capacity:
+            stranded += node_free
+    return {"nodes_used": used, "stranded_cpu_pct": stranded / free * 100 if free else 0.0}
+
+
+def run(label: str, cluster: Cluster, pods: int, strategy=None) -> dict:
+    for i, (cpu, memory) in enumerate(SHAPES):
+        cluster.deploy_service(f"svc-{i}", 0, cpu, memory)
+    per_service = pods // len(SHAPES)
+    start = time.perf_counter()
+    for i in range(len(SHAPES)):
+        cluster.scale_service(f"svc-{i}", per_service, strategy=strategy)
+    elapsed = time.perf_counter() - start
+    placed = sum(1 for svc in cluster.services.values() for pod in svc.pods.values() if pod.node_id)
+    return {"strategy": label, "seconds": elapsed, "pods_per_sec": per_service * len(SHAPES) / elapsed,
+            "placed": placed, **fragmentation(cluster)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--pods", type=int, default=16000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = [run("linear-scan", build(LinearScanCluster, args.nodes, args.seed), args.pods)]
+    for strategy in STRATEGIES:
+        rows.append(run(strategy, build(Cluster, args.nodes, args.seed), args.pods, strategy=strategy))
+
+    print(f"nodes={args.nodes} pods={args.pods}")
+    print(f"{'strategy':<18}{'seconds':>9}{'pods/s':>11}{'placed':>8}{'nodes':>7}{'stranded%':>11}")
+    for row in rows:
+        print(f"{row['strategy']:<18}{row['seconds']:>9.3f}{row['pods_per_sec']:>11.0f}"
+              f"{row['placed']:>8}{row['nodes_used']:>7}{row['stranded_cpu_pct']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
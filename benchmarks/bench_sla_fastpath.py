@@ -0,0 +1,101 @@
+"""LLM calls and latency saved by the rule-based SLA pre-check on a replayed request stream.
+
+A stub model stands in for the LLM: it asks for `get_sla_violations()` and then answers,
+sleeping `--llm-latency-ms` per call. The same request stream (a mix of healthy periods and
+injected CPU incidents) is replayed with and without the pre-check.
+
+Run from the repository root:
+    python -m benchmarks.bench_sla_fastpath --requests 50 --incident-rate 0.2 --llm-latency-ms 800
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import AsyncGenerator
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from orchestrator import tools
+from orchestrator.state_store import InProcessStore
+from orchestrator.agent import OrchestratorAgent
+from orchestrator.k8s_sim import Cluster
+
+REQUEST = "There seems to be an issue with the cluster performance. Check for SLA violations."
+
+
+class StubLlm(BaseLlm):
+    """Calls one diagnostic tool, then answers; counts calls and sleeps to mimic model latency."""
+
+    latency_s: float = 0.0
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        await asyncio.sleep(self.latency_s)
+        last = llm_request.contents[-1] if llm_request.contents else None
+        if last is not None and any(part.function_response for part in last.parts or []):
+            part = types.Part(text="Checked the cluster; see the SLA violations above.")
+        else:
+            part = types.Part(function_call=types.FunctionCall(name="get_sla_violations", args={}))
+        yield LlmResponse(content=types.Content(role="model", parts=[part]),
+                          usage_metadata=types.GenerateContentResponseUsageMetadata(prompt_token_count=0))
+
+
+def build_cluster() -> Cluster:
+    cluster = Cluster(seed=0)
+    for i in range(20):
+        cluster.add_node(f"node-{i}", cpu_capacity=4.0, memory_capacity=16.0)
+    cluster.deploy_service("frontend", 10, cpu_request=0.5, memory_request=1.0, strategy="spread")
+    cluster.deploy_service("backend", 10, cpu_request=0.5, memory_request=1.0, strategy="spread")
+    return cluster
+
+
+async def replay(precheck: bool, incidents: list, latency_s: float) -> dict:
+    cluster = build_cluster()
+    tools.store = InProcessStore(cluster)
+    model = StubLlm(model="stub", latency_s=latency_s)
+    # No response cache: this measures what the pre-check alone saves
+    agent = OrchestratorAgent(model=model, precheck=precheck, cache=None)
+    runner = InMemoryRunner(agent=agent, app_name="bench")
+    session = await runner.session_service.create_session(app_name="bench", user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text=REQUEST)])
+
+    latencies = []
+    for incident in incidents:
+        # A batch job saturating the nodes pushes node CPU and service latency over their SLAs
+        if incident:
+            cluster.deploy_service("batch", 60, cpu_request=1.0, memory_request=1.0)
+        elif "batch" in cluster.services:
+            cluster.scale_service("batch", 0)
+        start = time.perf_counter()
+        async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            pass
+        latencies.append(time.perf_counter() - start)
+    return {"llm_calls": model.calls, "total_s": sum(latencies), "mean_ms": sum(latencies) / len(latencies) * 1e3}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--incident-rate", type=float, default=0.2)
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    incidents = [rng.random() < args.incident_rate for _ in range(args.requests)]
+    print(f"requests={args.requests} incidents={sum(incidents)} llm_latency_ms={args.llm_latency_ms:g}")
+    print(f"{'mode':<12}{'LLM calls':>11}{'total s':>10}{'mean ms':>10}")
+    rows = {}
+    for label, precheck in (("llm-only", False), ("precheck", True)):
+        rows[label] = row = asyncio.run(replay(precheck, incidents, args.llm_latency_ms / 1e3))
+        print(f"{label:<12}{row['llm_calls']:>11}{row['total_s']:>10.2f}{row['mean_ms']:>10.1f}")
+    saved_calls = rows["llm-only"]["llm_calls"] - rows["precheck"]["llm_calls"]
+    saved_s = rows["llm-only"]["total_s"] - rows["precheck"]["total_s"]
+    print(f"saved: {saved_calls} LLM calls ({saved_calls / rows['llm-only']['llm_calls']:.0%}), {saved_s:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
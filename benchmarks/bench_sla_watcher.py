@@ -0,0 +1,119 @@
+"""Agent traffic and SLA restore times: polling the orchestrator vs the event-driven SLA watcher.
+
+The scenario of bench_des (a frontend traffic spike, then a node failure) is replayed in
+the discrete-event simulator, with the orchestrator agent stood in for by the SLA
+pre-check's remediations, applied `--agent-latency-s` simulated seconds after the agent
+is called (its model turn). The agent handles one request at a time.
+
+* poll: the agent is asked to check the SLAs every `--poll-interval` seconds. A healthy
+  cluster is answered by the pre-check; otherwise the model runs.
+* watcher: an SlaWatcher evaluates every `--tick-s` seconds and after each change the agent
+  makes, and calls the agent only for violations confirmed over `--debounce-s`.
+
+Reports agent requests, model turns (what costs LLM traffic) and time to restore the SLAs.
+
+Run from the repository root:
+    python -m benchmarks.bench_sla_watcher --hours 2 --poll-interval 10 60
+"""
+import argparse
+
+from benchmarks.bench_des import build_cluster
+from orchestrator import sla
+from orchestrator.des import Simulation
+from orchestrator.sla_watcher import SlaWatcher
+
+
+class SimulatedAgent:
+    def __init__(self, sim: Simulation, latency_s: float, on_done=None):
+        self.sim = sim
+        self.latency_s = latency_s
+        self.on_done = on_done
+        self.busy = False
+        self.requests = self.model_turns = 0
+
+    def request(self):
+        if self.busy:
+            return
+        self.requests += 1
+        report = sla.evaluate(self.sim.cluster.get_metrics(jitter=False), self.sim.slas)
+        if report["ok"]:
+            return
+        self.model_turns += 1
+        self.busy = True
+        self.sim.schedule(self.latency_s, self._act)
+
+    def _act(self):
+        # The model's decision, made on what it sees at the end of its turn
+        report = sla.evaluate(self.sim.cluster.get_metrics(jitter=False), self.sim.slas)
+        for remediation in report["remediations"]:
+            if remediation["tool"] == "scale_service":
+                self.sim.cluster.scale_service(**remediation["args"])
+            elif remediation["tool"] == "rebalance_cluster":
+                self.sim.cluster.rebalance(**remediation["args"])
+        self.busy = False
+        if self.on_done:
+            self.on_done()
+
+
+def simulate(args, mode: str, poll_interval: float = 0.0) -> dict:
+    duration = args.hours * 3600
+    sim = Simulation(build_cluster(args.nodes), seed=args.seed)
+    sim.set_traffic("frontend", args.frontend_rps)
+    sim.set_traffic("backend", args.backend_rps)
+    sim.set_traffic("frontend", args.frontend_rps * 2, at=duration * 0.25)
+    sim.set_traffic("frontend", args.frontend_rps, at=duration * 0.25 + 600)
+    sim.fail_node("node-0", at=duration * 0.6, recover_after=300)
+
+    agent = SimulatedAgent(sim, args.agent_latency_s)
+    watcher = None
+    if mode == "poll":
+        sim.every(poll_interval, lambda sim: agent.request())
+    else:
+        watcher = SlaWatcher(None, sim.slas, tick_s=args.tick_s, debounce_s=args.debounce_s, clock=lambda: sim.now)
+
+        def evaluate(sim: Simulation):
+            if not agent.busy and watcher.check(sim.cluster.get_metrics(jitter=False)):
+                agent.request()
+        sim.every(args.tick_s, evaluate)
+        # The store notifies the watcher of the agent's own changes
+        agent.on_done = lambda: evaluate(sim)
+
+    sim.run(duration)
+    restore = sim.restore_times()
+    return {
+        "mode": mode if mode != "poll" else f"poll {poll_interval:g}s",
+        "agent_requests": agent.requests,
+        "model_turns": agent.model_turns,
+        "incidents": len(sim.incidents),
+        "restore_mean_s": sum(restore) / len(restore) if restore else float("nan"),
+        "restore_max_s": max(restore, default=float("nan")),
+        "evaluations": watcher.stats["evaluations"] if watcher else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=2.0)
+    parser.add_argument("--nodes", type=int, default=20)
+    parser.add_argument("--frontend-rps", type=float, default=300.0)
+    parser.add_argument("--backend-rps", type=float, default=200.0)
+    parser.add_argument("--poll-interval", type=float, nargs="+", default=[10.0, 60.0])
+    parser.add_argument("--tick-s", type=float, default=5.0)
+    parser.add_argument("--debounce-s", type=float, default=10.0)
+    parser.add_argument("--agent-latency-s", type=float, default=15.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = [simulate(args, "poll", interval) for interval in args.poll_interval]
+    rows.append(simulate(args, "watcher"))
+    print(f"hours={args.hours} agent_latency_s={args.agent_latency_s} tick_s={args.tick_s} "
+          f"debounce_s={args.debounce_s}")
+    print(f"{'mode':<10}{'requests':>10}{'model turns':>13}{'incidents':>11}{'restore mean s':>16}"
+          f"{'restore max s':>15}")
+    for row in rows:
+        print(f"{row['mode']:<10}{row['agent_requests']:>10}{row['model_turns']:>13}{row['incidents']:>11}"
+              f"{row['restore_mean_s']:>16.0f}{row['restore_max_s']:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
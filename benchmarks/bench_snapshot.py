@@ -0,0 +1,109 @@
+"""File size, save and load times of the cluster state: columnar snapshot vs JSON vs pickle.
+
+The cluster is built by `--nodes` add_node calls and one deploy_service per service, as a
+notebook sets it up; "build" is that setup, which is what a restarted orchestrator had
+to replay before it could load its state. Each format then saves `Cluster.snapshot()`
+and loads it back: "decode" only parses the file, "warm start" also restores the
+cluster. The last lines time the change log: one SnapshotStore mutation (a scale by one
+replica) against the same mutation in memory, and the replay of those records at load.
+
+Run from the repository root:
+    python -m benchmarks.bench_snapshot --nodes 1000 --pods 50000
+"""
+import argparse
+import json
+import os
+import pickle
+import tempfile
+import time
+
+from orchestrator import snapshot
+from orchestrator.k8s_sim import Cluster
+from orchestrator.state_store import InProcessStore
+
+
+def build(nodes: int, pods: int, services: int) -> Cluster:
+    cluster = Cluster(seed=0)
+    for i in range(nodes):
+        cluster.add_node(f"node-{i}", cpu_capacity=64.0, memory_capacity=256.0)
+    for i in range(services):
+        cluster.deploy_service(f"svc-{i}", pods // services, cpu_request=0.5, memory_request=1.0, strategy="spread")
+    return cluster
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def formats():
+    # name -> (encode snapshot to bytes, decode bytes to snapshot)
+    return {
+        "columnar": (snapshot.encode_snapshot, lambda data: snapshot.decode(data)[2]),
+        "json": (lambda snap: json.dumps(snap).encode(), json.loads),
+        "pickle": (lambda snap: pickle.dumps(snap, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--pods", type=int, default=50000)
+    parser.add_argument("--services", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mutations", type=int, default=200)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cluster = build(args.nodes, args.pods, args.services)
+    build_s = time.perf_counter() - start
+    state = cluster.snapshot()
+
+    print(f"nodes={args.nodes} pods={sum(len(pods) for *_, pods in state['services'])} "
+          f"services={args.services} (best of {args.repeat})")
+    print(f"{'format':<10}{'size KB':>10}{'save ms':>10}{'decode ms':>11}{'warm start ms':>15}")
+    print(f"{'build':<10}{'':>10}{'':>10}{'':>11}{build_s * 1e3:>15.1f}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (encode, decode) in formats().items():
+            path = os.path.join(tmp, f"state.{name}")
+
+            def save():
+                with open(path, "wb") as f:
+                    f.write(encode(cluster.snapshot()))
+
+            def read():
+                with open(path, "rb") as f:
+                    return decode(f.read())
+
+            save_s = best_of(save, args.repeat)
+            decode_s = best_of(read, args.repeat)
+            if name == "columnar":
+                # The real warm start: memory-mapped and replaying the (empty) change log
+                warm_s = best_of(lambda: snapshot.load(path), args.repeat)
+            else:
+                warm_s = best_of(lambda: Cluster().restore(read()), args.repeat)
+            print(f"{name:<10}{os.path.getsize(path) / 1024:>10.0f}{save_s * 1e3:>10.1f}{decode_s * 1e3:>11.1f}"
+                  f"{warm_s * 1e3:>15.1f}")
+
+        path = os.path.join(tmp, "oa_state.snap")
+        stores = {"memory": InProcessStore(cluster.fork()),
+                  "log": snapshot.SnapshotStore(path, initial=cluster.fork(), compact_ratio=float("inf"))}
+        for label, store in stores.items():
+            start = time.perf_counter()
+            for i in range(args.mutations):
+                store.mutate(lambda c: c.scale_service("svc-0", len(c.services["svc-0"].pods) + (1 if i % 2 else -1)))
+            elapsed = time.perf_counter() - start
+            print(f"mutate ({label}): {elapsed / args.mutations * 1e6:.0f} us per scale")
+        log = stores["log"]
+        print(f"change log: {log.stats['log_bytes'] / log.stats['appends']:.0f} bytes per record, "
+              f"warm start with {log.stats['appends']} records "
+              f"{best_of(lambda: snapshot.load(path), args.repeat) * 1e3:.1f} ms")
+        log.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Startup of the Orchestrator Agent server: what its imports cost and when it is discoverable.
+
+The first table is `python -X importtime` of building the OA app (`run_OA.create_app()`),
+by cumulative time, with LiteLLM's import (deferred to the first model call, or to the
+preload) measured on its own. The second starts `run_OA.py` as a process, as an autoscaler
+would, and times from the spawn to the first 200 on the agent card, to the first answer
+from the real app (/metrics), and, with the preload on, to the model client being built
+(`startup_preload_seconds` in /metrics). "cold" starts without a cached agent card, so
+the first card is the minimal one, "warm" with the card the cold start cached. The
+preload runs in a thread, so the app answers while LiteLLM is imported.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup --repeat 3
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from shared.startup import AGENT_CARD_PATH
+
+PORT = 18031
+
+
+def import_times(code: str, top: int) -> list:
+    """The `top` modules by cumulative import time (seconds, name) while running `code`."""
+    proc = subprocess.run([sys.executable, "-W", "ignore", "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1e6, name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def wait_for(client: httpx.Client, path: str, deadline: float, contains: str = "") -> float:
+    while time.monotonic() < deadline:
+        try:
+            response = client.get(f"http://127.0.0.1:{PORT}{path}", timeout=5)
+            if response.status_code == 200 and contains in response.text:
+                return time.monotonic()
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{path} did not answer in time")
+
+
+def start_once(card_cache: str, preload: str, timeout_s: float) -> tuple:
+    """Seconds from spawning run_OA.py to its first agent card, real app and built model (or None)."""
+    env = dict(os.environ, OA_CARD_CACHE=card_cache, LITELLM_LOCAL_MODEL_COST_MAP="True")
+    start = time.monotonic()
+    proc = subprocess.Popen([sys.executable, "-W", "ignore", "run_OA.py", "--host", "127.0.0.1",
+                             "--port", str(PORT), "--preload", preload],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = start + timeout_s
+        with httpx.Client() as client:
+            card = wait_for(client, AGENT_CARD_PATH, deadline)
+            ready = wait_for(client, "/metrics", deadline)
+            model = wait_for(client, "/metrics", deadline, "startup_preload_seconds_count") if preload == "on" else None
+        return card - start, ready - start, model - start if model else None
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(f"{'cumulative import s':>20}  module (building the OA app)")
+    for seconds, name in import_times("import run_OA; run_OA.create_app()", args.top):
+        print(f"{seconds:>20.3f}  {name}")
+    litellm_s = max(s for s, name in import_times("import litellm", 50) if name == "litellm")
+    print(f"{litellm_s:>20.3f}  litellm (first model call or preload)")
+
+    print(f"\n{'start':<18}{'first card s':>14}{'app ready s':>13}{'model built s':>15}  (best of {args.repeat})")
+    with tempfile.TemporaryDirectory() as tmp:
+        card_cache = os.path.join(tmp, "oa_agent_card.json")
+        for label, preload, cached in (("cold, preload", "on", False), ("warm, preload", "on", True),
+                                       ("warm, no preload", "off", True)):
+            runs = []
+            for _ in range(args.repeat):
+                if not cached and os.path.exists(card_cache):
+                    os.remove(card_cache)
+                runs.append(start_once(card_cache, preload, args.timeout))
+            card, ready, model = (min(column) if None not in column else None for column in zip(*runs))
+            print(f"{label:<18}{card:>14.2f}{ready:>13.2f}" + (f"{model:>15.2f}" if model else f"{'-':>15}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""OA tool load against the state stores: one process in memory vs N processes on SQLite.
+
+Each worker process plays one uvicorn worker of run_OA.py: it loops over a mix of read
+tools (cluster summary) and mutations (scale a service up by one replica), all through
+its own SQLiteStore on a shared WAL database. Every increment is counted, so the final
+replica count shows whether optimistic concurrency lost any update.
+
+Run from the repository root:
+    python -m benchmarks.bench_state_store --processes 1 2 4 --ops 2000 --write-ratio 0.1
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from orchestrator import sla
+from orchestrator.k8s_sim import Cluster
+from orchestrator.state_store import InProcessStore, SQLiteStore
+
+
+def build(nodes: int, pods: int) -> Cluster:
+    cluster = Cluster(seed=0)
+    for i in range(nodes):
+        cluster.add_node(f"node-{i}", cpu_capacity=64.0, memory_capacity=256.0)
+    for name in ("frontend", "backend", "database"):
+        cluster.deploy_service(name, pods // 3, cpu_request=0.25, memory_request=0.5, strategy="spread")
+    return cluster
+
+
+def workload(store, ops: int, write_ratio: float, seed: int) -> int:
+    rng = random.Random(seed)
+    writes = 0
+    for _ in range(ops):
+        if rng.random() < write_ratio:
+            service = rng.choice(("frontend", "backend"))
+            store.mutate(lambda cluster: cluster.scale_service(service, len(cluster.services[service].pods) + 1))
+            writes += 1
+        else:
+            metrics = store.read().get_metrics()
+            sla.evaluate(metrics)
+    return writes
+
+
+def worker(path: str, ops: int, write_ratio: float, seed: int, results):
+    store = SQLiteStore(path)
+    try:
+        results.put((workload(store, ops, write_ratio, seed), store.stats))
+    except Exception as e:
+        # Report instead of dying, or the parent would wait for this worker forever
+        results.put((e, store.stats))
+
+
+def run_sqlite(processes: int, nodes: int, pods: int, ops: int, write_ratio: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "oa_state.db")
+        SQLiteStore(path, initial=build(nodes, pods))
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        workers = [ctx.Process(target=worker, args=(path, ops, write_ratio, seed, results)) for seed in range(processes)]
+        start = time.perf_counter()
+        for process in workers:
+            process.start()
+        outcomes = [results.get() for _ in workers]
+        for process in workers:
+            process.join()
+        elapsed = time.perf_counter() - start
+        final = SQLiteStore(path).read()
+    for writes, _ in outcomes:
+        if isinstance(writes, Exception):
+            raise writes
+    writes = sum(w for w, _ in outcomes)
+    replicas = len(final.services["frontend"].pods) + len(final.services["backend"].pods)
+    return {
+        "ops_per_s": processes * ops / elapsed,
+        "writes": writes,
+        "lost_updates": 2 * (pods // 3) + writes - replicas,
+        "conflicts": sum(stats["conflicts"] for _, stats in outcomes),
+        "locked_writes": sum(stats["locked_writes"] for _, stats in outcomes),
+        "reloads": sum(stats["reloads"] for _, stats in outcomes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--pods", type=int, default=600)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(f"nodes={args.nodes} pods={args.pods} ops/process={args.ops} write_ratio={args.write_ratio} "
+          f"cpus={os.cpu_count()}")
+    print(f"{'store':<16}{'ops/s':>9}{'writes':>8}{'lost':>6}{'conflicts':>11}{'locked':>8}{'reloads':>9}")
+    store = InProcessStore(build(args.nodes, args.pods))
+    start = time.perf_counter()
+    writes = workload(store, args.ops, args.write_ratio, 0)
+    print(f"{'memory x1':<16}{args.ops / (time.perf_counter() - start):>9.0f}{writes:>8}{0:>6}{0:>11}{0:>8}{0:>9}")
+    for processes in args.processes:
+        row = run_sqlite(processes, args.nodes, args.pods, args.ops, args.write_ratio)
+        print(f"{f'sqlite x{processes}':<16}{row['ops_per_s']:>9.0f}{row['writes']:>8}{row['lost_updates']:>6}"
+              f"{row['conflicts']:>11}{row['locked_writes']:>8}{row['reloads']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""What-if engine: cost of forking cluster state and throughput of ranking candidate actions.
+
+Run from the repository root:
+    python -m benchmarks.bench_what_if --nodes 200 --pods 5000 --candidates 256
+"""
+import argparse
+import copy
+import os
+import random
+import time
+
+from orchestrator import what_if
+from orchestrator.k8s_sim import Cluster
+
+
+def build(nodes: int, pods: int) -> Cluster:
+    cluster = Cluster(seed=0)
+    for i in range(nodes):
+        cluster.add_node(f"node-{i}", cpu_capacity=32.0, memory_capacity=128.0)
+    for name in ("frontend", "backend", "database"):
+        cluster.deploy_service(name, pods // 3, cpu_request=0.5, memory_request=1.0, strategy="spread")
+    # Per-pod load near saturation, so the baseline violates the latency SLAs
+    cluster.request_rates.update({"frontend": pods * 15.0, "backend": pods * 14.0})
+    return cluster
+
+
+def candidates(cluster: Cluster, count: int, rng: random.Random) -> list:
+    result = []
+    pod_ids = list(cluster.services["backend"].pods)
+    names = list(cluster.nodes)
+    for i in range(count):
+        if i % 2:
+            result.append({"action": "move_pod", "pod_id": rng.choice(pod_ids), "target_node": rng.choice(names)})
+        else:
+            service = rng.choice(("frontend", "backend"))
+            current = len(cluster.services[service].pods)
+            result.append({"action": "scale_service", "service_name": service,
+                           "replicas": max(1, int(current * rng.uniform(0.5, 2.0)))})
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=200)
+    parser.add_argument("--pods", type=int, default=5000)
+    parser.add_argument("--candidates", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    cluster = build(args.nodes, args.pods)
+    batch = candidates(cluster, args.candidates, random.Random(0))
+
+    start = time.perf_counter()
+    for _ in range(5):
+        copy.deepcopy(cluster)
+    deepcopy_ms = (time.perf_counter() - start) / 5 * 1e3
+    snapshot = cluster.snapshot()
+    start = time.perf_counter()
+    for _ in range(5):
+        Cluster().restore(snapshot)
+    restore_ms = (time.perf_counter() - start) / 5 * 1e3
+    print(f"nodes={args.nodes} pods={args.pods}: deepcopy {deepcopy_ms:.1f}ms, snapshot restore {restore_ms:.1f}ms")
+
+    before = cluster.version
+    rows = []
+    for label, workers in (("inline", 1), (f"pool x{args.workers}", args.workers)):
+        what_if.evaluate(cluster, batch[:what_if.MIN_PARALLEL_CANDIDATES], workers=workers)  # warm up the pool
+        start = time.perf_counter()
+        result = what_if.evaluate(cluster, batch, workers=workers)
+        elapsed = time.perf_counter() - start
+        rows.append((label, elapsed, result))
+        print(f"{label:<10} {len(batch)} candidates in {elapsed:.2f}s ({len(batch) / elapsed:.0f}/s)")
+    assert cluster.version == before, "what-if must not touch the live cluster"
+    assert [r["outcome"] for r in rows[0][2]["ranked"]] == [r["outcome"] for r in rows[1][2]["ranked"]]
+
+    best = rows[0][2]["ranked"][0]
+    print(f"baseline violations: {rows[0][2]['baseline']['violations']}; best: {best['candidate']} "
+          f"-> violations {best['outcome']['violations']}, max node CPU {best['outcome']['max_node_cpu_pct']:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
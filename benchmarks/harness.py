@@ -0,0 +1,64 @@
+"""Shared helpers for the benchmark suite: timing statistics and JSON reports.
+
+Every report has the same shape, so runs from different releases can be diffed with
+`python -m benchmarks.suite --compare old.json new.json`:
+
+    {"suite": "...", "environment": {...},
+     "results": [{"name": "...", "params": {"nodes": 1000, ...}, "metrics": {"p50_us": 41.2, ...}}, ...]}
+
+A result is identified by its name and params. Metrics named "rps" or ending in "_per_s"
+are higher-is-better; all others (latencies, errors, calls, tokens) lower-is-better.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+def latency_stats(samples_s: List[float], unit: str = "us") -> Dict:
+    """Mean, p50, p99 and max of latencies given in seconds, in `unit` ("us" or "ms")."""
+    scale = {"us": 1e6, "ms": 1e3}[unit]
+    values = np.asarray(samples_s) * scale
+    return {
+        f"mean_{unit}": round(float(values.mean()), 3),
+        f"p50_{unit}": round(float(np.percentile(values, 50)), 3),
+        f"p99_{unit}": round(float(np.percentile(values, 99)), 3),
+        f"max_{unit}": round(float(values.max()), 3),
+    }
+
+def result(name: str, params: Dict, metrics: Dict) -> Dict:
+    return {"name": name, "params": params, "metrics": metrics}
+
+def higher_is_better(metric: str) -> bool:
+    return metric == "rps" or metric.endswith("_per_s")
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+def report(suite: str, results: List[Dict]) -> Dict:
+    return {"suite": suite, "environment": environment(), "results": results}
+
+def emit(data: Dict, output: Optional[str]):
+    """Writes a report to `output`, or to stdout when it is None or "-"."""
+    text = json.dumps(data, indent=2)
+    if output in (None, "-"):
+        print(text)
+    else:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+        print(f"wrote {output}", file=sys.stderr)
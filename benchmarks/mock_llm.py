@@ -0,0 +1,116 @@
+"""Deterministic stand-in for the Ollama model, served through LiteLLM as provider "mock".
+
+`register()` installs it; agents then use it like any LiteLLM model, e.g.
+`LiteLlm(model="mock/oa")`, so the whole ADK -> LiteLLM path is exercised without a
+network call. The part after "mock/" names a script in SCRIPTS. A script is a list of
+rules: the first rule whose `match` regex is found in the latest user message supplies
+the steps. Step i of a rule is replayed once the model has seen i tool results since
+that user message. A step either calls a tool (`tool` and `args`) or answers (`text`).
+Once the steps run out, the model answers with the last step's text.
+
+Each call sleeps `latency_ms` and reports token usage estimated at 4 characters a token,
+so latency and token accounting downstream behave as with a real model.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+import uuid
+from typing import Dict, List, Optional
+
+# Offline runs must not try to download LiteLLM's model price list
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import litellm
+from litellm import CustomLLM, ModelResponse
+
+SCRIPTS: Dict[str, List[Dict]] = {
+    # Orchestrator: diagnose and fix SLA reports, deploy what the RPA asks for
+    "oa": [
+        {"match": r"(?i)deploy", "steps": [
+            {"tool": "get_cluster_summary", "args": {}},
+            {"tool": "deploy_service", "args": {"name": "web", "replicas": 2, "cpu_request": 1.0,
+                                                "memory_request": 1.0}},
+            {"text": "Deployed service 'web' with 2 replicas."},
+        ]},
+        {"match": r"(?i)sla|latency|performance", "steps": [
+            {"tool": "get_cluster_summary", "args": {}},
+            {"tool": "get_sla_violations", "args": {}},
+            {"text": "Checked the cluster; no further action needed."},
+        ]},
+        {"match": "", "steps": [
+            {"tool": "get_cluster_summary", "args": {}},
+            {"text": "Here is the cluster status."},
+        ]},
+    ],
+    # Resource provider: price the request, then hand it to the orchestrator
+    "rpa": [
+        {"match": r"(?i)deploy", "steps": [
+            {"tool": "evaluate_service_cost", "args": {"cpu_request": 2.0, "memory_request": 2.0}},
+            {"tool": "transfer_to_agent", "args": {"agent_name": "orchestrator_agent"}},
+            {"text": "The deployment request was passed to the orchestrator."},
+        ]},
+        {"match": "", "steps": [{"text": "Nothing to deploy."}]},
+    ],
+}
+
+def _text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content or [] if isinstance(part, dict))
+
+class MockLLM(CustomLLM):
+    def __init__(self, scripts: Optional[Dict[str, List[Dict]]] = None, latency_ms: float = 0.0):
+        super().__init__()
+        self.scripts = scripts or SCRIPTS
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def _step(self, model: str, messages: List[Dict]) -> Dict:
+        name = model.split("/", 1)[-1]
+        if name not in self.scripts:
+            raise ValueError(f"No mock script {name} (available: {', '.join(self.scripts)})")
+        last_user = max((i for i, message in enumerate(messages) if message.get("role") == "user"), default=-1)
+        prompt = _text(messages[last_user]["content"]) if last_user >= 0 else ""
+        tool_results = sum(message.get("role") == "tool" for message in messages[last_user + 1:])
+        for rule in self.scripts[name]:
+            if re.search(rule["match"], prompt):
+                steps = rule["steps"]
+                return steps[tool_results] if tool_results < len(steps) else {"text": steps[-1].get("text", "")}
+        return {"text": ""}
+
+    def _respond(self, model: str, messages: List[Dict], model_response: ModelResponse) -> ModelResponse:
+        self.calls += 1
+        step = self._step(model, messages)
+        message = {"role": "assistant", "content": step.get("text")}
+        if "tool" in step:
+            message["content"] = None
+            message["tool_calls"] = [{
+                "id": f"call_{uuid.uuid4().hex[:12]}", "type": "function",
+                "function": {"name": step["tool"], "arguments": json.dumps(step["args"])},
+            }]
+        prompt_tokens = sum(len(_text(m.get("content")) or "") for m in messages) // 4
+        completion_tokens = len(json.dumps(message)) // 4
+        model_response.choices[0].message = litellm.Message(**message)
+        model_response.choices[0].finish_reason = "tool_calls" if "tool" in step else "stop"
+        model_response.model = model
+        model_response.created = int(time.time())
+        setattr(model_response, "usage", litellm.Usage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                                       total_tokens=prompt_tokens + completion_tokens))
+        return model_response
+
+    def completion(self, model: str, messages: list, model_response: ModelResponse, **kwargs) -> ModelResponse:
+        time.sleep(self.latency_ms / 1e3)
+        return self._respond(model, messages, model_response)
+
+    async def acompletion(self, model: str, messages: list, model_response: ModelResponse, **kwargs) -> ModelResponse:
+        await asyncio.sleep(self.latency_ms / 1e3)
+        return self._respond(model, messages, model_response)
+
+def register(scripts: Optional[Dict[str, List[Dict]]] = None, latency_ms: float = 0.0) -> MockLLM:
+    """Installs the mock as LiteLLM provider "mock" (replacing an earlier one) and returns it."""
+    handler = MockLLM(scripts, latency_ms)
+    litellm.custom_provider_map = [entry for entry in litellm.custom_provider_map if entry["provider"] != "mock"]
+    litellm.custom_provider_map.append({"provider": "mock", "custom_handler": handler})
+    return handler
@@ -0,0 +1,100 @@
+"""Runs the JSON benchmarks as one suite, and compares two suite (or single-benchmark) reports.
+
+A run executes bench_k8s_micro and bench_e2e, each in its own process, at sizes small
+enough for CI, and merges their results into one report. Result names are prefixed with
+the benchmark they came from, e.g. "k8s_micro/move".
+
+The comparison matches results by name and params and prints, for every metric present
+in both reports, the old and new value and the change. A change for the worse beyond
+`--threshold` (default 20%) is flagged, and the command exits with status 1, so it can
+gate a release:
+
+    python -m benchmarks.suite --output new.json
+    python -m benchmarks.suite --compare old.json new.json --threshold 0.1
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+from benchmarks.harness import emit, higher_is_better, report
+
+BENCHMARKS = {
+    "k8s_micro": ["--sizes", "100", "1000", "--iterations", "200"],
+    "e2e": ["--requests", "50", "--concurrency", "1", "8"],
+}
+
+
+def run(names: List[str]) -> Dict:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            output = os.path.join(tmp, f"{name}.json")
+            print(f"running {name}", file=sys.stderr)
+            subprocess.run([sys.executable, "-m", f"benchmarks.bench_{name}", *BENCHMARKS[name], "--output", output],
+                           check=True, stdout=sys.stderr)
+            with open(output) as f:
+                data = json.load(f)
+            results.extend({**result, "name": f"{name}/{result['name']}"} for result in data["results"])
+    return report("suite", results)
+
+
+def _key(result: Dict) -> Tuple:
+    return result["name"], json.dumps(result["params"], sort_keys=True)
+
+
+def compare(old: Dict, new: Dict, threshold: float) -> List[str]:
+    """Prints the metric changes from `old` to `new` and returns the regressions beyond `threshold`."""
+    old_results = {_key(result): result for result in old["results"]}
+    regressions = []
+    print(f"  {'metric':<28}{'old':>12}{'new':>12}{'change':>9}")
+    for result in new["results"]:
+        previous = old_results.get(_key(result))
+        if previous is None:
+            continue
+        label = result["name"] + "".join(f" {k}={v}" for k, v in result["params"].items() if k != "iterations")
+        print(label)
+        for metric, value in result["metrics"].items():
+            before = previous["metrics"].get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(before, (int, float)):
+                continue
+            change = (value - before) / before if before else 0.0
+            worse = -change if higher_is_better(metric) else change
+            flag = ""
+            if worse > threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{label} {metric}: {before} -> {value}")
+            print(f"  {metric:<28}{before:>12.6g}{value:>12.6g}{change:>+9.1%}{flag}")
+    unmatched = len(new["results"]) - sum(_key(result) in old_results for result in new["results"])
+    if unmatched:
+        print(f"{unmatched} result(s) have no counterpart in the old report")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two reports instead of running")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Tolerated relative slowdown (default: 0.2)")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--output", "-o", help="JSON file for the report (default: stdout)")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        print(f"old: {old['environment'].get('commit')}  new: {new['environment'].get('commit')}")
+        regressions = compare(old, new, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        return
+    emit(run(args.only), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Admission control in front of the orchestrator's A2A app: priorities, coalescing and load shedding.
+
+Every A2A message starts a full agent run, with its LLM calls, cluster reads and possibly
+scale or move calls, so a burst of RPA requests is a burst of concurrent agent sessions
+competing for the model and acting on the same services. `AdmissionMiddleware` wraps the
+`to_a2a` app and
+
+* runs at most `max_concurrent` messages at a time. The others wait in a queue ordered by
+  priority class (SLA requests, then changes such as deployments, then everything else)
+  and arrival.
+* coalesces a new conversation into the run of an equivalent one already waiting or
+  running: read-only SLA checks about the same services, and other requests that change
+  nothing with the same text. That run's response goes to every requester, each under
+  its own JSON-RPC id, task id and context id; the latter two are unknown to the app, so
+  a follower continuing the conversation starts afresh instead of joining the first
+  requester's. Requests asking for an action (a deployment, scaling, a move, a fix, ...)
+  are never coalesced: each requester's action is carried out.
+* sheds requests with a 503 and a Retry-After header once `max_queued` are waiting, or
+  after one waited `max_wait_s`. A request of a higher priority class than the last one
+  queued takes that one's place instead.
+
+Only SendMessage/SendStreamingMessage calls are admitted this way. The agent card,
+/metrics and task queries pass straight through, and messages continuing a conversation
+(with a context or task id) are queued but never coalesced. Each uvicorn worker admits
+its own requests.
+
+Recorded series (see shared.instrumentation): admission_requests_total{priority,outcome}
+with outcome "admitted", "coalesced" or "shed", and admission_wait_seconds{priority}.
+"""
+import asyncio
+import bisect
+import itertools
+import json
+import math
+import re
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from orchestrator import sla
+from shared.instrumentation import metrics
+
+# JSON-RPC methods starting an agent run (A2A 1.0 names, then the 0.x ones)
+SEND_METHODS = ("SendMessage", "SendStreamingMessage", "message/send", "message/stream")
+
+# Priority classes, most urgent first
+PRIORITIES = ("sla", "change", "other")
+
+def classify(text: str) -> str:
+    """The priority class of a request."""
+    if sla.is_sla_request(text):
+        return "sla"
+    return "change" if sla.is_action_request(text) else "other"
+
+def coalesce_key(method: str, text: str, priority: str, services: Callable[[], Iterable[str]]) -> Optional[str]:
+    """Requests with the same key can share one agent run; None for a request that must run on its own.
+
+    `services()` names the cluster's services; it is only called for read-only SLA checks.
+    """
+    if priority == "change" or sla.is_action_request(text):
+        # Also an SLA request asking for a remedy, e.g. "Add two replicas of backend to fix its latency"
+        return None
+    if sla.is_sla_check(text):
+        # The agent diagnoses from the cluster's current metrics, whatever numbers the alert quoted
+        mentioned = sorted(name for name in services() if re.search(rf"\b{re.escape(name)}\b", text, re.IGNORECASE))
+        return f"{method}|sla|{','.join(mentioned)}"
+    return f"{method}|{' '.join(text.lower().split())}"
+
+class Shed(Exception):
+    """A request turned away; retry it after `retry_after_s`."""
+
+    def __init__(self, reason: str, retry_after_s: int):
+        super().__init__(reason)
+        self.retry_after_s = retry_after_s
+
+class _Flight:
+    """One agent run and the responses of the requests coalesced into it."""
+    __slots__ = ("rpc_id", "messages", "complete", "done")
+
+    def __init__(self, rpc_id):
+        self.rpc_id = rpc_id
+        self.messages: List[Dict] = []
+        self.complete = False
+        self.done = asyncio.Event()
+
+class AdmissionMiddleware:
+    """ASGI middleware admitting A2A messages to the app it wraps.
+
+    `services()` names the cluster's services, which SLA checks are coalesced by. With
+    `version()`, the state version (e.g. `StateStore.version`), the names are only looked up
+    again once it changed.
+    """
+
+    def __init__(self, app, max_concurrent: int = 4, max_queued: int = 32, max_wait_s: float = 120.0,
+                 coalesce: bool = True, services: Callable[[], Iterable[str]] = tuple,
+                 version: Optional[Callable[[], object]] = None):
+        self.app = app
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_wait_s = max_wait_s
+        self.coalesce = coalesce
+        self.services = services
+        self.version = version
+        self._services: Optional[Tuple[object, Tuple[str, ...]]] = None
+        self.running = 0
+        # (priority rank, arrival, future set to True when admitted or False when shed)
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self._flights: Dict[str, _Flight] = {}
+        # Moving average of a run's duration, for Retry-After
+        self._run_s = 1.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+        body = await _read_body(receive)
+        request = _parse(body)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        if request is None:
+            return await self.app(scope, replay, send)
+        method, rpc_id, text, new_conversation = request
+        priority = classify(text)
+        key = coalesce_key(method, text, priority, self._service_names) if self.coalesce and new_conversation else None
+        if key is None:
+            return await self._admit(scope, replay, send, priority, rpc_id)
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            metrics.inc("admission_requests_total", priority=priority, outcome="coalesced")
+            await flight.done.wait()
+            if flight.complete:
+                for message in _rewrite_id(flight.messages, flight.rpc_id, rpc_id):
+                    await send(message)
+                return
+            # The run never answered in full (its requester went away); run this one on its own
+            return await self._admit(scope, replay, send, priority, rpc_id)
+
+        flight = self._flights[key] = _Flight(rpc_id)
+
+        async def record(message):
+            flight.messages.append(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                flight.complete = True
+            await send(message)
+
+        try:
+            await self._admit(scope, replay, record, priority, rpc_id)
+        finally:
+            del self._flights[key]
+            flight.done.set()
+
+    def _service_names(self) -> Tuple[str, ...]:
+        if self.version is None:
+            return tuple(self.services())
+        version = self.version()
+        if self._services is None or self._services[0] != version:
+            self._services = (version, tuple(self.services()))
+        return self._services[1]
+
+    async def _admit(self, scope, receive, send, priority: str, rpc_id):
+        start = time.perf_counter()
+        try:
+            await self._acquire(PRIORITIES.index(priority))
+        except Shed as e:
+            metrics.inc("admission_requests_total", priority=priority, outcome="shed")
+            return await _send_shed(send, rpc_id, e)
+        metrics.inc("admission_requests_total", priority=priority, outcome="admitted")
+        metrics.observe("admission_wait_seconds", time.perf_counter() - start, priority=priority)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._run_s += 0.2 * (time.perf_counter() - start - self._run_s)
+            self._release()
+
+    def retry_after_s(self) -> int:
+        """Seconds until the queue has likely drained to where a new request would be taken."""
+        return max(1, math.ceil(self._run_s * (len(self._queue) + self.running) / self.max_concurrent))
+
+    async def _acquire(self, rank: int):
+        if self.running < self.max_concurrent and not self._queue:
+            self.running += 1
+            return
+        if len(self._queue) >= self.max_queued:
+            if not self._queue or self._queue[-1][0] <= rank:
+                raise Shed("queue full", self.retry_after_s())
+            # The newest of the lowest priority class queued gives way
+            self._queue.pop()[2].set_result(False)
+        future = asyncio.get_running_loop().create_future()
+        entry = (rank, next(self._arrivals), future)
+        bisect.insort(self._queue, entry)
+        try:
+            admitted = await asyncio.wait_for(asyncio.shield(future), self.max_wait_s)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and future.result():
+                # Admitted just as the wait ended: hand the slot on
+                self._release()
+            elif entry in self._queue:
+                self._queue.remove(entry)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise Shed(f"waited {self.max_wait_s:g}s", self.retry_after_s()) from None
+        if not admitted:
+            raise Shed("displaced by a more urgent request", self.retry_after_s())
+
+    def _release(self):
+        self.running -= 1
+        while self._queue and self.running < self.max_concurrent:
+            self.running += 1
+            self._queue.pop(0)[2].set_result(True)
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+def _parse(body: bytes) -> Optional[Tuple[str, object, str, bool]]:
+    """(method, id, text, whether it starts a conversation) of an A2A message call, else None."""
+    try:
+        request = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(request, dict) or request.get("method") not in SEND_METHODS:
+        return None
+    # Malformed messages are admitted all the same; the app answers them with a JSON-RPC error
+    params = request.get("params")
+    message = params.get("message") if isinstance(params, dict) else None
+    if not isinstance(message, dict):
+        message = {}
+    parts = message.get("parts")
+    text = " ".join(part["text"] for part in parts if isinstance(part, dict) and isinstance(part.get("text"), str)) \
+        if isinstance(parts, list) else ""
+    new_conversation = not (message.get("contextId") or message.get("taskId"))
+    return request["method"], request.get("id"), text, new_conversation
+
+def _rewrite_id(messages: List[Dict], old_id, new_id) -> List[Dict]:
+    """A recorded JSON (or server-sent events) JSON-RPC response, answering request `new_id` instead.
+
+    Each task and context id in it is replaced by a new random one, so the requester does not
+    continue the recorded run's conversation.
+    """
+    start, body = messages[0], b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+    headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"]
+    content_type = dict(headers).get(b"content-type", b"")
+
+    ids: Dict[str, str] = {}
+
+    def reassign(value):
+        if isinstance(value, list):
+            return [reassign(v) for v in value]
+        if not isinstance(value, dict):
+            return value
+        # A task's own id sits next to its contextId; messages and events refer to it as taskId
+        keys = ("taskId", "contextId", "id") if "contextId" in value else ("taskId",)
+        return {k: ids.setdefault(v, str(uuid.uuid4())) if k in keys and isinstance(v, str) else reassign(v)
+                for k, v in value.items()}
+
+    def answer(payload: bytes) -> bytes:
+        response = json.loads(payload)
+        if isinstance(response, dict) and response.get("id") == old_id:
+            response["id"] = new_id
+            if "result" in response:
+                response["result"] = reassign(response["result"])
+        return json.dumps(response).encode()
+
+    def event_line(line: bytes) -> bytes:
+        if not line.startswith(b"data:"):
+            return line
+        end = b"\r" if line.endswith(b"\r") else b""
+        return b"data: " + answer(line[5:].strip()) + end
+
+    if content_type.startswith(b"text/event-stream"):
+        body = b"\n".join(event_line(line) for line in body.split(b"\n"))
+    elif content_type.startswith(b"application/json") and body:
+        body = answer(body)
+    headers.append((b"content-length", str(len(body)).encode()))
+    return [{**start, "headers": headers}, {"type": "http.response.body", "body": body}]
+
+async def _send_shed(send, rpc_id, shed: Shed):
+    body = json.dumps({"jsonrpc": "2.0", "id": rpc_id, "error": {
+        "code": -32000, "message": f"Orchestrator overloaded ({shed}); retry after {shed.retry_after_s}s"}}).encode()
+    await send({"type": "http.response.start", "status": 503,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                            (b"retry-after", str(shed.retry_after_s).encode())]})
+    await send({"type": "http.response.body", "body": body})
@@ -1,20 +1,97 @@
+import json
+import os
+import time
+from typing import Dict, Optional
+
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
-from google.adk.runners import InMemoryRunner
-from orchestrator import tools
-from google.adk.agents.remote_a2a_agent import (
-    RemoteA2aAgent,
-    AGENT_CARD_WELL_KNOWN_PATH,
-)
-from google.adk.a2a.utils.agent_to_a2a import to_a2a
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import BaseLlm, LlmRequest
+from google.genai import types
+from orchestrator import sla, tools
+from orchestrator.k8s_sim import LATENCY_JITTER_MS
+from shared.cache import Cache, CachingLlm, from_spec
+from shared.instrumentation import InstrumentedLlm
+from shared.lazy_llm import lazy_lite_llm
 
 MODEL = 'gpt-oss:120b-cloud'
 
+# Model responses per request and cluster state ($OA_LLM_CACHE: "memory", "sqlite:///path.db" or "off")
+llm_cache = from_spec(os.environ.get("OA_LLM_CACHE", "memory"))
+
+class SlaPrecheck:
+    """Rule-based SLA check that runs before the model on SLA requests.
+
+    A plain health check on a healthy cluster is answered directly, without an LLM call.
+    Otherwise the violations and candidate remediations are added to the model's
+    instructions, so it starts from the diagnosis instead of rediscovering it through tool
+    calls. Requests saying what to change skip the check (see `sla.is_sla_request`).
+    """
+
+    def __init__(self, slas: Dict, max_nodes: int = 20):
+        self.slas = slas
+        self.max_nodes = max_nodes
+        # The tools' metrics carry latency jitter, so only a cluster healthy by more than the
+        # jitter is called healthy: any reading the model takes would agree
+        self.strict_slas = {**slas, "service_latency_ms": {name: threshold - LATENCY_JITTER_MS
+                                                           for name, threshold in slas["service_latency_ms"].items()}}
+        self.reports: Dict[str, Dict] = {}
+        self.stats = {"sla_requests": 0, "answered_directly": 0, "handed_to_model": 0, "precheck_ms": 0.0}
+
+    def before_agent(self, callback_context: CallbackContext) -> Optional[types.Content]:
+        content = callback_context.user_content
+        text = "".join(part.text or "" for part in content.parts or []) if content else ""
+        if not sla.is_sla_request(text):
+            return None
+        start = time.perf_counter()
+        # Without jitter the report, which ends up in the prompt, is the same for an unchanged cluster
+        metrics = tools.store.read().get_metrics(jitter=False)
+        report = sla.evaluate(metrics, self.slas)
+        healthy = report["ok"] and sla.evaluate(metrics, self.strict_slas)["ok"]
+        self.stats["sla_requests"] += 1
+        self.stats["precheck_ms"] += (time.perf_counter() - start) * 1e3
+        if healthy and sla.is_sla_check(text):
+            self.stats["answered_directly"] += 1
+            return types.Content(role="model", parts=[types.Part(text=sla.summarize_ok(metrics, self.slas))])
+        self.stats["handed_to_model"] += 1
+        if not report["ok"]:
+            self.reports[callback_context.invocation_id] = report
+        return None
+
+    def before_model(self, callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+        report = self.reports.get(callback_context.invocation_id)
+        if report is not None:
+            # On large clusters only the worst nodes are listed; get_hot_nodes() pages through the rest
+            summary = {**report, "nodes": report["nodes"][:self.max_nodes], "total_hot_nodes": len(report["nodes"])}
+            llm_request.append_instructions([
+                "A rule-based SLA check ran before this request. Violations and candidate remediations "
+                "(confirm them with the tools before acting):\n" + json.dumps(tools._compact(summary))
+            ])
+        return None
+
+    def after_agent(self, callback_context: CallbackContext) -> None:
+        self.reports.pop(callback_context.invocation_id, None)
+        return None
+
 class OrchestratorAgent(LlmAgent):
-    def __init__(self):
+    sla_precheck: Optional[SlaPrecheck] = None
+
+    def __init__(self, model: Optional[BaseLlm] = None, slas: Optional[Dict] = None, precheck: bool = True,
+                 cache: Optional[Cache] = llm_cache):
+        slas = slas or tools.slas
+        sla_precheck = SlaPrecheck(slas) if precheck else None
+        # LiteLLM is imported by the first model call (or shared.startup.preload), not at startup
+        model = model or lazy_lite_llm(f"ollama_chat/{MODEL}")
+        if cache is not None:
+            # Keyed on the cluster state too: the same question about a changed cluster is a new question
+            model = CachingLlm(model, cache, state=lambda: tools.store.cache_key(cache.persistent))
+        model = InstrumentedLlm(model, agent="orchestrator")
         super().__init__(
             name="Orchestrator",
-            model=LiteLlm(model=f"ollama_chat/{MODEL}"),
+            model=model,
+            sla_precheck=sla_precheck,
+            before_agent_callback=sla_precheck.before_agent if sla_precheck else None,
+            before_model_callback=sla_precheck.before_model if sla_precheck else None,
+            after_agent_callback=sla_precheck.after_agent if sla_precheck else None,
             instruction="""
             You are a smart Kubernetes Orchestrator responsible for maintaining system stability and SLAs. 
             
@@ -22,20 +99,27 @@ class OrchestratorAgent(LlmAgent):
             `frontend`, `backend`, `database`
             
             The given SLAs are:
-                *   Frontend Latency: Must be under 100ms.
-                *   Backend Latency: Must be under 150ms.
-                *   Node CPU Utilization: Should ideally be under 80% to prevent degradation.
+            """ + sla.render_slas(slas) + """
             
             For SLA violation requests you must specifically follow the following steps:
-            1. Use `get_cluster_metrics()` to get metrics (CPU utilization, latency, pod numbers) from the cluster you orchestrate.
+            1. Use `get_cluster_summary()` to get an overview (CPU utilization, latency, pod numbers) of the cluster you orchestrate. Drill down only as needed:
+                *   `get_sla_violations()` for the services and nodes that break an SLA
+                *   `get_hot_nodes()` for the most loaded nodes and the IDs of their largest pods
+                *   `get_cluster_metrics_page()` to page through (or take the top-K of) node or service metrics
+                *   `get_cluster_metrics()` returns every node and service at once; use it only on small clusters
             2. If any SLA is violated or at risk, take corrective actions:
                 *   High Latency: Scale up the service to distribute load using `scale_service()`
-                *   High Node CPU: Move pods from the overloaded node to a node with spare capacity using `move_pod()`
-            3. After taking action, verify the result by checking the metrics again using `get_cluster_metrics()`
+                *   Several services to deploy or scale at once: use a single `apply_manifest()` call
+                *   High Node CPU: Move pods from the overloaded node to a node with spare capacity using `move_pod()`, or relieve all overloaded nodes at once with `rebalance_cluster()`
+                *   Several possible fixes: compare them first with a single `evaluate_what_if()` call and apply its recommendation
+                *   A fix of several steps (scales, moves, rebalance): apply them all with a single `apply_plan()` call; it is atomic and returns the resulting metrics
+            3. After taking action, verify the result by checking the metrics again using `get_sla_violations()` (not needed after `apply_plan()`, whose response already has them)
             
             Check the "status" field in each tool's response for errors. If any tool returns status "error", explain the issue to the user clearly.
             
             Don't ask questions. The only available information can be accessed through the given tools. Be decisive and use the corresponding tools to complete the request. 
             """,
-            tools=[tools.get_cluster_metrics, tools.scale_service, tools.move_pod, tools.deploy_service]
+            tools=[tools.get_cluster_summary, tools.get_sla_violations, tools.get_hot_nodes, tools.get_cluster_metrics_page,
+                   tools.get_cluster_metrics, tools.scale_service, tools.move_pod, tools.deploy_service, tools.apply_manifest, tools.rebalance_cluster,
+                   tools.apply_plan, tools.evaluate_what_if]
         )
\ No newline at end of file
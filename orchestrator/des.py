@@ -0,0 +1,210 @@
+"""Discrete-event simulation of request traffic against a `k8s_sim.Cluster`.
+
+Events are timestamped callbacks on a single heap: Poisson request arrivals per
+service, pod startup, node failure/recovery, traffic changes, scale actions and
+periodic controllers (e.g. an agent's reconcile loop). Time only advances from one
+event to the next on a simulated clock with a seeded RNG, so hours of traffic replay
+in seconds and every run is reproducible.
+
+Load model: a request goes round-robin to a ready pod of its service. Its latency is
+the node latency used by `get_metrics` (20ms + up to 100ms from CPU utilization,
++/-5ms) plus M/M/1 queueing delay from the service's requests per ready pod. Pods are
+not ready until `startup_delay_s` after they are placed (or moved), and requests that
+find no ready pod count as timed out. While attached, the cluster's `get_metrics`
+reports the latency observed in the last window, and SLA incidents are tracked so
+`restore_times()` tells how long it took to get back within the SLAs.
+"""
+import heapq
+import itertools
+import random
+from typing import Callable, Dict, List, Optional
+
+from orchestrator import sla
+from orchestrator.k8s_sim import Cluster
+
+# Requests per second one ready pod serves at full utilization
+POD_CAPACITY_RPS = 50.0
+
+def queueing_delay_ms(rps: float, ready_pods: int, pod_capacity_rps: float = POD_CAPACITY_RPS) -> float:
+    """M/M/1 waiting time of a request when `rps` is spread over `ready_pods` pods."""
+    if ready_pods <= 0:
+        return 0.0
+    utilization = min(rps / (ready_pods * pod_capacity_rps), 0.99)
+    return 1000 / pod_capacity_rps * utilization / (1 - utilization)
+
+class Simulation:
+    def __init__(self, cluster: Cluster, seed: Optional[int] = None, start: float = 0.0,
+                 startup_delay_s: float = 5.0, reschedule_delay_s: float = 30.0, window_s: float = 10.0,
+                 pod_capacity_rps: float = POD_CAPACITY_RPS, timeout_ms: float = 1000.0, slas: Optional[Dict] = None):
+        self.cluster = cluster
+        self.now = start
+        self.rng = random.Random(seed)
+        self.startup_delay_s = startup_delay_s
+        self.reschedule_delay_s = reschedule_delay_s
+        self.window_s = window_s
+        self.pod_capacity_rps = pod_capacity_rps
+        self.timeout_ms = timeout_ms
+        self.slas = slas or sla.DEFAULT_SLAS
+        self.events_processed = 0
+
+        # (time, seq, handler, args); seq keeps same-time events in scheduling order
+        self._queue: List = []
+        self._seq = itertools.count()
+
+        # Shared with the cluster, so forks of it (what-if) know the offered load
+        self._rates: Dict[str, float] = cluster.request_rates
+        self._arriving = set()
+        # pod_id -> node it was last seen on; pods in _starting (pod_id -> token) get no traffic yet
+        self._placed: Dict[str, str] = {pod_id: node.name for pod_id, (_, node) in cluster._pod_index.items() if node}
+        self._starting: Dict[str, int] = {}
+        # Per service: latency (ms) of each ready pod, and the round-robin cursor
+        self._ready: Dict[str, List[float]] = {}
+        self._cursor: Dict[str, int] = {}
+        self._seen_version = -1
+
+        # Per service [served, latency sum, timed out] over the current window
+        self._window: Dict[str, List[float]] = {}
+        self._observed: Dict[str, float] = {}
+        self.history: List[Dict] = []
+        self.incidents: List[Dict] = []
+
+        cluster.clock = lambda: self.now
+        cluster.latency_source = lambda: self._observed
+        self.every(window_s, lambda sim: sim._sample())
+
+    # Scheduling
+
+    def at(self, time: float, handler: Callable, *args):
+        heapq.heappush(self._queue, (max(time, self.now), next(self._seq), handler, args))
+
+    def schedule(self, delay: float, handler: Callable, *args):
+        self.at(self.now + delay, handler, *args)
+
+    def every(self, interval: float, fn: Callable[["Simulation"], None], start: Optional[float] = None):
+        """Calls `fn(simulation)` every `interval` simulated seconds, first at `start` (default now + interval)."""
+        def tick():
+            fn(self)
+            self.schedule(interval, tick)
+        self.at(self.now + interval if start is None else start, tick)
+
+    def run(self, until: float) -> int:
+        """Processes every event up to simulated time `until`; returns the number processed."""
+        queue, pop, processed = self._queue, heapq.heappop, 0
+        while queue and queue[0][0] <= until:
+            self.now, _, handler, args = pop(queue)
+            handler(*args)
+            processed += 1
+        self.now = max(self.now, until)
+        self.events_processed += processed
+        return processed
+
+    # Workload and faults
+
+    def set_traffic(self, service: str, rps: float, at: Optional[float] = None):
+        """Sets the request rate of a service, now or at simulated time `at`."""
+        self.at(self.now if at is None else at, self._set_rate, service, rps)
+
+    def fail_node(self, node: str, at: Optional[float] = None, recover_after: Optional[float] = None):
+        """Fails a node; its pods are rescheduled after `reschedule_delay_s`."""
+        self.at(self.now if at is None else at, self._fail_node, node, recover_after)
+
+    def scale(self, service: str, replicas: int, at: Optional[float] = None):
+        self.at(self.now if at is None else at, self.cluster.scale_service, service, replicas)
+
+    def _set_rate(self, service: str, rps: float):
+        self._rates[service] = rps
+        self._seen_version = -1
+        self._window.setdefault(service, [0, 0.0, 0])
+        if rps > 0 and service not in self._arriving:
+            self._arriving.add(service)
+            self.schedule(self.rng.expovariate(rps), self._arrival, service)
+
+    def _fail_node(self, node: str, recover_after: Optional[float]):
+        self.cluster.fail_node(node)
+        self.schedule(self.reschedule_delay_s, self.cluster.schedule_pending)
+        if recover_after is not None:
+            self.schedule(recover_after, self.cluster.recover_node, node)
+
+    # Load model
+
+    def _arrival(self, service: str):
+        if self.cluster.version != self._seen_version:
+            self._refresh()
+        window = self._window[service]
+        ready = self._ready.get(service)
+        if ready:
+            i = self._cursor[service] = (self._cursor[service] + 1) % len(ready)
+            window[0] += 1
+            window[1] += ready[i] + (self.rng.random() - 0.5) * 10
+        else:
+            window[2] += 1
+        rate = self._rates[service]
+        if rate > 0:
+            self.schedule(self.rng.expovariate(rate), self._arrival, service)
+        else:
+            self._arriving.discard(service)
+
+    def _refresh(self):
+        """Rebuilds the ready-pod latencies after the cluster changed; new placements start up first."""
+        cluster = self.cluster
+        node_latency = {name: 20 + cluster._cpu_utilization(node) * 100 for name, node in cluster.nodes.items()}
+        placed, starting = {}, {}
+        for name, service in cluster.services.items():
+            ready = []
+            for pod_id, pod in service.pods.items():
+                node = pod.node_id
+                if node is None:
+                    continue
+                placed[pod_id] = node
+                if self._placed.get(pod_id) != node:
+                    token = starting[pod_id] = next(self._seq)
+                    self.schedule(self.startup_delay_s, self._pod_ready, pod_id, token)
+                elif pod_id in self._starting:
+                    starting[pod_id] = self._starting[pod_id]
+                else:
+                    ready.append(node_latency[node])
+            # M/M/1 waiting time at the service's current load per ready pod
+            if ready:
+                wait_ms = queueing_delay_ms(self._rates.get(name, 0.0), len(ready), self.pod_capacity_rps)
+                ready = [latency + wait_ms for latency in ready]
+            self._ready[name] = ready
+            self._cursor.setdefault(name, 0)
+        self._placed, self._starting = placed, starting
+        self._seen_version = cluster.version
+
+    def _pod_ready(self, pod_id: str, token: int):
+        if self._starting.get(pod_id) == token:
+            del self._starting[pod_id]
+            self._seen_version = -1
+
+    # SLA tracking
+
+    def _sample(self):
+        observed = {}
+        for service, window in self._window.items():
+            served, latency_sum, timed_out = window
+            if served or timed_out:
+                observed[service] = (latency_sum + timed_out * self.timeout_ms) / (served + timed_out)
+            window[0], window[1], window[2] = 0, 0.0, 0
+        self._observed = observed
+        # The load per pod changes with the rate even when the cluster does not
+        self._seen_version = -1
+
+        report = sla.evaluate(self.cluster.get_metrics(), self.slas)
+        self.history.append({"time": self.now, "latency_ms": observed, "ok": report["ok"],
+                             "violations": len(report["services"]) + len(report["nodes"])})
+        open_incident = self.incidents[-1] if self.incidents and self.incidents[-1]["end"] is None else None
+        if not report["ok"] and open_incident is None:
+            self.incidents.append({"start": self.now, "end": None,
+                                   "services": [v["service"] for v in report["services"]],
+                                   "hot_nodes": len(report["nodes"])})
+        elif report["ok"] and open_incident is not None:
+            open_incident["end"] = self.now
+
+    def observed_latency(self) -> Dict[str, float]:
+        """Average request latency (ms) per service over the last complete window."""
+        return dict(self._observed)
+
+    def restore_times(self) -> List[float]:
+        """Seconds from the first SLA violation to recovery, per resolved incident."""
+        return [incident["end"] - incident["start"] for incident in self.incidents if incident["end"] is not None]
@@ -0,0 +1,569 @@
+"""NumPy-backed cluster state for large what-if simulations.
+
+`ArrayCluster` is a drop-in alternative to `k8s_sim.Cluster`: node capacities and
+usage, pod requests and pod-to-node assignments live in flat NumPy columns, and
+`Pod`/`Node`/`Service` objects are replaced by `__slots__` handles that read from
+those columns on demand. Pod IDs are derived from the array slot instead of a
+uuid4 string, so 100k pods cost a few megabytes instead of 100k Python objects.
+
+Scheduling strategies, placement reports, scale-down victim order, move_pod
+checks and the get_metrics layout match `Cluster`.
+"""
+import heapq
+import time
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from orchestrator.k8s_sim import LATENCY_JITTER_MS, Cluster
+from orchestrator.scheduler import DEFAULT_STRATEGY, make_scheduler
+
+# Pod slot markers in the assignment column
+PENDING = -1
+FREE = -2
+
+class PodHandle:
+    __slots__ = ("_cluster", "_slot")
+
+    def __init__(self, cluster: "ArrayCluster", slot: int):
+        self._cluster = cluster
+        self._slot = slot
+
+    @property
+    def id(self) -> str:
+        return self._cluster._pod_id(self._slot)
+
+    @property
+    def service_name(self) -> str:
+        return self._cluster._service_names[self._cluster._pod_service[self._slot]]
+
+    @property
+    def cpu_request(self) -> float:
+        return float(self._cluster._pod_cpu[self._slot])
+
+    @property
+    def memory_request(self) -> float:
+        return float(self._cluster._pod_memory[self._slot])
+
+    @property
+    def node_id(self) -> Optional[str]:
+        node = self._cluster._pod_node[self._slot]
+        return self._cluster._node_names[node] if node >= 0 else None
+
+    @property
+    def status(self) -> str:
+        return "Running" if self._cluster._pod_node[self._slot] >= 0 else "Pending"
+
+    def __repr__(self):
+        return f"<Pod {self.id} ({self.service_name}) on {self.node_id}>"
+
+class NodeHandle:
+    __slots__ = ("_cluster", "_index")
+
+    def __init__(self, cluster: "ArrayCluster", index: int):
+        self._cluster = cluster
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        return self._cluster._node_names[self._index]
+
+    @property
+    def cpu_capacity(self) -> float:
+        return float(self._cluster._cpu_capacity[self._index])
+
+    @property
+    def memory_capacity(self) -> float:
+        return float(self._cluster._memory_capacity[self._index])
+
+    @property
+    def cpu_usage(self) -> float:
+        return float(self._cluster._cpu_usage[self._index])
+
+    @property
+    def memory_usage(self) -> float:
+        return float(self._cluster._memory_usage[self._index])
+
+    @property
+    def pods(self) -> Dict[str, PodHandle]:
+        c = self._cluster
+        return c._pods_where(c._pod_node[:c._pod_slots] == self._index)
+
+    def __repr__(self):
+        return f"<Node {self.name} CPU:{self.cpu_usage}/{self.cpu_capacity}>"
+
+class ServiceHandle:
+    __slots__ = ("_cluster", "_index")
+
+    def __init__(self, cluster: "ArrayCluster", index: int):
+        self._cluster = cluster
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        return self._cluster._service_names[self._index]
+
+    @property
+    def cpu_request(self) -> float:
+        return self._cluster._service_requests[self._index][0]
+
+    @property
+    def memory_request(self) -> float:
+        return self._cluster._service_requests[self._index][1]
+
+    @property
+    def pods(self) -> Dict[str, PodHandle]:
+        return self._cluster._pods_where(self._cluster._service_mask(self._index))
+
+    @property
+    def pending(self) -> Dict[str, PodHandle]:
+        c = self._cluster
+        return c._pods_where(c._service_mask(self._index) & (c._pod_node[:c._pod_slots] == PENDING))
+
+    @property
+    def running_count(self) -> int:
+        c = self._cluster
+        return int(np.count_nonzero(c._service_mask(self._index) & (c._pod_node[:c._pod_slots] >= 0)))
+
+class _HandleView(Mapping):
+    """Read-only name -> handle mapping, so `cluster.nodes[...]` keeps working."""
+
+    def __init__(self, names: List[str], index: Dict[str, int], factory: Callable):
+        self._names = names
+        self._index = index
+        self._factory = factory
+
+    def __getitem__(self, name: str):
+        return self._factory(self._index[name])
+
+    def __contains__(self, name) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._names))
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+def _grown(array: np.ndarray, size: int, fill) -> np.ndarray:
+    grown = np.full(max(size, 2 * len(array), 16), fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+class ArrayCluster:
+    def __init__(self, consistency_checks: bool = False, strategy: str = DEFAULT_STRATEGY,
+                 seed: Optional[int] = None):
+        self.consistency_checks = consistency_checks
+        make_scheduler(strategy)
+        self.strategy = strategy
+        self.rng = np.random.default_rng(seed)
+        # Same hooks as Cluster: metric timestamps and an optional observed service latency source
+        self.clock: Callable[[], float] = time.time
+        self.latency_source: Optional[Callable[[], Dict[str, float]]] = None
+        # Bumped by every mutation; get_metrics reuses its per-service aggregation until it changes
+        self.version = 0
+        self._metrics_version = -1
+        self._service_stats: Optional[Tuple] = None
+
+        # Node columns; only the first len(self._node_names) rows are live
+        self._node_names: List[str] = []
+        self._node_index: Dict[str, int] = {}
+        self._cpu_capacity = np.zeros(0)
+        self._memory_capacity = np.zeros(0)
+        self._cpu_usage = np.zeros(0)
+        self._memory_usage = np.zeros(0)
+        self._node_pod_count = np.zeros(0, dtype=np.int64)
+
+        # Pod columns; freed slots are recycled with a bumped generation so stale IDs stay invalid
+        self._pod_slots = 0
+        self._free_slots: List[int] = []
+        self._pod_cpu = np.zeros(0)
+        self._pod_memory = np.zeros(0)
+        self._pod_node = np.zeros(0, dtype=np.int32)
+        self._pod_service = np.zeros(0, dtype=np.int32)
+        # Bumped each time a slot is reused; wide enough that a stale pod ID never resolves again
+        self._pod_generation = np.zeros(0, dtype=np.uint32)
+
+        self._service_names: List[str] = []
+        self._service_index: Dict[str, int] = {}
+        self._service_requests: List[Tuple[float, float]] = []
+
+        self.nodes = _HandleView(self._node_names, self._node_index, lambda i: NodeHandle(self, i))
+        self.services = _HandleView(self._service_names, self._service_index, lambda i: ServiceHandle(self, i))
+
+    # --- Pod slots ---
+
+    def _pod_id(self, slot: int) -> str:
+        # 8 hex digits like Cluster's pod IDs; the generation takes more digits after 255 reuses
+        return f"{slot:06x}{int(self._pod_generation[slot]):02x}"
+
+    def _slot_of(self, pod_id: str) -> int:
+        try:
+            slot, generation = int(pod_id[:6], 16), int(pod_id[6:], 16)
+        except ValueError:
+            raise ValueError(f"Pod {pod_id} not found")
+        if (len(pod_id) < 8 or slot >= self._pod_slots or self._pod_node[slot] == FREE
+                or self._pod_generation[slot] != generation):
+            raise ValueError(f"Pod {pod_id} not found")
+        return slot
+
+    def _pods_where(self, mask: np.ndarray) -> Dict[str, PodHandle]:
+        return {self._pod_id(slot): PodHandle(self, slot) for slot in np.flatnonzero(mask[:self._pod_slots]).tolist()}
+
+    def _service_mask(self, service: int) -> np.ndarray:
+        n = self._pod_slots
+        return (self._pod_service[:n] == service) & (self._pod_node[:n] != FREE)
+
+    def _allocate_pods(self, service: int, count: int) -> List[int]:
+        reused = self._free_slots[-count:] if count else []
+        del self._free_slots[len(self._free_slots) - len(reused):]
+        fresh = count - len(reused)
+        if self._pod_slots + fresh > len(self._pod_node):
+            size = self._pod_slots + fresh
+            self._pod_cpu = _grown(self._pod_cpu, size, 0.0)
+            self._pod_memory = _grown(self._pod_memory, size, 0.0)
+            self._pod_node = _grown(self._pod_node, size, FREE)
+            self._pod_service = _grown(self._pod_service, size, -1)
+            self._pod_generation = _grown(self._pod_generation, size, 0)
+        slots = reused + list(range(self._pod_slots, self._pod_slots + fresh))
+        self._pod_slots += fresh
+        cpu, memory = self._service_requests[service]
+        self._pod_cpu[slots] = cpu
+        self._pod_memory[slots] = memory
+        self._pod_node[slots] = PENDING
+        self._pod_service[slots] = service
+        self.version += 1
+        return slots
+
+    def _free_pod(self, slot: int):
+        if self._pod_node[slot] >= 0:
+            self._unbind(slot)
+        self._pod_node[slot] = FREE
+        self._pod_generation[slot] += 1
+        self._free_slots.append(slot)
+        self.version += 1
+
+    def get_pod(self, pod_id: str) -> Tuple[PodHandle, Optional[NodeHandle]]:
+        slot = self._slot_of(pod_id)
+        node = int(self._pod_node[slot])
+        return PodHandle(self, slot), (NodeHandle(self, node) if node >= 0 else None)
+
+    # --- Placement primitives ---
+
+    def _fits(self, node: int, cpu: float, memory: float) -> bool:
+        return (self._cpu_usage[node] + cpu <= self._cpu_capacity[node]
+                and self._memory_usage[node] + memory <= self._memory_capacity[node])
+
+    def _bind(self, slot: int, node: int) -> bool:
+        cpu, memory = self._pod_cpu[slot], self._pod_memory[slot]
+        if not self._fits(node, cpu, memory):
+            return False
+        self._cpu_usage[node] += cpu
+        self._memory_usage[node] += memory
+        self._node_pod_count[node] += 1
+        self._pod_node[slot] = node
+        self.version += 1
+        return True
+
+    def _unbind(self, slot: int):
+        node = self._pod_node[slot]
+        self._node_pod_count[node] -= 1
+        if self._node_pod_count[node]:
+            self._cpu_usage[node] -= self._pod_cpu[slot]
+            self._memory_usage[node] -= self._pod_memory[slot]
+        else:
+            # Same reset as Node.remove_pod so float error cannot accumulate on idle nodes
+            self._cpu_usage[node] = 0.0
+            self._memory_usage[node] = 0.0
+        self._pod_node[slot] = PENDING
+        self.version += 1
+
+    def _select(self, cpu: float, memory: float, strategy: Optional[str] = None,
+                exclude: Optional[np.ndarray] = None) -> Optional[int]:
+        """Vectorised equivalent of `Scheduler.select`; returns a node row or None."""
+        strategy = strategy or self.strategy
+        n = len(self._node_names)
+        cpu_capacity, memory_capacity = self._cpu_capacity[:n], self._memory_capacity[:n]
+        cpu_usage, memory_usage = self._cpu_usage[:n], self._memory_usage[:n]
+        fit = (cpu_usage + cpu <= cpu_capacity) & (memory_usage + memory <= memory_capacity)
+        if exclude is not None:
+            fit &= ~exclude[:n]
+        candidates = np.flatnonzero(fit)
+        if not len(candidates):
+            return None
+        if strategy == "first-fit":
+            return int(candidates[0])
+
+        cpu_free = cpu_capacity[candidates] - cpu_usage[candidates]
+        memory_free = memory_capacity[candidates] - memory_usage[candidates]
+        if strategy == "spread":
+            return int(candidates[np.argmin(self._spread_score(candidates))])
+        if strategy == "dominant-resource":
+            cpu_share = cpu / cpu_capacity.sum() if cpu_capacity.sum() > 0 else 0
+            memory_share = memory / memory_capacity.sum() if memory_capacity.sum() > 0 else 0
+            if cpu_share < memory_share:
+                cpu_free, memory_free = memory_free, cpu_free
+        # best-fit (and dominant-resource on its dominant axis): least free first, then row order
+        return int(candidates[np.lexsort((candidates, memory_free, cpu_free))[0]])
+
+    def _spread_score(self, nodes: np.ndarray) -> np.ndarray:
+        # Same arithmetic as SpreadScheduler so ties break identically
+        cpu_capacity, memory_capacity = self._cpu_capacity[nodes], self._memory_capacity[nodes]
+        cpu_free = np.where(cpu_capacity > 0, 1 - self._cpu_usage[nodes] / np.where(cpu_capacity > 0, cpu_capacity, 1), 0)
+        memory_free = np.where(memory_capacity > 0,
+                               1 - self._memory_usage[nodes] / np.where(memory_capacity > 0, memory_capacity, 1), 0)
+        return -(cpu_free + memory_free) / 2
+
+    def _place_pods(self, slots: List[int], strategy: Optional[str] = None) -> Dict[str, int]:
+        placed: Dict[str, int] = {}
+        if not slots:
+            return placed
+        strategy = strategy or self.strategy
+        cpu, memory = float(self._pod_cpu[slots[0]]), float(self._pod_memory[slots[0]])
+        remaining = iter(slots)
+        slot = next(remaining, None)
+
+        if strategy == "spread":
+            # Only the node that just received a pod changes score, so a heap re-ranks in O(log N)
+            n = len(self._node_names)
+            candidates = np.flatnonzero((self._cpu_usage[:n] + cpu <= self._cpu_capacity[:n])
+                                        & (self._memory_usage[:n] + memory <= self._memory_capacity[:n]))
+            heap = list(zip(self._spread_score(candidates).tolist(), candidates.tolist()))
+            heapq.heapify(heap)
+            while slot is not None and heap:
+                _, node = heapq.heappop(heap)
+                self._bind(slot, node)
+                placed[self._node_names[node]] = placed.get(self._node_names[node], 0) + 1
+                slot = next(remaining, None)
+                if self._fits(node, cpu, memory):
+                    heapq.heappush(heap, (float(self._spread_score(np.array([node]))[0]), node))
+            return placed
+
+        # Packing strategies keep filling the chosen node, as Scheduler.fill does
+        while slot is not None:
+            node = self._select(cpu, memory, strategy)
+            if node is None:
+                break
+            name = self._node_names[node]
+            while slot is not None and self._bind(slot, node):
+                placed[name] = placed.get(name, 0) + 1
+                slot = next(remaining, None)
+        return placed
+
+    # --- Cluster API ---
+
+    def verify_consistency(self):
+        n, live = len(self._node_names), self._pod_node[:self._pod_slots]
+        running = live >= 0
+        hosts = live[running]
+        counts = np.bincount(hosts, minlength=n)
+        cpu = np.bincount(hosts, weights=self._pod_cpu[:self._pod_slots][running], minlength=n)
+        memory = np.bincount(hosts, weights=self._pod_memory[:self._pod_slots][running], minlength=n)
+        if not np.array_equal(counts, self._node_pod_count[:n]):
+            raise AssertionError("Node pod counts out of sync with pod assignments")
+        if not (np.allclose(cpu, self._cpu_usage[:n], rtol=1e-9, atol=1e-9)
+                and np.allclose(memory, self._memory_usage[:n], rtol=1e-9, atol=1e-9)):
+            raise AssertionError("Node usage counters out of sync with pod assignments")
+
+    def add_node(self, name: str, cpu_capacity: float, memory_capacity: float):
+        if name in self._node_index:
+            row = self._node_index[name]
+        else:
+            row = len(self._node_names)
+            if row >= len(self._cpu_capacity):
+                self._cpu_capacity = _grown(self._cpu_capacity, row + 1, 0.0)
+                self._memory_capacity = _grown(self._memory_capacity, row + 1, 0.0)
+                self._cpu_usage = _grown(self._cpu_usage, row + 1, 0.0)
+                self._memory_usage = _grown(self._memory_usage, row + 1, 0.0)
+                self._node_pod_count = _grown(self._node_pod_count, row + 1, 0)
+            self._node_index[name] = row
+            self._node_names.append(name)
+        self._cpu_capacity[row] = cpu_capacity
+        self._memory_capacity[row] = memory_capacity
+        self.version += 1
+
+    def deploy_service(self, name: str, replicas: int, cpu_request: float, memory_request: float,
+                       strategy: Optional[str] = None) -> Dict:
+        if name in self._service_index:
+            service = self._service_index[name]
+            # Redeploying replaces the service, so its old pods must not linger on the nodes
+            for slot in np.flatnonzero(self._service_mask(service)).tolist():
+                self._free_pod(slot)
+        else:
+            service = len(self._service_names)
+            self._service_index[name] = service
+            self._service_names.append(name)
+            self._service_requests.append((0.0, 0.0))
+        self._service_requests[service] = (cpu_request, memory_request)
+        self.version += 1
+        return self.scale_service(name, replicas, strategy=strategy)
+
+    def scale_service(self, service_name: str, replicas: int, strategy: Optional[str] = None) -> Dict:
+        if service_name not in self._service_index:
+            raise ValueError(f"Service {service_name} not found")
+        service = self._service_index[service_name]
+        if strategy:
+            make_scheduler(strategy)
+        mask = self._service_mask(service)
+        current_count = int(np.count_nonzero(mask))
+        placed: Dict[str, int] = {}
+        removed = 0
+
+        if replicas > current_count:
+            placed = self._place_pods(self._allocate_pods(service, replicas - current_count), strategy)
+        elif replicas < current_count:
+            removed = current_count - replicas
+            self._remove_replicas(mask, removed)
+
+        if self.consistency_checks:
+            self.verify_consistency()
+
+        mask = self._service_mask(service)
+        running = int(np.count_nonzero(mask & (self._pod_node[:self._pod_slots] >= 0)))
+        return {
+            "service": service_name,
+            "replicas": replicas,
+            "running": running,
+            "pending": int(np.count_nonzero(mask)) - running,
+            "removed": removed,
+            "placed": placed,
+        }
+
+    def _remove_replicas(self, mask: np.ndarray, count: int):
+        nodes = self._pod_node[:self._pod_slots]
+        for slot in np.flatnonzero(mask & (nodes == PENDING))[:count].tolist():
+            self._free_pod(slot)
+            count -= 1
+        if count <= 0:
+            return
+        running = np.flatnonzero(mask & (nodes >= 0))
+        by_node: Dict[int, List[int]] = {}
+        for slot, node in zip(running.tolist(), nodes[running].tolist()):
+            by_node.setdefault(node, []).append(slot)
+        # Most CPU-loaded hosting node first, re-ranked after every removal (as Cluster does)
+        heap = [(-self._cpu_utilization(node), self._node_names[node], node) for node in by_node]
+        heapq.heapify(heap)
+        while count > 0 and heap:
+            _, name, node = heapq.heappop(heap)
+            self._free_pod(by_node[node].pop(0))
+            count -= 1
+            if by_node[node]:
+                heapq.heappush(heap, (-self._cpu_utilization(node), name, node))
+
+    def _cpu_utilization(self, node: int) -> float:
+        capacity = self._cpu_capacity[node]
+        return float(self._cpu_usage[node] / capacity) if capacity > 0 else 0
+
+    # Works unchanged on top of the handle views
+    apply_manifest = Cluster.apply_manifest
+    _apply_latency_source = Cluster._apply_latency_source
+
+    def move_pod(self, pod_id: str, target_node_name: str):
+        slot = self._slot_of(pod_id)
+        source = int(self._pod_node[slot])
+        if source < 0:
+            raise ValueError(f"Pod {pod_id} is Pending and not running on any node")
+        if target_node_name not in self._node_index:
+            raise ValueError(f"Target node {target_node_name} not found")
+        target = self._node_index[target_node_name]
+        if target == source:
+            return
+
+        # Same checks and errors as Cluster.move_pod
+        if self._cpu_usage[target] + self._pod_cpu[slot] > self._cpu_capacity[target]:
+            raise ValueError(f"Target node {target_node_name} has insufficient CPU")
+        if self._memory_usage[target] + self._pod_memory[slot] > self._memory_capacity[target]:
+            raise ValueError(f"Target node {target_node_name} has insufficient memory")
+
+        self._unbind(slot)
+        if not self._bind(slot, target):
+            self._bind(slot, source)
+            raise ValueError(f"Failed to move pod to {target_node_name}")
+
+        if self.consistency_checks:
+            self.verify_consistency()
+
+    def rebalance(self, cpu_threshold_pct: float = 80.0, strategy: str = "spread") -> Dict:
+        threshold = cpu_threshold_pct / 100
+        n = len(self._node_names)
+        capacity = self._cpu_capacity[:n]
+        utilization = np.divide(self._cpu_usage[:n], capacity, out=np.zeros(n), where=capacity > 0)
+        hot_mask = utilization > threshold
+        hot = sorted(np.flatnonzero(hot_mask).tolist(), key=lambda node: -utilization[node])
+        moves = []
+        for node in hot:
+            slots = np.flatnonzero(self._pod_node[:self._pod_slots] == node)
+            for slot in slots[np.argsort(-self._pod_cpu[slots], kind="stable")].tolist():
+                if self._cpu_utilization(node) <= threshold:
+                    break
+                cpu, memory = self._pod_cpu[slot], self._pod_memory[slot]
+                target = self._select(cpu, memory, strategy, exclude=hot_mask)
+                if target is None or self._cpu_usage[target] + cpu > threshold * self._cpu_capacity[target]:
+                    continue
+                pod_id = self._pod_id(slot)
+                self.move_pod(pod_id, self._node_names[target])
+                moves.append({"pod_id": pod_id, "service": self._service_names[self._pod_service[slot]],
+                              "from": self._node_names[node], "to": self._node_names[target]})
+        return {
+            "moves": moves,
+            "hot_nodes": [self._node_names[node] for node in hot],
+            "still_hot": [self._node_names[node] for node in hot if self._cpu_utilization(node) > threshold],
+        }
+
+    def get_metrics(self, jitter: bool = True) -> Dict:
+        n = len(self._node_names)
+        capacity, usage = self._cpu_capacity[:n], self._cpu_usage[:n]
+        utilization = np.divide(usage, capacity, out=np.zeros(n), where=capacity > 0)
+        # Latency increases with load: 20ms base + up to 100ms from CPU utilization, +/-5ms jitter
+        latency = 20 + utilization * 100
+        if jitter:
+            latency = latency + self.rng.uniform(-LATENCY_JITTER_MS, LATENCY_JITTER_MS, n)
+
+        metrics = {"timestamp": self.clock(), "nodes": {}, "services": {}}
+        for name, cpu, cap, util, memory, pods, lat in zip(
+                self._node_names, usage.tolist(), capacity.tolist(), (utilization * 100).tolist(),
+                self._memory_usage[:n].tolist(), self._node_pod_count[:n].tolist(), latency.tolist()):
+            metrics["nodes"][name] = {
+                "cpu_usage": cpu,
+                "cpu_capacity": cap,
+                "cpu_utilization_pct": util,
+                "memory_usage": memory,
+                "pod_count": pods,
+                "latency_ms": lat,
+            }
+
+        # Service latency is the average of its pods' node latencies
+        s = len(self._service_names)
+        if self._metrics_version != self.version:
+            # Collapse running pods into (service, node, count) triples once per state change
+            nodes, services = self._pod_node[:self._pod_slots], self._pod_service[:self._pod_slots]
+            running = nodes >= 0
+            pairs, counts = np.unique(services[running].astype(np.int64) * max(n, 1) + nodes[running],
+                                      return_counts=True)
+            self._service_stats = (
+                pairs // max(n, 1), pairs % max(n, 1), counts.astype(float),
+                np.bincount(services[nodes != FREE], minlength=s), np.bincount(services[running], minlength=s),
+            )
+            self._metrics_version = self.version
+        service_rows, node_rows, counts, pod_count, running_count = self._service_stats
+        latency_sum = np.bincount(service_rows, weights=counts * latency[node_rows], minlength=s)
+        avg_latency = np.divide(latency_sum, running_count, out=np.zeros(s), where=running_count > 0)
+        for name, pods, run, avg in zip(self._service_names, pod_count.tolist(), running_count.tolist(),
+                                        avg_latency.tolist()):
+            metrics["services"][name] = {
+                "pod_count": pods,
+                "running_pods": run,
+                "avg_latency_ms": avg,
+                "request_completion_rate": max(0, 100 - (avg / 5)),
+            }
+        if self.latency_source is not None:
+            self._apply_latency_source(metrics)
+
+        total_capacity = float(capacity.sum())
+        metrics["cluster"] = {
+            "total_nodes": n,
+            "total_pods": int(self._node_pod_count[:n].sum()),
+            "overall_cpu_utilization_pct": (float(usage.sum()) / total_capacity * 100) if total_capacity > 0 else 0,
+        }
+        return metrics
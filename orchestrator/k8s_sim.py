@@ -1,11 +1,21 @@
-import random
+import heapq
+import math
+import threading
 import uuid
 import time
-from typing import Dict, List, Optional
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from orchestrator.scheduler import DEFAULT_STRATEGY, Scheduler, fits, make_scheduler
+
+# get_metrics(jitter=True) adds up to this much noise, either way, to each node's latency
+LATENCY_JITTER_MS = 5.0
 
 class Pod:
-    def __init__(self, service_name: str, cpu_request: float, memory_request: float):
-        self.id = str(uuid.uuid4())[:8]
+    def __init__(self, service_name: str, cpu_request: float, memory_request: float, pod_id: Optional[str] = None):
+        self.id = pod_id or str(uuid.uuid4())[:8]
         self.service_name = service_name
         self.cpu_request = cpu_request
         self.memory_request = memory_request
@@ -21,21 +31,40 @@ class Node:
         self.cpu_capacity = cpu_capacity
         self.memory_capacity = memory_capacity
         self.pods: Dict[str, Pod] = {}
+        # Hosted pods grouped by service, so a service's pods here are found without scanning
+        self.service_pods: Dict[str, Dict[str, Pod]] = {}
+        # Running totals of the hosted pods' requests, kept in sync by add_pod/remove_pod
+        self._cpu_usage = 0.0
+        self._memory_usage = 0.0
+        # Held by the cluster around every change to this node's pods or capacity
+        self.lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
 
     @property
     def cpu_usage(self) -> float:
-        return sum(p.cpu_request for p in self.pods.values())
+        return self._cpu_usage
 
     @property
     def memory_usage(self) -> float:
-        return sum(p.memory_request for p in self.pods.values())
+        return self._memory_usage
 
     def add_pod(self, pod: Pod) -> bool:
-        if self.cpu_usage + pod.cpu_request > self.cpu_capacity:
+        if self._cpu_usage + pod.cpu_request > self.cpu_capacity:
             return False
-        if self.memory_usage + pod.memory_request > self.memory_capacity:
+        if self._memory_usage + pod.memory_request > self.memory_capacity:
             return False
         self.pods[pod.id] = pod
+        self.service_pods.setdefault(pod.service_name, {})[pod.id] = pod
+        self._cpu_usage += pod.cpu_request
+        self._memory_usage += pod.memory_request
         pod.node_id = self.name
         pod.status = "Running"
         return True
@@ -43,11 +72,36 @@ class Node:
     def remove_pod(self, pod_id: str) -> Optional[Pod]:
         if pod_id in self.pods:
             pod = self.pods.pop(pod_id)
+            same_service = self.service_pods[pod.service_name]
+            del same_service[pod_id]
+            if not same_service:
+                del self.service_pods[pod.service_name]
+            if self.pods:
+                self._cpu_usage -= pod.cpu_request
+                self._memory_usage -= pod.memory_request
+            else:
+                # Reset instead of subtracting so float error cannot accumulate on idle nodes
+                self._cpu_usage = 0.0
+                self._memory_usage = 0.0
             pod.node_id = None
             pod.status = "Pending"
             return pod
         return None
 
+    def recount(self) -> Tuple[float, float]:
+        """Full O(pods) recount of (cpu, memory) usage, bypassing the running counters."""
+        return (
+            sum(p.cpu_request for p in self.pods.values()),
+            sum(p.memory_request for p in self.pods.values()),
+        )
+
+    def verify_usage(self):
+        cpu, memory = self.recount()
+        if not math.isclose(self._cpu_usage, cpu, rel_tol=1e-9, abs_tol=1e-9):
+            raise AssertionError(f"Node {self.name}: cpu counter {self._cpu_usage} != recount {cpu}")
+        if not math.isclose(self._memory_usage, memory, rel_tol=1e-9, abs_tol=1e-9):
+            raise AssertionError(f"Node {self.name}: memory counter {self._memory_usage} != recount {memory}")
+
     def __repr__(self):
         return f"<Node {self.name} CPU:{self.cpu_usage}/{self.cpu_capacity}>"
 
@@ -57,136 +111,799 @@ class Service:
         self.cpu_request = cpu_request
         self.memory_request = memory_request
         self.pods: Dict[str, Pod] = {}
+        # Pods not placed on any node, and how many of the others run on each node
+        self.pending: Dict[str, Pod] = {}
+        self.placements: Dict[str, int] = {}
+
+    @property
+    def running_count(self) -> int:
+        return len(self.pods) - len(self.pending)
 
 class Cluster:
-    def __init__(self):
+    def __init__(self, consistency_checks: bool = False, strategy: str = DEFAULT_STRATEGY,
+                 seed: Optional[int] = None):
         self.nodes: Dict[str, Node] = {}
         self.services: Dict[str, Service] = {}
+        # When enabled, every mutation re-verifies the node usage counters against a full recount
+        self.consistency_checks = consistency_checks
+        # Default placement strategy; capacity indexes are built lazily per strategy in use
+        make_scheduler(strategy)
+        self.strategy = strategy
+        self._schedulers: Dict[str, Scheduler] = {}
+        # pod_id -> (pod, hosting node or None while Pending), kept in sync by every mutation
+        self._pod_index: Dict[str, Tuple[Pod, Optional[Node]]] = {}
+
+        # Bumped by every mutation; lets callers tell whether cached views are stale
+        self.version = 0
+        # Source of the latency jitter in get_metrics
+        self.rng = np.random.default_rng(seed)
+        # Time source for metric timestamps; a des.Simulation swaps in its simulated clock
+        self.clock: Callable[[], float] = time.time
+        # Optional service -> observed latency (ms) source replacing the synthetic service latency,
+        # e.g. the request-level load model of a des.Simulation
+        self.latency_source: Optional[Callable[[], Dict[str, float]]] = None
+        # Capacities of failed nodes, restored by recover_node
+        self._failed: Dict[str, Tuple[float, float]] = {}
+        # Known request rate (rps) per service, e.g. set by a des.Simulation; what-if predictions
+        # use it for queueing delay
+        self.request_rates: Dict[str, float] = {}
+        # Concurrent callers (threads, parallel tool calls) take locks in this order: the lock of
+        # the service they change, then node locks in name order, then _index_lock. The index lock
+        # guards the shared indexes, schedulers and caches and is only held for bookkeeping.
+        self._index_lock = threading.RLock()
+        self._service_locks: Dict[str, threading.RLock] = {}
+        # Per-thread state, e.g. the undo journal
+        self._local = threading.local()
+        # Names of the nodes and services and IDs of the pods changed since the last
+        # take_changes(), while track_changes() is on
+        self._changed: Optional[Dict[str, Set[str]]] = None
+        # get_metrics cache: per-node structural stats are recomputed only for dirty nodes,
+        # the per-service aggregation only after placements changed
+        self._metrics_rows: Dict[str, int] = {}
+        self._node_stats: List[Dict] = []
+        self._base_latency = np.zeros(0)
+        self._dirty_nodes: Set[str] = set()
+        self._services_dirty = True
+        self._service_stats: Optional[Tuple] = None
+        self._cluster_stats: Optional[Dict] = None
+
+    def __getstate__(self):
+        # Locks and per-thread state cannot be copied or pickled; copies get fresh ones
+        state = self.__dict__.copy()
+        for name in ("_index_lock", "_service_locks", "_local"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._index_lock = threading.RLock()
+        self._service_locks = {}
+        self._local = threading.local()
+
+    @property
+    def _journal(self) -> Optional[List[Tuple[Callable, tuple]]]:
+        """This thread's undo log of (inverse method, args) since its last checkpoint(), or None."""
+        return getattr(self._local, "journal", None)
+
+    @_journal.setter
+    def _journal(self, journal: Optional[List[Tuple[Callable, tuple]]]):
+        self._local.journal = journal
+
+    def _service_lock(self, name: str) -> threading.RLock:
+        # Keyed by name rather than stored on Service, so a redeploy cannot hand out a second lock
+        with self._index_lock:
+            return self._service_locks.setdefault(name, threading.RLock())
+
+    @contextmanager
+    def _locked(self, nodes: Iterable[Node]) -> Iterator[None]:
+        """Holds the locks of `nodes`, taken in name order so concurrent callers cannot deadlock."""
+        with ExitStack() as stack:
+            for _, node in sorted({node.name: node for node in nodes}.items()):
+                stack.enter_context(node.lock)
+            yield
+
+    def _scheduler(self, strategy: Optional[str] = None) -> Scheduler:
+        strategy = strategy or self.strategy
+        with self._index_lock:
+            scheduler = self._schedulers.get(strategy)
+            if scheduler is None:
+                scheduler = make_scheduler(strategy)
+                for node in self.nodes.values():
+                    scheduler.add_node(node)
+                self._schedulers[strategy] = scheduler
+            return scheduler
+
+    def _node_changed(self, node: Node):
+        with self._index_lock:
+            for scheduler in self._schedulers.values():
+                scheduler.update(node)
+            self._dirty_nodes.add(node.name)
+            self._touch()
+
+    def _touch(self):
+        with self._index_lock:
+            self.version += 1
+            self._services_dirty = True
+
+    def get_pod(self, pod_id: str) -> Tuple[Pod, Optional[Node]]:
+        entry = self._pod_index.get(pod_id)
+        if entry is None:
+            raise ValueError(f"Pod {pod_id} not found")
+        return entry
+
+    def _register_pod(self, service: Service, pod: Pod):
+        with self._index_lock:
+            # 8-hex-digit IDs collide in large clusters (~50% at 80k pods); a clash would
+            # silently replace the other pod in every index
+            while pod.id in self._pod_index:
+                pod.id = str(uuid.uuid4())[:8]
+            service.pods[pod.id] = pod
+            service.pending[pod.id] = pod
+            self._pod_index[pod.id] = (pod, None)
+            if self._journal is not None:
+                self._journal.append((self._unregister_pod, (service, pod)))
+            if self._changed is not None:
+                self._changed["pods"].add(pod.id)
+            self._touch()
+
+    def _unregister_pod(self, service: Service, pod: Pod):
+        with self._index_lock:
+            del service.pods[pod.id]
+            del service.pending[pod.id]
+            del self._pod_index[pod.id]
+            if self._journal is not None:
+                self._journal.append((self._register_pod, (service, pod)))
+            if self._changed is not None:
+                self._changed["pods"].add(pod.id)
+            self._touch()
+
+    def _put_service(self, name: str, service: Optional[Service]):
+        with self._index_lock:
+            previous = self.services.pop(name, None)
+            if service is not None:
+                self.services[name] = service
+            if self._journal is not None:
+                self._journal.append((self._put_service, (name, previous)))
+            if self._changed is not None:
+                self._changed["services"].add(name)
+            self._touch()
+
+    def _bind(self, pod: Pod, node: Node) -> bool:
+        # The capacity check in add_pod and the placement happen under the node's lock,
+        # so concurrent binds can never oversubscribe it; the unlocked check only rejects early
+        if not fits(node, pod.cpu_request, pod.memory_request):
+            return False
+        with node.lock:
+            if not node.add_pod(pod):
+                return False
+            with self._index_lock:
+                service = self.services[pod.service_name]
+                del service.pending[pod.id]
+                service.placements[node.name] = service.placements.get(node.name, 0) + 1
+                self._pod_index[pod.id] = (pod, node)
+                if self._journal is not None:
+                    self._journal.append((self._unbind, (pod, node)))
+                if self._changed is not None:
+                    self._changed["pods"].add(pod.id)
+                self._node_changed(node)
+        return True
+
+    def _unbind(self, pod: Pod, node: Node):
+        with node.lock:
+            node.remove_pod(pod.id)
+            with self._index_lock:
+                service = self.services[pod.service_name]
+                self._drop_placement(service, node.name)
+                service.pending[pod.id] = pod
+                self._pod_index[pod.id] = (pod, None)
+                if self._journal is not None:
+                    self._journal.append((self._bind, (pod, node)))
+                if self._changed is not None:
+                    self._changed["pods"].add(pod.id)
+                self._node_changed(node)
+
+    @staticmethod
+    def _drop_placement(service: Service, node_name: str):
+        remaining = service.placements[node_name] - 1
+        if remaining:
+            service.placements[node_name] = remaining
+        else:
+            del service.placements[node_name]
+
+    def _transfer(self, pod: Pod, source: Node, target: Node) -> bool:
+        """Moves a running pod in one step under both node locks; it is never Pending on the way."""
+        with self._locked((source, target)):
+            if not fits(target, pod.cpu_request, pod.memory_request):
+                return False
+            source.remove_pod(pod.id)
+            target.add_pod(pod)
+            with self._index_lock:
+                service = self.services[pod.service_name]
+                self._drop_placement(service, source.name)
+                service.placements[target.name] = service.placements.get(target.name, 0) + 1
+                self._pod_index[pod.id] = (pod, target)
+                if self._journal is not None:
+                    self._journal.append((self._transfer, (pod, target, source)))
+                if self._changed is not None:
+                    self._changed["pods"].add(pod.id)
+                self._node_changed(source)
+                self._node_changed(target)
+        return True
+
+    def _delete_pod(self, pod: Pod):
+        # Callers hold the service's lock, so the pod can only move between nodes meanwhile
+        while True:
+            node = self._pod_index[pod.id][1]
+            if node is None:
+                break
+            with node.lock:
+                if self._pod_index[pod.id][1] is node:
+                    self._unbind(pod, node)
+                    break
+        self._unregister_pod(self.services[pod.service_name], pod)
+
+    def verify_consistency(self):
+        with self._locked(list(self.nodes.values())), self._index_lock:
+            for node in self.nodes.values():
+                node.verify_usage()
+                if node.cpu_usage > node.cpu_capacity + 1e-9 or node.memory_usage > node.memory_capacity + 1e-9:
+                    raise AssertionError(f"Node {node.name}: usage exceeds capacity")
+                for service_name, pods in node.service_pods.items():
+                    if self.services[service_name].placements.get(node.name) != len(pods):
+                        raise AssertionError(f"Node {node.name}: placement count of {service_name} out of sync")
+            for pod_id, (pod, node) in self._pod_index.items():
+                if (node.name if node else None) != pod.node_id:
+                    raise AssertionError(f"Pod {pod_id}: index says {node}, pod says {pod.node_id}")
+                if node is not None and node.pods.get(pod_id) is not pod:
+                    raise AssertionError(f"Pod {pod_id}: not hosted by {node.name}")
+
+    def snapshot(self) -> Dict:
+        """Plain-data (picklable) copy of the cluster state, for `restore` or `fork`."""
+        with self._locked(list(self.nodes.values())), self._index_lock:
+            return {
+                "strategy": self.strategy,
+                "nodes": [(name, node.cpu_capacity, node.memory_capacity) for name, node in self.nodes.items()],
+                "failed": dict(self._failed),
+                "services": [
+                    (name, service.cpu_request, service.memory_request,
+                     [(pod.id, pod.node_id) for pod in service.pods.values()])
+                    for name, service in self.services.items()
+                ],
+                "request_rates": dict(self.request_rates),
+            }
+
+    def restore(self, snapshot: Dict):
+        """Replaces the whole cluster state with a `snapshot`; pod IDs and placements are kept.
+
+        The indexes and usage counters are filled in directly rather than through a bind per
+        pod, since the snapshot is already consistent. Unlike the other mutations this is not
+        safe while other threads use the cluster, and it is not recorded by `track_changes`.
+        """
+        nodes = {name: Node(name, cpu_capacity, memory_capacity)
+                 for name, cpu_capacity, memory_capacity in snapshot["nodes"]}
+        services: Dict[str, Service] = {}
+        pod_index: Dict[str, Tuple[Pod, Optional[Node]]] = {}
+        for name, cpu_request, memory_request, pods in snapshot["services"]:
+            service = Service(name, cpu_request, memory_request)
+            services[name] = service
+            for pod_id, node_name in pods:
+                pod = Pod(name, cpu_request, memory_request, pod_id)
+                service.pods[pod_id] = pod
+                if node_name is None:
+                    service.pending[pod_id] = pod
+                    pod_index[pod_id] = (pod, None)
+                    continue
+                node = nodes[node_name]
+                pod.node_id = node_name
+                pod.status = "Running"
+                node.pods[pod_id] = pod
+                node.service_pods.setdefault(name, {})[pod_id] = pod
+                # Summed in bind order, so the counters match those of the original cluster
+                node._cpu_usage += cpu_request
+                node._memory_usage += memory_request
+                service.placements[node_name] = service.placements.get(node_name, 0) + 1
+                pod_index[pod_id] = (pod, node)
+
+        self.nodes, self.services, self._pod_index, self._schedulers = nodes, services, pod_index, {}
+        self._metrics_rows = {name: row for row, name in enumerate(nodes)}
+        self._node_stats, self._base_latency = [{} for _ in nodes], np.zeros(0)
+        self._dirty_nodes, self._cluster_stats, self._journal = set(nodes), None, None
+        self.strategy = snapshot["strategy"]
+        self._failed = {name: tuple(capacity) for name, capacity in snapshot["failed"].items()}
+        self.request_rates = dict(snapshot["request_rates"])
+        self._touch()
+
+    def checkpoint(self):
+        """Starts recording this thread's changes so `rollback` can undo them.
+
+        Cheaper than a snapshot for small changes. Each thread has its own journal.
+        """
+        self._journal = []
+
+    def rollback(self):
+        """Undoes every change since the last `checkpoint` and stops recording.
+
+        Raises RuntimeError, after undoing everything else, if a pod could not go back to its
+        node because another caller took the capacity meanwhile.
+        """
+        journal, self._journal = self._journal, None
+        if journal is None:
+            raise ValueError("No checkpoint to roll back to")
+        unrestored = []
+        for inverse, args in reversed(journal):
+            # _bind and _transfer return False when the node no longer fits the pod
+            if inverse(*args) is False:
+                unrestored.append(args[0].id)
+        if unrestored:
+            raise RuntimeError(f"Rollback could not put {len(unrestored)} pod(s) back on their node "
+                               f"({', '.join(unrestored[:5])}): other callers took the capacity; "
+                               f"they stay Pending or on their current node")
+
+    def commit(self):
+        """Keeps every change since the last `checkpoint` and stops recording."""
+        self._journal = None
+
+    def fork(self) -> "Cluster":
+        """Independent copy of the cluster to try actions on without touching this one."""
+        clone = Cluster(consistency_checks=self.consistency_checks, strategy=self.strategy)
+        clone.restore(self.snapshot())
+        return clone
+
+    def track_changes(self):
+        """Starts recording which nodes, services and pods change, for `take_changes`."""
+        with self._index_lock:
+            self._changed = {"nodes": set(), "services": set(), "pods": set()}
+
+    def take_changes(self) -> Optional[Dict]:
+        """Plain-data current state of everything changed since the last call, or None if nothing did.
+
+        Only what changed is included, each entity as it is now rather than every step it
+        went through, so `apply_changes` brings a copy of the earlier state up to date.
+        Rolled-back changes show up too, as the state they were rolled back to.
+        """
+        with self._index_lock:
+            changed = self._changed
+            if changed is None:
+                raise ValueError("Changes are not tracked; call track_changes() first")
+            if not any(changed.values()):
+                return None
+            self._changed = {"nodes": set(), "services": set(), "pods": set()}
+            nodes = sorted(changed["nodes"])
+            services = sorted(changed["services"])
+            pods = [self._pod_index.get(pod_id, (None, None))[0] for pod_id in changed["pods"]]
+            return {
+                "strategy": self.strategy,
+                "nodes": [(name, self.nodes[name].cpu_capacity, self.nodes[name].memory_capacity) for name in nodes],
+                "failed": {name: self._failed[name] for name in nodes if name in self._failed},
+                "services": [(name, self.services[name].cpu_request, self.services[name].memory_request)
+                             for name in services if name in self.services],
+                "removed_services": [name for name in services if name not in self.services],
+                "pods": [(pod.id, pod.service_name, pod.node_id) for pod in pods if pod is not None],
+                "removed_pods": sorted(pod_id for pod_id in changed["pods"] if pod_id not in self._pod_index),
+                "request_rates": dict(self.request_rates),
+            }
+
+    def apply_changes(self, changes: Dict):
+        """Brings the cluster up to date with `take_changes()` output taken from a later copy of it."""
+        failed = {name: tuple(capacity) for name, capacity in changes["failed"].items()}
+        for name, cpu_capacity, memory_capacity in changes["nodes"]:
+            if name not in self.nodes:
+                self.add_node(name, cpu_capacity, memory_capacity)
+                if name in failed:
+                    with self._index_lock:
+                        self._failed[name] = failed[name]
+            elif name in self._failed and name not in failed:
+                self.recover_node(name)
+        for pod_id in changes["removed_pods"]:
+            if pod_id in self._pod_index:
+                self._delete_pod(self._pod_index[pod_id][0])
+        for name, cpu_request, memory_request in changes["services"]:
+            service = self.services.get(name)
+            # A redeployed service's old pods are among the removed ones
+            if service is None or (service.cpu_request, service.memory_request) != (cpu_request, memory_request):
+                self._put_service(name, Service(name, cpu_request, memory_request))
+        # Every moving pod leaves its node before any is bound, so swaps never run out of capacity
+        binds = []
+        for pod_id, service_name, node_name in changes["pods"]:
+            pod, node = self._pod_index.get(pod_id, (None, None))
+            if pod is None:
+                service = self.services[service_name]
+                pod = Pod(service_name, service.cpu_request, service.memory_request, pod_id)
+                self._register_pod(service, pod)
+            if (node.name if node else None) == node_name:
+                continue
+            if node is not None:
+                self._unbind(pod, node)
+            if node_name is not None:
+                binds.append((pod, self.nodes[node_name]))
+        for pod, node in binds:
+            if not self._bind(pod, node):
+                raise ValueError(f"Pod {pod.id} does not fit on node {node.name}")
+        for name in failed:
+            if name not in self._failed:
+                self.fail_node(name)
+        for name in changes["removed_services"]:
+            if name in self.services:
+                self._put_service(name, None)
+        self.strategy = changes["strategy"]
+        self.request_rates = dict(changes["request_rates"])
 
     def add_node(self, name: str, cpu_capacity: float, memory_capacity: float):
-        self.nodes[name] = Node(name, cpu_capacity, memory_capacity)
-
-    def deploy_service(self, name: str, replicas: int, cpu_request: float, memory_request: float):
-        service = Service(name, cpu_request, memory_request)
-        self.services[name] = service
-        self.scale_service(name, replicas)
-
-    def scale_service(self, service_name: str, replicas: int):
-        if service_name not in self.services:
-            raise ValueError(f"Service {service_name} not found")
-        
-        service = self.services[service_name]
-        current_count = len(service.pods)
-        
-        if replicas > current_count:
-            # Scale up
-            for _ in range(replicas - current_count):
-                pod = Pod(service_name, service.cpu_request, service.memory_request)
-                service.pods[pod.id] = pod
-                self._schedule_pod(pod)
-        elif replicas < current_count:
-            # Scale down
-            pods_to_remove = list(service.pods.keys())[:current_count - replicas]
-            for pod_id in pods_to_remove:
-                pod = service.pods.pop(pod_id)
-                if pod.node_id and pod.node_id in self.nodes:
-                    self.nodes[pod.node_id].remove_pod(pod.id)
-
-    def _schedule_pod(self, pod: Pod) -> bool:
-        # Simple scheduler: find first node with capacity
-        # Sort nodes by available CPU to balance slightly or pack? Let's just iterate.
-        for node in self.nodes.values():
-            if node.add_pod(pod):
-                return True
-        print(f"Warning: Could not schedule pod {pod.id} (insufficient capacity)")
-        return False
+        node = Node(name, cpu_capacity, memory_capacity)
+        with self._index_lock:
+            self.nodes[name] = node
+            for scheduler in self._schedulers.values():
+                scheduler.add_node(node)
+            if name not in self._metrics_rows:
+                self._metrics_rows[name] = len(self._node_stats)
+                self._node_stats.append({})
+            self._dirty_nodes.add(name)
+            if self._changed is not None:
+                self._changed["nodes"].add(name)
+            self._touch()
 
-    def move_pod(self, pod_id: str, target_node_name: str):
-        # Find the pod
-        pod = None
-        source_node = None
-        
-        for node in self.nodes.values():
-            if pod_id in node.pods:
-                source_node = node
-                pod = node.pods[pod_id]
+    def fail_node(self, name: str) -> List[str]:
+        """Takes a node out of service and returns the IDs of the pods it was running.
+
+        The evicted pods go back to Pending (see `schedule_pending`) and nothing is
+        scheduled on the node until `recover_node`.
+        """
+        if name not in self.nodes:
+            raise ValueError(f"Node {name} not found")
+        node = self.nodes[name]
+        with node.lock:
+            if name in self._failed:
+                return []
+            evicted = list(node.pods.values())
+            for pod in evicted:
+                self._unbind(pod, node)
+            with self._index_lock:
+                self._failed[name] = (node.cpu_capacity, node.memory_capacity)
+                node.cpu_capacity = node.memory_capacity = 0.0
+                if self._journal is not None:
+                    self._journal.append((self.recover_node, (name,)))
+                if self._changed is not None:
+                    self._changed["nodes"].add(name)
+                self._node_changed(node)
+        if self.consistency_checks:
+            self.verify_consistency()
+        return [pod.id for pod in evicted]
+
+    def recover_node(self, name: str):
+        if name not in self.nodes:
+            raise ValueError(f"Node {name} not found")
+        node = self.nodes[name]
+        with node.lock:
+            if name not in self._failed:
+                raise ValueError(f"Node {name} has not failed")
+            with self._index_lock:
+                node.cpu_capacity, node.memory_capacity = self._failed.pop(name)
+                if self._journal is not None:
+                    self._journal.append((self.fail_node, (name,)))
+                if self._changed is not None:
+                    self._changed["nodes"].add(name)
+                self._node_changed(node)
+        if self.consistency_checks:
+            self.verify_consistency()
+
+    def schedule_pending(self, strategy: Optional[str] = None) -> Dict[str, int]:
+        """Retries every Pending pod, largest services first; returns pods placed per node."""
+        placed: Dict[str, int] = {}
+        with self._index_lock:
+            services = sorted(self.services.values(), key=lambda s: (s.cpu_request, s.memory_request), reverse=True)
+        for service in services:
+            with self._service_lock(service.name):
+                with self._index_lock:
+                    pending = list(service.pending.values()) if self.services.get(service.name) is service else []
+                for name, count in self._place_pods(pending, strategy).items():
+                    placed[name] = placed.get(name, 0) + count
+        if self.consistency_checks:
+            self.verify_consistency()
+        return placed
+
+    def deploy_service(self, name: str, replicas: int, cpu_request: float, memory_request: float,
+                       strategy: Optional[str] = None) -> Dict:
+        with self._service_lock(name):
+            if name in self.services:
+                # Redeploying replaces the service, so its old pods must not linger on the nodes
+                with self._index_lock:
+                    old_pods = list(self.services[name].pods.values())
+                for pod in old_pods:
+                    self._delete_pod(pod)
+            self._put_service(name, Service(name, cpu_request, memory_request))
+            return self.scale_service(name, replicas, strategy=strategy)
+
+    def scale_service(self, service_name: str, replicas: int, strategy: Optional[str] = None) -> Dict:
+        """Scales a service and returns a placement report.
+
+        The report has the target `replicas`, the resulting `running` and `pending`
+        pod counts, the number of pods `removed` and a `placed` mapping of node name
+        to pods scheduled there by this call. Pods that do not fit stay Pending.
+        """
+        # Held throughout, so concurrent scalings of one service cannot both act on the same count
+        with self._service_lock(service_name):
+            if service_name not in self.services:
+                raise ValueError(f"Service {service_name} not found")
+
+            service = self.services[service_name]
+            current_count = len(service.pods)
+            placed: Dict[str, int] = {}
+            removed = 0
+
+            if replicas > current_count:
+                # Scale up
+                new_pods = []
+                for _ in range(replicas - current_count):
+                    pod = Pod(service_name, service.cpu_request, service.memory_request)
+                    self._register_pod(service, pod)
+                    new_pods.append(pod)
+                placed = self._place_pods(new_pods, strategy)
+            elif replicas < current_count:
+                # Scale down
+                removed = current_count - replicas
+                self._remove_replicas(service, removed)
+
+            if self.consistency_checks:
+                self.verify_consistency()
+
+            with self._index_lock:
+                return {
+                    "service": service_name,
+                    "replicas": replicas,
+                    "running": service.running_count,
+                    "pending": len(service.pending),
+                    "removed": removed,
+                    "placed": placed,
+                }
+
+    def _remove_replicas(self, service: Service, count: int):
+        """Removes `count` pods: Pending ones first, then from the most CPU-loaded nodes."""
+        with self._index_lock:
+            pending = list(service.pending.values())[:count]
+        for pod in pending:
+            self._delete_pod(pod)
+            count -= 1
+        while count > 0:
+            # Re-ranked from the placements if concurrent moves emptied the heap's nodes first
+            with self._index_lock:
+                heap = [(-self._cpu_utilization(self.nodes[name]), name) for name in service.placements]
+            if not heap:
                 break
-        
-        if not pod:
-            raise ValueError(f"Pod {pod_id} not found")
-            
+            heapq.heapify(heap)
+            while count > 0 and heap:
+                _, name = heapq.heappop(heap)
+                node = self.nodes[name]
+                with node.lock:
+                    pods = node.service_pods.get(service.name)
+                    if not pods:
+                        continue
+                    self._delete_pod(next(iter(pods.values())))
+                    count -= 1
+                    if service.name in node.service_pods:
+                        heapq.heappush(heap, (-self._cpu_utilization(node), name))
+
+    @staticmethod
+    def _cpu_utilization(node: Node) -> float:
+        return node.cpu_usage / node.cpu_capacity if node.cpu_capacity > 0 else 0
+
+    def apply_manifest(self, manifest: List[Dict], strategy: Optional[str] = None) -> Dict:
+        """Deploys or scales several services in one call.
+
+        Each entry needs `name` and `replicas`; new services also need `cpu_request`
+        and `memory_request`, and an entry may override the `strategy`. The whole
+        manifest is validated before anything changes, then services are placed
+        largest pod first, which packs mixed workloads tighter.
+        """
+        entries = []
+        for entry in manifest:
+            name = entry.get("name")
+            replicas = entry.get("replicas")
+            if not name or not isinstance(replicas, int) or replicas < 0:
+                raise ValueError(f"Invalid manifest entry {entry}: needs a name and a non-negative integer replicas")
+            if name in self.services:
+                service = self.services[name]
+                cpu_request, memory_request = service.cpu_request, service.memory_request
+                if (entry.get("cpu_request", cpu_request) != cpu_request
+                        or entry.get("memory_request", memory_request) != memory_request):
+                    raise ValueError(f"Service {name} already exists with different resource requests")
+            elif "cpu_request" in entry and "memory_request" in entry:
+                cpu_request, memory_request = entry["cpu_request"], entry["memory_request"]
+            else:
+                raise ValueError(f"Service {name} not found and manifest entry has no resource requests")
+            make_scheduler(entry.get("strategy") or strategy or self.strategy)
+            entries.append((name, replicas, cpu_request, memory_request, entry.get("strategy") or strategy))
+
+        total_cpu = sum(node.cpu_capacity for node in self.nodes.values()) or 1
+        total_memory = sum(node.memory_capacity for node in self.nodes.values()) or 1
+        entries.sort(key=lambda e: max(e[2] / total_cpu, e[3] / total_memory), reverse=True)
+
+        reports = {}
+        for name, replicas, cpu_request, memory_request, entry_strategy in entries:
+            if name in self.services:
+                reports[name] = self.scale_service(name, replicas, strategy=entry_strategy)
+            else:
+                reports[name] = self.deploy_service(name, replicas, cpu_request, memory_request,
+                                                    strategy=entry_strategy)
+        return {
+            "services": reports,
+            "running": sum(r["running"] for r in reports.values()),
+            "pending": sum(r["pending"] for r in reports.values()),
+        }
+
+    def _place_pods(self, pods: List[Pod], strategy: Optional[str] = None) -> Dict[str, int]:
+        """Places same-shaped pods in one pass over the capacity index.
+
+        Returns the number of pods placed per node; pods that do not fit stay Pending.
+        """
+        placed: Dict[str, int] = {}
+        if not pods:
+            return placed
+        cpu, memory = pods[0].cpu_request, pods[0].memory_request
+        scheduler = self._scheduler(strategy)
+        targets = scheduler.fill(cpu, memory, len(pods))
+        for pod in pods:
+            with self._index_lock:
+                node = next(targets, None)
+            while node is not None and not self._bind(pod, node):
+                # Another caller took the node's capacity between selection and binding
+                with self._index_lock:
+                    node = scheduler.select(cpu, memory)
+            if node is None:
+                break
+            placed[node.name] = placed.get(node.name, 0) + 1
+        return placed
+
+    def _schedule_pod(self, pod: Pod, strategy: Optional[str] = None) -> bool:
+        return bool(self._place_pods([pod], strategy))
+
+    def move_pod(self, pod_id: str, target_node_name: str):
         if target_node_name not in self.nodes:
             raise ValueError(f"Target node {target_node_name} not found")
-            
         target_node = self.nodes[target_node_name]
-        
-        # Check capacity on target (optimistic check)
-        if target_node.cpu_usage + pod.cpu_request > target_node.cpu_capacity:
-             raise ValueError(f"Target node {target_node_name} has insufficient CPU")
-
-        # Move
-        source_node.remove_pod(pod_id)
-        if not target_node.add_pod(pod):
-            # Rollback if failed (shouldn't happen due to check above, but good practice)
-            source_node.add_pod(pod)
-            raise ValueError(f"Failed to move pod to {target_node_name}")
-
-    def get_metrics(self) -> Dict:
-        # Generate synthetic metrics
+
+        while True:
+            pod, source_node = self.get_pod(pod_id)
+            if source_node is None:
+                raise ValueError(f"Pod {pod_id} is Pending and not running on any node")
+            if source_node is target_node:
+                return
+            # Checks and move happen under both node locks, so no other caller can fill the
+            # target or move the pod in between
+            with self._locked((source_node, target_node)):
+                if self._pod_index.get(pod_id, (None, None))[1] is not source_node:
+                    # Moved or deleted since the lookup; look again
+                    continue
+                if target_node.cpu_usage + pod.cpu_request > target_node.cpu_capacity:
+                    raise ValueError(f"Target node {target_node_name} has insufficient CPU")
+                if target_node.memory_usage + pod.memory_request > target_node.memory_capacity:
+                    raise ValueError(f"Target node {target_node_name} has insufficient memory")
+                self._transfer(pod, source_node, target_node)
+            break
+
+        if self.consistency_checks:
+            self.verify_consistency()
+
+    def rebalance(self, cpu_threshold_pct: float = 80.0, strategy: str = "spread") -> Dict:
+        """Moves pods off every node above the CPU threshold in one call.
+
+        Hot nodes are relieved most loaded first, largest pods first, onto nodes
+        chosen by `strategy` that stay at or under the threshold after the move.
+        """
+        threshold = cpu_threshold_pct / 100
+        with self._index_lock:
+            nodes = list(self.nodes.values())
+        hot = sorted((node for node in nodes if self._cpu_utilization(node) > threshold),
+                     key=self._cpu_utilization, reverse=True)
+        hot_names = {node.name for node in hot}
+        scheduler = self._scheduler(strategy)
+        moves = []
+        for node in hot:
+            with node.lock:
+                pods = sorted(node.pods.values(), key=lambda p: p.cpu_request, reverse=True)
+            for pod in pods:
+                if self._cpu_utilization(node) <= threshold:
+                    break
+                if pod.node_id != node.name:
+                    continue
+                with self._index_lock:
+                    target = scheduler.select(pod.cpu_request, pod.memory_request, exclude=hot_names)
+                if target is None or target.cpu_usage + pod.cpu_request > threshold * target.cpu_capacity:
+                    continue
+                try:
+                    self.move_pod(pod.id, target.name)
+                except ValueError:
+                    # A concurrent caller deleted the pod or filled the target first
+                    continue
+                moves.append({"pod_id": pod.id, "service": pod.service_name, "from": node.name, "to": target.name})
+        return {
+            "moves": moves,
+            "hot_nodes": [node.name for node in hot],
+            "still_hot": [node.name for node in hot if self._cpu_utilization(node) > threshold],
+        }
+
+    def _refresh_metrics_cache(self):
+        if self._dirty_nodes or self._cluster_stats is None:
+            if len(self._base_latency) < len(self._node_stats):
+                self._base_latency = np.resize(self._base_latency, len(self._node_stats))
+            for name in self._dirty_nodes:
+                node = self.nodes[name]
+                cpu_util = self._cpu_utilization(node)
+                self._node_stats[self._metrics_rows[name]] = {
+                    "cpu_usage": node.cpu_usage,
+                    "cpu_capacity": node.cpu_capacity,
+                    "cpu_utilization_pct": cpu_util * 100,
+                    "memory_usage": node.memory_usage,
+                    "pod_count": len(node.pods),
+                }
+                # Latency increases with load: 20ms base plus up to 100ms from CPU utilization
+                self._base_latency[self._metrics_rows[name]] = 20 + cpu_util * 100
+            self._dirty_nodes.clear()
+            total_cpu_usage = sum(stats["cpu_usage"] for stats in self._node_stats)
+            total_cpu_cap = sum(stats["cpu_capacity"] for stats in self._node_stats)
+            self._cluster_stats = {
+                "total_nodes": len(self.nodes),
+                "total_pods": sum(stats["pod_count"] for stats in self._node_stats),
+                "overall_cpu_utilization_pct": (total_cpu_usage / total_cpu_cap * 100) if total_cpu_cap > 0 else 0
+            }
+
+        if self._services_dirty:
+            # Flattened (service row, node row, pod count) triples for a weighted bincount
+            service_rows, node_rows, counts, pod_counts, running = [], [], [], [], []
+            for row, service in enumerate(self.services.values()):
+                for node_name, count in service.placements.items():
+                    service_rows.append(row)
+                    node_rows.append(self._metrics_rows[node_name])
+                    counts.append(count)
+                pod_counts.append(len(service.pods))
+                running.append(service.running_count)
+            self._service_stats = (
+                list(self.services), np.array(service_rows, dtype=np.int64), np.array(node_rows, dtype=np.int64),
+                np.array(counts, dtype=float), pod_counts, np.array(running, dtype=float),
+            )
+            self._services_dirty = False
+
+    def get_metrics(self, jitter: bool = True) -> Dict:
+        with self._index_lock:
+            return self._get_metrics(jitter)
+
+    def _get_metrics(self, jitter: bool) -> Dict:
+        # Generate synthetic metrics; only the latency jitter is new on every call
+        self._refresh_metrics_cache()
+        latency = self._base_latency[:len(self._node_stats)]
+        if jitter:
+            latency = latency + self.rng.uniform(-LATENCY_JITTER_MS, LATENCY_JITTER_MS, len(self._node_stats))
+
         metrics = {
-            "timestamp": time.time(),
-            "nodes": {},
+            "timestamp": self.clock(),
+            "nodes": {
+                name: {**stats, "latency_ms": node_latency}
+                for name, stats, node_latency in zip(self._metrics_rows, self._node_stats, latency.tolist())
+            },
             "services": {}
         }
-        
-        total_cpu_usage = 0
-        total_cpu_cap = 0
-        
-        for node_name, node in self.nodes.items():
-            cpu_util = node.cpu_usage / node.cpu_capacity if node.cpu_capacity > 0 else 0
-            # Latency increases with load
-            base_latency = 20  # ms
-            load_factor = cpu_util * 100 # extra ms based on load
-            latency = base_latency + load_factor + random.uniform(-5, 5)
-            
-            metrics["nodes"][node_name] = {
-                "cpu_usage": node.cpu_usage,
-                "cpu_capacity": node.cpu_capacity,
-                "cpu_utilization_pct": cpu_util * 100,
-                "memory_usage": node.memory_usage,
-                "pod_count": len(node.pods),
-                "latency_ms": latency
-            }
-            total_cpu_usage += node.cpu_usage
-            total_cpu_cap += node.cpu_capacity
-
-        for svc_name, svc in self.services.items():
-            # Service latency is avg of its pods' node latencies
-            svc_latencies = []
-            running_pods = 0
-            for pod in svc.pods.values():
-                if pod.node_id:
-                    running_pods += 1
-                    node_metric = metrics["nodes"][pod.node_id]
-                    svc_latencies.append(node_metric["latency_ms"])
-            
-            avg_latency = sum(svc_latencies) / len(svc_latencies) if svc_latencies else 0
-            
-            # Request completion rate (synthetic)
-            # Higher load -> lower completion rate? Or just random variation around a baseline.
-            req_rate = 100 - (avg_latency / 5) # Simple inverse relationship
-            
-            metrics["services"][svc_name] = {
-                "pod_count": len(svc.pods),
-                "running_pods": running_pods,
-                "avg_latency_ms": avg_latency,
+
+        # Service latency is avg of its pods' node latencies
+        names, service_rows, node_rows, counts, pod_counts, running = self._service_stats
+        latency_sum = np.bincount(service_rows, weights=counts * latency[node_rows], minlength=len(names))
+        avg_latency = np.divide(latency_sum, running, out=np.zeros(len(names)), where=running > 0)
+        for name, pod_count, running_pods, svc_latency in zip(names, pod_counts, running.tolist(), avg_latency.tolist()):
+            # Request completion rate (synthetic): simple inverse relationship with latency
+            req_rate = 100 - (svc_latency / 5)
+            metrics["services"][name] = {
+                "pod_count": pod_count,
+                "running_pods": int(running_pods),
+                "avg_latency_ms": svc_latency,
                 "request_completion_rate": max(0, req_rate)
             }
-            
-        metrics["cluster"] = {
-            "total_nodes": len(self.nodes),
-            "total_pods": sum(len(n.pods) for n in self.nodes.values()),
-            "overall_cpu_utilization_pct": (total_cpu_usage / total_cpu_cap * 100) if total_cpu_cap > 0 else 0
-        }
-        
+        if self.latency_source is not None:
+            self._apply_latency_source(metrics)
+
+        metrics["cluster"] = dict(self._cluster_stats)
         return metrics
+
+    def _apply_latency_source(self, metrics: Dict):
+        for name, svc_latency in self.latency_source().items():
+            svc = metrics["services"].get(name)
+            if svc is not None:
+                svc["avg_latency_ms"] = svc_latency
+                svc["request_completion_rate"] = max(0, 100 - (svc_latency / 5))
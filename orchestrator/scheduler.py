@@ -0,0 +1,263 @@
+import bisect
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from orchestrator.k8s_sim import Node
+
+DEFAULT_STRATEGY = "first-fit"
+
+# Slack used when pruning on indexed free capacity; the final fit check is always exact
+EPSILON = 1e-9
+
+def fits(node: "Node", cpu: float, memory: float) -> bool:
+    # Same comparison as Node.add_pod so the index never disagrees with the node
+    return (node.cpu_usage + cpu <= node.cpu_capacity
+            and node.memory_usage + memory <= node.memory_capacity)
+
+class _CapacityTree:
+    """Max-segment-tree over (free cpu, free memory) in node registration order.
+
+    Finds the first node that fits a request while skipping whole ranges of
+    full nodes in one comparison.
+    """
+
+    def __init__(self):
+        self.order: List["Node"] = []
+        self._position: Dict[str, int] = {}
+        self._size = 1
+        self._cpu = [float("-inf")] * 2
+        self._memory = [float("-inf")] * 2
+
+    def add(self, node: "Node"):
+        if node.name in self._position:
+            self.order[self._position[node.name]] = node
+        else:
+            self._position[node.name] = len(self.order)
+            self.order.append(node)
+            if len(self.order) > self._size:
+                self._grow()
+        self.update(node)
+
+    def _grow(self):
+        while self._size < len(self.order):
+            self._size *= 2
+        self._cpu = [float("-inf")] * (2 * self._size)
+        self._memory = [float("-inf")] * (2 * self._size)
+        for i, node in enumerate(self.order):
+            self._cpu[self._size + i] = node.cpu_capacity - node.cpu_usage
+            self._memory[self._size + i] = node.memory_capacity - node.memory_usage
+        for i in range(self._size - 1, 0, -1):
+            self._cpu[i] = max(self._cpu[2 * i], self._cpu[2 * i + 1])
+            self._memory[i] = max(self._memory[2 * i], self._memory[2 * i + 1])
+
+    def update(self, node: "Node"):
+        i = self._size + self._position[node.name]
+        self._cpu[i] = node.cpu_capacity - node.cpu_usage
+        self._memory[i] = node.memory_capacity - node.memory_usage
+        i //= 2
+        while i:
+            self._cpu[i] = max(self._cpu[2 * i], self._cpu[2 * i + 1])
+            self._memory[i] = max(self._memory[2 * i], self._memory[2 * i + 1])
+            i //= 2
+
+    def first_fit(self, cpu: float, memory: float, exclude: Optional[Set[str]] = None) -> Optional["Node"]:
+        stack = [1]
+        while stack:
+            i = stack.pop()
+            if self._cpu[i] < cpu - EPSILON or self._memory[i] < memory - EPSILON:
+                continue
+            if i < self._size:
+                # Right child first so the left one is popped (and explored) first
+                stack.append(2 * i + 1)
+                stack.append(2 * i)
+                continue
+            node = self.order[i - self._size]
+            if (not exclude or node.name not in exclude) and fits(node, cpu, memory):
+                return node
+        return None
+
+class _SortedIndex:
+    """Bisect-ordered list of (key, name) entries with O(log N) lookup and in-place re-keying."""
+
+    def __init__(self):
+        self._entries: List[Tuple] = []
+        self._keys: Dict[str, Tuple] = {}
+
+    def set(self, name: str, key: Tuple):
+        old = self._keys.get(name)
+        if old is not None:
+            if old == key:
+                return
+            del self._entries[bisect.bisect_left(self._entries, (old, name))]
+        self._keys[name] = key
+        bisect.insort(self._entries, (key, name))
+
+    def iter_from(self, key: Tuple = ()) -> Iterator[str]:
+        for i in range(bisect.bisect_left(self._entries, (key,)), len(self._entries)):
+            yield self._entries[i][1]
+
+    def iter_fitting(self, first: float, second: float) -> Iterator[str]:
+        """Names whose key starts with values >= (first, second), in key order."""
+        entries = self._entries
+        second -= EPSILON
+        for i in range(bisect.bisect_left(entries, ((first - EPSILON,),)), len(entries)):
+            key, name = entries[i]
+            if key[1] >= second:
+                yield name
+
+class Scheduler:
+    """Picks a node for a pod request from an index of node free capacity.
+
+    The cluster registers every node with `add_node` and calls `update` whenever
+    a node's usage changes, so `select` never has to scan the full node list.
+    Every strategy shares a capacity tree that rejects unplaceable requests in
+    O(log N); subclasses only rank the nodes that can fit.
+    """
+    name = ""
+
+    def __init__(self):
+        self.nodes: Dict[str, "Node"] = {}
+        self._tree = _CapacityTree()
+
+    def add_node(self, node: "Node"):
+        self.nodes[node.name] = node
+        self._tree.add(node)
+        self._reindex(node)
+
+    def update(self, node: "Node"):
+        self._tree.update(node)
+        self._reindex(node)
+
+    def select(self, cpu: float, memory: float, exclude: Optional[Set[str]] = None) -> Optional["Node"]:
+        node = self._tree.first_fit(cpu, memory, exclude)
+        if node is None:
+            return None
+        return self._select(cpu, memory, exclude) or node
+
+    def fill(self, cpu: float, memory: float, count: int) -> Iterator["Node"]:
+        """Yields a target node for each of up to `count` identical pods.
+
+        The caller must add each pod and call `update` before advancing. Packing
+        strategies keep returning the same node until it is full, which gives the
+        same placement as repeated `select` calls with one index search per node
+        instead of one per pod.
+        """
+        node = None
+        for _ in range(count):
+            if node is None or not fits(node, cpu, memory):
+                node = self.select(cpu, memory)
+                if node is None:
+                    return
+            yield node
+
+    def _reindex(self, node: "Node"):
+        pass
+
+    def _select(self, cpu: float, memory: float, exclude: Optional[Set[str]]) -> Optional["Node"]:
+        raise NotImplementedError
+
+    def _first_fitting(self, names: Iterator[str], cpu: float, memory: float,
+                       exclude: Optional[Set[str]]) -> Optional["Node"]:
+        for name in names:
+            node = self.nodes[name]
+            if (not exclude or name not in exclude) and fits(node, cpu, memory):
+                return node
+        return None
+
+class FirstFitScheduler(Scheduler):
+    """First node in registration order that fits, same as the original linear scan."""
+    name = "first-fit"
+
+    def select(self, cpu: float, memory: float, exclude: Optional[Set[str]] = None) -> Optional["Node"]:
+        return self._tree.first_fit(cpu, memory, exclude)
+
+class BestFitScheduler(Scheduler):
+    """Tightest fit: the node with the least free CPU that can still host the pod."""
+    name = "best-fit"
+
+    def __init__(self):
+        super().__init__()
+        self._index = _SortedIndex()
+        self._seq: Dict[str, int] = {}
+
+    def _reindex(self, node: "Node"):
+        seq = self._seq.setdefault(node.name, len(self._seq))
+        self._index.set(node.name, (node.cpu_capacity - node.cpu_usage, node.memory_capacity - node.memory_usage, seq))
+
+    def _select(self, cpu: float, memory: float, exclude: Optional[Set[str]]) -> Optional["Node"]:
+        return self._first_fitting(self._index.iter_fitting(cpu, memory), cpu, memory, exclude)
+
+class SpreadScheduler(Scheduler):
+    """Least-allocated spread: the node with the largest average free CPU/memory fraction."""
+    name = "spread"
+
+    def __init__(self):
+        super().__init__()
+        self._index = _SortedIndex()
+        self._seq: Dict[str, int] = {}
+
+    def _reindex(self, node: "Node"):
+        seq = self._seq.setdefault(node.name, len(self._seq))
+        cpu_free = 1 - node.cpu_usage / node.cpu_capacity if node.cpu_capacity > 0 else 0
+        memory_free = 1 - node.memory_usage / node.memory_capacity if node.memory_capacity > 0 else 0
+        self._index.set(node.name, (-(cpu_free + memory_free) / 2, seq))
+
+    def fill(self, cpu: float, memory: float, count: int) -> Iterator["Node"]:
+        # Spreading re-ranks after every pod instead of filling one node up
+        for _ in range(count):
+            node = self.select(cpu, memory)
+            if node is None:
+                return
+            yield node
+
+    def _select(self, cpu: float, memory: float, exclude: Optional[Set[str]]) -> Optional["Node"]:
+        # The emptiest nodes come first, so the first candidate almost always fits
+        return self._first_fitting(self._index.iter_from(), cpu, memory, exclude)
+
+class DominantResourceScheduler(Scheduler):
+    """Bin-packing on the pod's dominant resource.
+
+    A pod whose CPU share of cluster capacity exceeds its memory share is packed
+    onto the node with the least free CPU that fits, and vice versa for memory.
+    """
+    name = "dominant-resource"
+
+    def __init__(self):
+        super().__init__()
+        self._by_cpu = _SortedIndex()
+        self._by_memory = _SortedIndex()
+        self._seq: Dict[str, int] = {}
+        self._capacity: Dict[str, Tuple[float, float]] = {}
+        self._cpu_capacity = 0.0
+        self._memory_capacity = 0.0
+
+    def _reindex(self, node: "Node"):
+        previous = self._capacity.get(node.name, (0.0, 0.0))
+        self._cpu_capacity += node.cpu_capacity - previous[0]
+        self._memory_capacity += node.memory_capacity - previous[1]
+        self._capacity[node.name] = (node.cpu_capacity, node.memory_capacity)
+
+        seq = self._seq.setdefault(node.name, len(self._seq))
+        cpu_free = node.cpu_capacity - node.cpu_usage
+        memory_free = node.memory_capacity - node.memory_usage
+        self._by_cpu.set(node.name, (cpu_free, memory_free, seq))
+        self._by_memory.set(node.name, (memory_free, cpu_free, seq))
+
+    def _select(self, cpu: float, memory: float, exclude: Optional[Set[str]]) -> Optional["Node"]:
+        cpu_share = cpu / self._cpu_capacity if self._cpu_capacity > 0 else 0
+        memory_share = memory / self._memory_capacity if self._memory_capacity > 0 else 0
+        if cpu_share >= memory_share:
+            candidates = self._by_cpu.iter_fitting(cpu, memory)
+        else:
+            candidates = self._by_memory.iter_fitting(memory, cpu)
+        return self._first_fitting(candidates, cpu, memory, exclude)
+
+STRATEGIES = {
+    cls.name: cls
+    for cls in (FirstFitScheduler, BestFitScheduler, SpreadScheduler, DominantResourceScheduler)
+}
+
+def make_scheduler(strategy: str) -> Scheduler:
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown scheduling strategy {strategy} (available: {', '.join(STRATEGIES)})")
+    return STRATEGIES[strategy]()
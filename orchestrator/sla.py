@@ -0,0 +1,149 @@
+import json
+import math
+import os
+import re
+from typing import Dict, List, Optional
+
+# SLA thresholds the orchestrator enforces; services without a latency entry have no latency SLA.
+# Override them with a JSON file of the same shape, pointed to by $OA_SLA_CONFIG.
+DEFAULT_SLAS = {
+    "service_latency_ms": {"frontend": 100.0, "backend": 150.0},
+    "node_cpu_utilization_pct": 80.0,
+}
+
+# Requests about SLAs/performance are pre-checked (see agent.SlaPrecheck) unless they say what to change
+# ("scale backend, latency will spike", "add replicas to fix latency"). Only plain health checks, not
+# asking for a fix or for particular figures, may be answered by the pre-check alone.
+_SLA_REQUEST = re.compile(r"\bslas?\b|latenc|performance|violat|degrad|\bcpu\b|overload", re.IGNORECASE)
+_CHANGE_REQUEST = re.compile(r"\b(deploy\w*|scal(e|es|ed|ing)|mov(e|es|ed|ing)|migrat\w*|delet\w*|remov\w*"
+                             r"|appl(y|ies|ied|ying)|rebalanc\w*|drain\w*|evict\w*|restart\w*|add\w*|increas\w*"
+                             r"|decreas\w*|reduc\w*|lower\w*|rais(e|es|ed|ing)|provision\w*|replicas?|shrink\w*"
+                             r"|grow\w*|cordon\w*)\b", re.IGNORECASE)
+_REMEDIATION_REQUEST = re.compile(r"\b(fix\w*|resolv\w*|remediat\w*|mitigat\w*|repair\w*|improv\w*"
+                                  r"|handl\w*|correct\w*)\b", re.IGNORECASE)
+_INFO_REQUEST = re.compile(r"\b(what|what's|which|why|how|show\w*|list\w*|tell|give|explain\w*|report\w*"
+                           r"|node-\w+|pods?)\b", re.IGNORECASE)
+
+def load_slas(path: Optional[str] = None) -> Dict:
+    """DEFAULT_SLAS, overridden by the JSON file at `path` (default: $OA_SLA_CONFIG) if any."""
+    path = path or os.environ.get("OA_SLA_CONFIG")
+    slas = {"service_latency_ms": dict(DEFAULT_SLAS["service_latency_ms"]),
+            "node_cpu_utilization_pct": DEFAULT_SLAS["node_cpu_utilization_pct"]}
+    if path:
+        with open(path) as f:
+            config = json.load(f)
+        slas["service_latency_ms"].update(config.get("service_latency_ms", {}))
+        slas["node_cpu_utilization_pct"] = config.get("node_cpu_utilization_pct", slas["node_cpu_utilization_pct"])
+    return slas
+
+def render_slas(slas: Dict) -> str:
+    """The SLA list as it appears in the orchestrator's instruction."""
+    lines = [f"*   {name.capitalize()} Latency: Must be under {threshold:g}ms."
+             for name, threshold in slas["service_latency_ms"].items()]
+    lines.append(f"*   Node CPU Utilization: Should ideally be under {slas['node_cpu_utilization_pct']:g}% "
+                 "to prevent degradation.")
+    return "\n".join(lines)
+
+def is_action_request(text: str) -> bool:
+    """Whether a user request asks the orchestrator to act: change the cluster or fix something."""
+    return bool(_CHANGE_REQUEST.search(text) or _REMEDIATION_REQUEST.search(text))
+
+def is_sla_request(text: str) -> bool:
+    """Whether a user request is about SLAs/performance without saying what to change in the cluster."""
+    return bool(_SLA_REQUEST.search(text)) and not _CHANGE_REQUEST.search(text)
+
+def is_sla_check(text: str) -> bool:
+    """Whether a user request is a plain SLA health check, which "all SLAs are met" answers in full."""
+    return is_sla_request(text) and not is_action_request(text) and not _INFO_REQUEST.search(text)
+
+def service_violations(metrics: Dict, slas: Dict = DEFAULT_SLAS) -> List[Dict]:
+    """Services breaking their latency SLA, worst first.
+
+    Besides running too slow (`reason` "latency"), a service with a latency SLA breaks it when
+    it is missing from the metrics ("missing"), has no running pod ("down", its latency then
+    reads 0) or has Pending pods ("pending").
+    """
+    violations = []
+    for name, threshold in slas["service_latency_ms"].items():
+        svc = metrics["services"].get(name)
+        if svc is None:
+            violations.append({"service": name, "reason": "missing", "avg_latency_ms": None,
+                               "threshold_ms": threshold, "running_pods": 0, "pod_count": 0})
+            continue
+        if svc["running_pods"] == 0:
+            reason = "down"
+        elif svc["running_pods"] < svc["pod_count"]:
+            reason = "pending"
+        elif svc["avg_latency_ms"] > threshold:
+            reason = "latency"
+        else:
+            continue
+        violations.append({
+            "service": name,
+            "reason": reason,
+            "avg_latency_ms": svc["avg_latency_ms"],
+            "threshold_ms": threshold,
+            "running_pods": svc["running_pods"],
+            "pod_count": svc["pod_count"],
+        })
+    violations.sort(key=_severity, reverse=True)
+    return violations
+
+def _severity(violation: Dict) -> float:
+    if violation["reason"] in ("missing", "down"):
+        return math.inf
+    return violation["avg_latency_ms"] / violation["threshold_ms"]
+
+def node_violations(metrics: Dict, slas: Dict = DEFAULT_SLAS) -> List[Dict]:
+    """Nodes whose CPU utilization is above the SLA, most loaded first."""
+    threshold = slas["node_cpu_utilization_pct"]
+    violations = [
+        {"node": name, "cpu_utilization_pct": node["cpu_utilization_pct"], "threshold_pct": threshold,
+         "pod_count": node["pod_count"]}
+        for name, node in metrics["nodes"].items()
+        if node["cpu_utilization_pct"] > threshold
+    ]
+    violations.sort(key=lambda v: v["cpu_utilization_pct"], reverse=True)
+    return violations
+
+def remediations(services: List[Dict], nodes: List[Dict]) -> List[Dict]:
+    """Candidate tool calls for the given violations, for the model to confirm or adjust."""
+    candidates = []
+    for v in services:
+        if v.get("reason", "latency") != "latency":
+            # Scaling does not help pods that found no node; the model has to free or add capacity
+            continue
+        # Latency scales roughly with load per replica, so grow replicas by the overshoot ratio;
+        # at most doubling per step, since queueing makes the ratio overshoot near saturation
+        ratio = min(v["avg_latency_ms"] / v["threshold_ms"], 2.0)
+        replicas = max(v["pod_count"] + 1, math.ceil(v["running_pods"] * ratio))
+        candidates.append({"tool": "scale_service", "args": {"service_name": v["service"], "replicas": replicas},
+                           "reason": f"{v['service']} latency {v['avg_latency_ms']:.1f}ms > {v['threshold_ms']:g}ms"})
+    if nodes:
+        threshold = nodes[0]["threshold_pct"]
+        candidates.append({"tool": "rebalance_cluster", "args": {"cpu_threshold_pct": threshold},
+                           "reason": f"{len(nodes)} nodes above {threshold:g}% CPU"})
+    return candidates
+
+def evaluate(metrics: Dict, slas: Dict = DEFAULT_SLAS) -> Dict:
+    """Rule-based SLA check over `Cluster.get_metrics()` output.
+
+    Returns `ok` (all SLAs met), the violating `services` and `nodes`, and candidate
+    `remediations` for them.
+    """
+    services = service_violations(metrics, slas)
+    nodes = node_violations(metrics, slas)
+    return {
+        "ok": not services and not nodes,
+        "services": services,
+        "nodes": nodes,
+        "remediations": remediations(services, nodes),
+    }
+
+def summarize_ok(metrics: Dict, slas: Dict = DEFAULT_SLAS) -> str:
+    """Human-readable answer for a request where every SLA is met."""
+    parts = [f"{name} {metrics['services'][name]['avg_latency_ms']:.1f}ms (< {threshold:g}ms)"
+             for name, threshold in slas["service_latency_ms"].items() if name in metrics["services"]]
+    busiest = max((node["cpu_utilization_pct"] for node in metrics["nodes"].values()), default=0)
+    parts.append(f"max node CPU {busiest:.1f}% (< {slas['node_cpu_utilization_pct']:g}%)")
+    return "All SLAs are met: " + ", ".join(parts) + ". No action needed."
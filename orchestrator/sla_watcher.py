@@ -0,0 +1,236 @@
+"""Event-driven SLA enforcement: the orchestrator is asked to act only when an SLA is crossed.
+
+`SlaWatcher` evaluates the SLA rules whenever the state store reports a committed change,
+and every `tick_s` seconds, since metrics also move without local mutations (traffic
+under a des.Simulation, or another process sharing a SQLite store). Metrics come from
+`get_metrics(jitter=False)`, which only recomputes the nodes that changed, and only
+nodes above their threshold or already tracked are looked at.
+
+Each SLA subject (a service's latency, a node's CPU utilization) goes through three states:
+
+* ok -> pending when its value rises above the threshold
+* pending -> violating once it stayed there for `debounce_s`; this is what calls the agent
+* back to ok only when the value falls `clear_margin` (relative) below the threshold, so a
+  value hovering around the threshold neither flaps nor restarts the debounce
+
+A subject still violating `repeat_s` after the agent was called about it is reported
+again, in case the first fix did not help. Violations confirmed together go to the agent
+in one message naming exactly those violations. While the agent works, evaluation waits;
+whatever was confirmed meanwhile goes out with the next call.
+
+The agent is reached through a trigger, `async trigger(message, violations)`:
+`runner_trigger(agent)` runs an agent in this process (e.g. the OrchestratorAgent next to
+its A2A server), `a2a_trigger(url)` sends the message to an orchestrator served over A2A.
+
+Standalone, next to OA servers sharing a SQLite state store:
+    OA_STATE_STORE=sqlite:///oa_state.db python -m orchestrator.sla_watcher --oa-url http://localhost:8001
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from orchestrator import sla
+from orchestrator.state_store import StateStore
+from shared.instrumentation import metrics as instrumentation
+
+logger = logging.getLogger(__name__)
+
+Trigger = Callable[[str, List[Dict]], Awaitable[object]]
+
+class _Track:
+    __slots__ = ("since", "triggered_at")
+
+    def __init__(self, since: float):
+        self.since = since
+        self.triggered_at: Optional[float] = None
+
+def describe(violations: List[Dict]) -> str:
+    """The alert sent to the agent: the confirmed violations and the rule-based remediations for them."""
+    services = [v for v in violations if "service" in v]
+    nodes = [v for v in violations if "node" in v]
+    lines = ["SLA violation alert from the SLA watcher. Fix exactly these violations, then verify them:"]
+    lines += [f"- service {v['service']}: average latency {v['avg_latency_ms']:.1f}ms above the "
+              f"{v['threshold_ms']:g}ms SLA for {v['for_s']:g}s ({v['running_pods']}/{v['pod_count']} pods running)"
+              for v in services]
+    lines += [f"- node {v['node']}: CPU utilization {v['cpu_utilization_pct']:.1f}% above the "
+              f"{v['threshold_pct']:g}% SLA for {v['for_s']:g}s" for v in nodes]
+    candidates = sla.remediations(services, nodes)
+    if candidates:
+        lines.append("Candidate remediations: " + "; ".join(f"{c['tool']}({c['args']})" for c in candidates))
+    return "\n".join(lines)
+
+class SlaWatcher:
+    def __init__(self, store: StateStore, slas: Optional[Dict] = None, trigger: Optional[Trigger] = None,
+                 tick_s: float = 5.0, debounce_s: float = 10.0, clear_margin: float = 0.1,
+                 repeat_s: float = 120.0, clock: Callable[[], float] = time.monotonic):
+        self.store = store
+        self.slas = slas or sla.DEFAULT_SLAS
+        self.trigger = trigger
+        self.tick_s = tick_s
+        self.debounce_s = debounce_s
+        self.clear_margin = clear_margin
+        self.repeat_s = repeat_s
+        self.clock = clock
+        self.stats = {"evaluations": 0, "triggers": 0, "reported": 0, "cleared": 0, "trigger_errors": 0}
+        self._tracks: Dict[Tuple[str, str], _Track] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def check(self, metrics: Dict, now: Optional[float] = None) -> List[Dict]:
+        """Advances every subject's state on `metrics`; returns the violations now due for the agent.
+
+        Violations have the shape of `sla.service_violations` / `sla.node_violations` plus
+        `for_s`, how long the subject has been above its threshold.
+        """
+        now = self.clock() if now is None else now
+        self.stats["evaluations"] += 1
+        due, seen = [], set()
+
+        def step(key: Tuple[str, str], value: float, threshold: float, violation: Callable[[], Dict]):
+            seen.add(key)
+            track = self._tracks.get(key)
+            if value > threshold:
+                if track is None:
+                    track = self._tracks[key] = _Track(now)
+                if (now - track.since >= self.debounce_s if track.triggered_at is None
+                        else now - track.triggered_at >= self.repeat_s):
+                    track.triggered_at = now
+                    due.append({**violation(), "for_s": round(now - track.since, 1)})
+            elif track is not None and value < threshold * (1 - self.clear_margin):
+                del self._tracks[key]
+                self.stats["cleared"] += track.triggered_at is not None
+
+        for name, threshold in self.slas["service_latency_ms"].items():
+            svc = metrics["services"].get(name)
+            if svc is not None:
+                step(("service", name), svc["avg_latency_ms"], threshold,
+                     lambda name=name, svc=svc, threshold=threshold: {
+                         "service": name, "avg_latency_ms": svc["avg_latency_ms"], "threshold_ms": threshold,
+                         "running_pods": svc["running_pods"], "pod_count": svc["pod_count"]})
+        threshold = self.slas["node_cpu_utilization_pct"]
+        tracks = self._tracks
+        for name, node in metrics["nodes"].items():
+            cpu = node["cpu_utilization_pct"]
+            if cpu > threshold or ("node", name) in tracks:
+                step(("node", name), cpu, threshold,
+                     lambda name=name, node=node, cpu=cpu: {
+                         "node": name, "cpu_utilization_pct": cpu, "threshold_pct": threshold,
+                         "pod_count": node["pod_count"]})
+        # Subjects that went away (a deleted service, a removed node) are forgotten
+        for key in [key for key in tracks if key not in seen]:
+            del tracks[key]
+        self.stats["reported"] += len(due)
+        return due
+
+    def next_deadline(self) -> Optional[float]:
+        """When the earliest pending subject's debounce runs out, if any is pending."""
+        pending = [track.since + self.debounce_s for track in self._tracks.values() if track.triggered_at is None]
+        return min(pending, default=None)
+
+    def evaluate(self) -> List[Dict]:
+        start = time.perf_counter()
+        due = self.check(self.store.read().get_metrics(jitter=False))
+        instrumentation.observe("sla_watcher_evaluation_seconds", time.perf_counter() - start)
+        return due
+
+    async def fire(self, violations: List[Dict]):
+        self.stats["triggers"] += 1
+        instrumentation.inc("sla_watcher_triggers_total")
+        message = describe(violations)
+        logger.info("SLA watcher triggering the orchestrator:\n%s", message)
+        try:
+            await self.trigger(message, violations)
+        except Exception:
+            self.stats["trigger_errors"] += 1
+            logger.exception("SLA watcher trigger failed")
+
+    async def run(self):
+        """Evaluates on every store change and tick until cancelled, calling the trigger on confirmed violations."""
+        if self.trigger is None:
+            raise ValueError("SlaWatcher.run needs a trigger")
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+        unsubscribe = self.store.subscribe(lambda: loop.call_soon_threadsafe(changed.set))
+        try:
+            while True:
+                changed.clear()
+                due = self.evaluate()
+                if due:
+                    await self.fire(due)
+                    continue
+                timeout = self.tick_s
+                deadline = self.next_deadline()
+                if deadline is not None:
+                    timeout = min(timeout, max(deadline - self.clock(), 0.0))
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            unsubscribe()
+
+    def start(self) -> asyncio.Task:
+        """Runs the watcher as a task on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+def runner_trigger(agent) -> Trigger:
+    """A trigger running `agent` in this process, in a new session per alert; returns its answer."""
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    runner = InMemoryRunner(agent=agent, app_name="sla_watcher")
+
+    async def trigger(message: str, violations: List[Dict]) -> str:
+        session = await runner.session_service.create_session(app_name=runner.app_name, user_id="sla_watcher")
+        answer = []
+        try:
+            async for event in runner.run_async(user_id="sla_watcher", session_id=session.id,
+                                                new_message=types.Content(role="user", parts=[types.Part(text=message)])):
+                if event.is_final_response() and event.content and event.content.parts:
+                    answer.extend(part.text for part in event.content.parts if part.text)
+        finally:
+            await runner.session_service.delete_session(app_name=runner.app_name, user_id="sla_watcher",
+                                                        session_id=session.id)
+        return "\n".join(answer)
+    return trigger
+
+def a2a_trigger(url: str) -> Trigger:
+    """A trigger sending alerts to the orchestrator served over A2A at `url`, e.g. by run_OA.py."""
+    from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH, RemoteA2aAgent
+
+    return runner_trigger(RemoteA2aAgent(name="orchestrator", agent_card=f"{url.rstrip('/')}{AGENT_CARD_WELL_KNOWN_PATH}"))
+
+def main():
+    import argparse
+
+    from orchestrator import state_store
+
+    parser = argparse.ArgumentParser(description="Watch the SLAs and alert an orchestrator served over A2A")
+    parser.add_argument("--oa-url", default="http://localhost:8001")
+    parser.add_argument("--tick-s", type=float, default=5.0)
+    parser.add_argument("--debounce-s", type=float, default=10.0)
+    parser.add_argument("--clear-margin", type=float, default=0.1)
+    parser.add_argument("--repeat-s", type=float, default=120.0)
+    args = parser.parse_args()
+    if not os.environ.get("OA_STATE_STORE", "").startswith("sqlite:///"):
+        parser.error("the watcher needs the orchestrators' shared state: set OA_STATE_STORE=sqlite:///path.db")
+    logging.basicConfig(level=logging.INFO)
+
+    watcher = SlaWatcher(state_store.from_env(), sla.load_slas(), a2a_trigger(args.oa_url), tick_s=args.tick_s,
+                         debounce_s=args.debounce_s, clear_margin=args.clear_margin, repeat_s=args.repeat_s)
+    asyncio.run(watcher.run())
+
+if __name__ == "__main__":
+    main()
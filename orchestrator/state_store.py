@@ -0,0 +1,248 @@
+"""Where the orchestrator's cluster state lives.
+
+Tools read the cluster through `store.read()` and change it only through
+`store.mutate(fn)`, so the same tools work against either backend:
+
+* `InProcessStore` keeps one `Cluster` in memory. This is the default and matches the
+  old module-global cluster. Mutations are not serialized: the cluster's own per-node
+  and per-service locks keep concurrent tool calls consistent.
+* `SQLiteStore` keeps the cluster snapshot in a SQLite database in WAL mode, shared by
+  every process that opens it (e.g. several uvicorn workers of run_OA.py). Each process
+  caches the decoded cluster and reloads it only when the stored version moved on. A
+  reload decodes into a new `Cluster` rather than restoring the cached one in place, so a
+  reader still holding the cluster `read()` returned keeps a consistent (older) state.
+  Mutations are optimistic: `fn` runs on the cached state and the result is written
+  back only if the version is still the one it was computed from; otherwise the state
+  is reloaded and `fn` retried. After `optimistic_retries` lost races the writer takes
+  SQLite's write lock for its next attempt, so a busy key cannot starve it.
+
+  Every committed mutation pickles and rewrites the whole snapshot, and every other
+  process decodes it in full on its next read, so writes cost O(cluster size); for large
+  clusters with frequent writes a store logging only the changes scales better.
+
+A third backend, `snapshot.SnapshotStore`, keeps the in-process cluster on disk as a
+snapshot plus a change log, so a restarted orchestrator picks up where it left off. Its
+writes append only what changed, but it serves a single process.
+
+Listeners registered with `subscribe` are called after every mutation this process
+commits; changes made by other processes show up on the next `read()` only.
+
+`from_env()` picks the backend from $OA_STATE_STORE ("memory", "sqlite:///path.db" or
+"file:///path.snap" for a SnapshotStore).
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import uuid
+from typing import Callable, Optional, Tuple, TypeVar
+
+from orchestrator.k8s_sim import Cluster
+
+T = TypeVar("T")
+
+class StateStore:
+    def read(self) -> Cluster:
+        """The current cluster; treat it as read-only and change it through `mutate`.
+
+        Read it once per operation: a later `read()` may return another object.
+        """
+        raise NotImplementedError
+
+    def mutate(self, fn: Callable[[Cluster], T]) -> T:
+        """Applies `fn` to the current cluster as one atomic change and returns its result.
+
+        If `fn` raises, none of its changes are kept.
+        """
+        raise NotImplementedError
+
+    @property
+    def version(self) -> int:
+        raise NotImplementedError
+
+    def subscribe(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Calls `listener()` after each committed mutation; returns a function that unsubscribes it.
+
+        Listeners run on the mutating thread and must return quickly.
+        """
+        self._listeners = [*getattr(self, "_listeners", ()), listener]
+
+        def unsubscribe():
+            self._listeners = [other for other in self._listeners if other is not listener]
+        return unsubscribe
+
+    def close(self):
+        """Releases what the store holds open; a no-op for most backends."""
+
+    def _notify(self):
+        for listener in getattr(self, "_listeners", ()):
+            listener()
+
+    def cache_key(self, persistent: bool) -> Optional[str]:
+        """Key of the cluster state for a cache: `state_key` if the cache is `persistent`, else `version_key`."""
+        return self.state_key() if persistent else self.version_key()
+
+    def version_key(self) -> Optional[str]:
+        """This store and its version: a free key for in-process caches. None as for `state_key`."""
+        if self.read().latency_source is not None:
+            return None
+        identity = getattr(self, "_identity", None)
+        if identity is None:
+            identity = self._identity = uuid.uuid4().hex
+        return f"{identity}:{self.version}"
+
+    def state_key(self) -> Optional[str]:
+        """Content hash of the cluster state, recomputed only after the version moved on.
+
+        Unlike `version` it means the same thing across processes and restarts, so it can
+        key persistent caches; hashing is O(pods), so in-process caches use `version_key`.
+        None while a live latency source (e.g. a des.Simulation) drives the metrics, since
+        those change without any mutation.
+        """
+        if self.read().latency_source is not None:
+            return None
+        version = self.version
+        memo = getattr(self, "_state_key", None)
+        if memo is not None and memo[0] == version:
+            return memo[1]
+        snapshot = self.read().snapshot()
+        key = hashlib.blake2b(pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL), digest_size=16).hexdigest()
+        if self.version == version:
+            self._state_key = (version, key)
+        return key
+
+class InProcessStore(StateStore):
+    def __init__(self, cluster: Optional[Cluster] = None):
+        self.cluster = cluster if cluster is not None else Cluster()
+
+    def read(self) -> Cluster:
+        return self.cluster
+
+    def mutate(self, fn: Callable[[Cluster], T]) -> T:
+        # The undo journal is per thread, so concurrent mutations only roll back their own changes
+        self.cluster.checkpoint()
+        try:
+            result = fn(self.cluster)
+        except BaseException:
+            self.cluster.rollback()
+            raise
+        self.cluster.commit()
+        self._notify()
+        return result
+
+    @property
+    def version(self) -> int:
+        return self.cluster.version
+
+class SQLiteStore(StateStore):
+    def __init__(self, path: str, optimistic_retries: int = 3, initial: Optional[Cluster] = None):
+        self.path = path
+        self.optimistic_retries = optimistic_retries
+        self.stats = {"reads": 0, "reloads": 0, "commits": 0, "conflicts": 0, "locked_writes": 0}
+        # One connection per thread; the cached cluster is shared, guarded by the lock
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._cluster = Cluster()
+        self._version = -1
+        conn = self._conn()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cluster_state ("
+                         "id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL, data BLOB NOT NULL)")
+            # The first process to open the database seeds it; later ones pick up what is there
+            conn.execute("INSERT OR IGNORE INTO cluster_state (id, version, data) VALUES (1, 0, ?)",
+                         (self._encode(initial or Cluster()),))
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _encode(cluster: Cluster) -> bytes:
+        # The database is private to the orchestrator's processes, so pickle is acceptable here
+        return pickle.dumps(cluster.snapshot(), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _refresh(self):
+        """Reloads the cached cluster if another writer moved the stored version on."""
+        conn = self._conn()
+        (version,) = conn.execute("SELECT version FROM cluster_state WHERE id = 1").fetchone()
+        if version != self._version:
+            row = conn.execute("SELECT version, data FROM cluster_state WHERE id = 1").fetchone()
+            # restore() is not safe while other threads use the cluster, so readers of the old one keep it
+            cluster = Cluster()
+            cluster.restore(pickle.loads(row[1]))
+            self._cluster, self._version = cluster, row[0]
+            self.stats["reloads"] += 1
+
+    def read(self) -> Cluster:
+        with self._lock:
+            self.stats["reads"] += 1
+            self._refresh()
+            return self._cluster
+
+    def _apply(self, fn: Callable[[Cluster], T], conn: sqlite3.Connection) -> Tuple[bool, T]:
+        """Runs `fn` on fresh state and writes the result back if nobody else wrote meanwhile."""
+        self._refresh()
+        base = self._version
+        self._cluster.checkpoint()
+        try:
+            result = fn(self._cluster)
+        except BaseException:
+            self._cluster.rollback()
+            raise
+        self._cluster.commit()
+        updated = conn.execute("UPDATE cluster_state SET version = ?, data = ? WHERE id = 1 AND version = ?",
+                               (base + 1, self._encode(self._cluster), base)).rowcount
+        if not updated:
+            # Lost the race: the cached state is stale, so force a reload
+            self.stats["conflicts"] += 1
+            self._version = -1
+            return False, result
+        self._version = base + 1
+        self.stats["commits"] += 1
+        return True, result
+
+    def mutate(self, fn: Callable[[Cluster], T]) -> T:
+        result = self._mutate(fn)
+        self._notify()
+        return result
+
+    def _mutate(self, fn: Callable[[Cluster], T]) -> T:
+        with self._lock:
+            conn = self._conn()
+            for _ in range(self.optimistic_retries):
+                done, result = self._apply(fn, conn)
+                if done:
+                    return result
+            # Holding the write lock no one else can bump the version, so this attempt wins
+            self.stats["locked_writes"] += 1
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                done, result = self._apply(fn, conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._version
+
+def from_env(default: str = "memory") -> StateStore:
+    spec = os.environ.get("OA_STATE_STORE", default)
+    if spec == "memory":
+        return InProcessStore()
+    if spec.startswith("sqlite:///"):
+        return SQLiteStore(spec[len("sqlite:///"):])
+    if spec.startswith("file:///"):
+        from orchestrator.snapshot import SnapshotStore
+        return SnapshotStore(spec[len("file:///"):])
+    raise ValueError(f"Unknown OA_STATE_STORE {spec}; use 'memory', 'sqlite:///path.db' or 'file:///path.snap'")
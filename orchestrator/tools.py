@@ -1,10 +1,43 @@
-from orchestrator.k8s_sim import Cluster
+from orchestrator import sla, state_store, what_if
+from shared.cache import cached_tool, from_spec
+from shared.instrumentation import instrumented_tool, metrics
 import json
+import math
+import os
+import time
+from typing import Optional
 
-cluster = Cluster() 
+# Cluster state: in-process by default, shared by several OA processes, or kept on disk across
+# restarts ($OA_STATE_STORE).
+# Tools read through store.read() and change state only through store.mutate(), by way of
+# _mutate(), which counts and times every operation.
+store = state_store.from_env()
+slas = sla.load_slas()
+
+# Results of the read-only tools per arguments and cluster state ($OA_TOOL_CACHE: "memory",
+# "sqlite:///path.db" or "off"); any mutation changes the state key, so nothing goes stale.
+# Tools reading live metrics are not cached: their latency jitter and timestamp are new on every call.
+tool_cache = from_spec(os.environ.get("OA_TOOL_CACHE", "memory"))
+
+def _state_key() -> Optional[str]:
+    # An in-process cache only has to notice a new version; a persistent one needs the content hash
+    return store.cache_key(tool_cache.persistent)
+
+def _mutate(op: str, fn):
+    """store.mutate(fn), counted and timed as cluster operation `op`."""
+    start = time.perf_counter()
+    status = "error"
+    try:
+        result = store.mutate(fn)
+        status = "ok"
+        return result
+    finally:
+        metrics.observe("cluster_operation_seconds", time.perf_counter() - start, op=op)
+        metrics.inc("cluster_operations_total", op=op, status=status)
 
 # --- OA Tools ---
 
+@instrumented_tool
 def get_cluster_metrics() -> dict:
     """Retrieves the current performance metrics of the Kubernetes cluster.
     
@@ -12,13 +45,140 @@ def get_cluster_metrics() -> dict:
         dict: A dictionary containing metrics for nodes, services, and the cluster summary.
               Includes CPU usage, latency, and pod counts.
     """
-    print("\n[Tool Call] get_cluster_metrics")
     try:
-        metrics = cluster.get_metrics()
+        metrics = store.read().get_metrics()
         return {"status": "ok", "result": metrics}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
+@instrumented_tool
+def get_cluster_summary() -> dict:
+    """Retrieves a compact overview of the cluster. Start here instead of fetching every node.
+    
+    Returns:
+        dict: A status-aware response. `result` holds cluster totals, the busiest node,
+              how many nodes are above the CPU SLA, per-service pod counts and latency,
+              and the number of SLA violations.
+    """
+    try:
+        return {"status": "ok", "result": _compact(_summary(store.read().get_metrics()))}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+def _summary(metrics: dict) -> dict:
+    hot = sla.node_violations(metrics, slas)
+    services = sla.service_violations(metrics, slas)
+    busiest = max(metrics["nodes"].items(), key=lambda item: item[1]["cpu_utilization_pct"], default=None)
+    return {
+        "cluster": metrics["cluster"],
+        "busiest_node": {"node": busiest[0], "cpu_utilization_pct": busiest[1]["cpu_utilization_pct"]} if busiest else None,
+        "nodes_over_cpu_sla": len(hot),
+        "services": {
+            name: {"pods": svc["pod_count"], "running": svc["running_pods"], "latency_ms": svc["avg_latency_ms"]}
+            for name, svc in metrics["services"].items()
+        },
+        "sla_violations": len(hot) + len(services),
+    }
+
+@instrumented_tool
+def get_hot_nodes(cpu_threshold_pct: float = 80.0, top_k: int = 10, pods_per_node: int = 5) -> dict:
+    """Lists the most loaded nodes above a CPU utilization threshold, with their largest pods.
+    
+    Args:
+        cpu_threshold_pct: Only nodes above this CPU utilization (in percent) are returned.
+        top_k: Maximum number of nodes to return, most loaded first.
+        pods_per_node: Maximum number of pods listed per node (largest CPU request first),
+                       so their IDs can be passed to `move_pod()`.
+        
+    Returns:
+        dict: A status-aware response. `result` has `nodes` (the top-K hot nodes) and
+              `total_hot` (how many nodes are above the threshold in total).
+    """
+    try:
+        cluster = store.read()
+        metrics = cluster.get_metrics()
+        hot = sorted(
+            ((name, node) for name, node in metrics["nodes"].items() if node["cpu_utilization_pct"] > cpu_threshold_pct),
+            key=lambda item: item[1]["cpu_utilization_pct"], reverse=True,
+        )
+        nodes = []
+        for name, node in hot[:top_k]:
+            pods = sorted(cluster.nodes[name].pods.values(), key=lambda p: p.cpu_request, reverse=True)[:pods_per_node]
+            nodes.append({"node": name, **node,
+                          "pods": [{"pod_id": p.id, "service": p.service_name, "cpu_request": p.cpu_request} for p in pods]})
+        return {"status": "ok", "result": _compact({"nodes": nodes, "total_hot": len(hot)})}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+@instrumented_tool
+def get_sla_violations(top_k: int = 20) -> dict:
+    """Lists only the services and nodes that currently violate their SLA.
+    
+    Args:
+        top_k: Maximum number of violating nodes to list, most loaded first.
+    
+    Returns:
+        dict: A status-aware response. `result` has `services` (latency above the SLA)
+              and `nodes` (CPU utilization above the SLA), worst first, plus
+              `total_nodes` violating. No violations means all SLAs are met.
+    """
+    try:
+        metrics = store.read().get_metrics()
+        nodes = sla.node_violations(metrics, slas)
+        return {"status": "ok", "result": _compact({
+            "services": sla.service_violations(metrics, slas),
+            "nodes": nodes[:top_k],
+            "total_nodes": len(nodes),
+        })}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+@instrumented_tool
+def get_cluster_metrics_page(section: str = "nodes", page: int = 1, page_size: int = 50, sort_by: str = "") -> dict:
+    """Retrieves one page of node or service metrics.
+    
+    Args:
+        section: Either 'nodes' or 'services'.
+        page: 1-based page number.
+        page_size: Number of entries per page.
+        sort_by: Optional metric to sort by, descending (e.g. 'cpu_utilization_pct' for nodes,
+                 'avg_latency_ms' for services). With page=1 this returns the top-K entries.
+        
+    Returns:
+        dict: A status-aware response. `result` has the page `items`, plus `page`,
+              `total_pages` and `total_items`.
+    """
+    try:
+        if section not in ("nodes", "services"):
+            raise ValueError(f"Unknown section {section} (expected 'nodes' or 'services')")
+        if page < 1 or page_size < 1:
+            raise ValueError("page and page_size must be positive")
+        entries = list(store.read().get_metrics()[section].items())
+        if sort_by:
+            if entries and sort_by not in entries[0][1]:
+                raise ValueError(f"Unknown metric {sort_by} for {section}")
+            entries.sort(key=lambda item: item[1][sort_by], reverse=True)
+        start = (page - 1) * page_size
+        return {"status": "ok", "result": _compact({
+            "items": dict(entries[start:start + page_size]),
+            "page": page,
+            "total_pages": math.ceil(len(entries) / page_size),
+            "total_items": len(entries),
+        })}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+def _compact(value):
+    # Two decimals are plenty for the model and noticeably shrink large payloads
+    if isinstance(value, float):
+        return round(value, 2)
+    if isinstance(value, dict):
+        return {k: _compact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_compact(v) for v in value]
+    return value
+
+@instrumented_tool
 def scale_service(service_name: str, replicas: int) -> dict:
     """Scales a specific service to a target number of replicas.
     
@@ -28,14 +188,17 @@ def scale_service(service_name: str, replicas: int) -> dict:
         
     Returns:
         dict: A status-aware response with keys `status` and `message` or `error`.
+              On success `result` holds the placement report: running and pending
+              pod counts and the pods placed per node.
     """
-    print(f"\n[Tool Call] scale_service(service_name='{service_name}', replicas={replicas})")
     try:
-        cluster.scale_service(service_name, replicas)
-        return {"status": "ok", "message": f"Successfully scaled {service_name} to {replicas} replicas."}
+        report = _mutate("scale_service", lambda cluster: cluster.scale_service(service_name, replicas))
+        return {"status": "ok", "message": _placement_message(f"Scaled {service_name} to {replicas} replicas", report),
+                "result": report}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
+@instrumented_tool
 def move_pod(pod_id: str, target_node: str) -> dict:
     """Moves a specific pod to a different node.
     
@@ -46,13 +209,31 @@ def move_pod(pod_id: str, target_node: str) -> dict:
     Returns:
         dict: A status-aware response with keys `status` and `message` or `error`.
     """
-    print(f"\n[Tool Call] move_pod(pod_id='{pod_id}', target_node='{target_node}')")
     try:
-        cluster.move_pod(pod_id, target_node)
+        _mutate("move_pod", lambda cluster: cluster.move_pod(pod_id, target_node))
         return {"status": "ok", "message": f"Successfully moved pod {pod_id} to {target_node}."}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
+@instrumented_tool
+def rebalance_cluster(cpu_threshold_pct: float = 80.0) -> dict:
+    """Moves pods off every node whose CPU utilization is above a threshold, in one call.
+    
+    Args:
+        cpu_threshold_pct: Nodes above this CPU utilization (in percent) are relieved.
+        
+    Returns:
+        dict: A status-aware response. On success `result` lists the `moves` made,
+              the `hot_nodes` found and the nodes that are `still_hot` afterwards.
+    """
+    try:
+        result = _mutate("rebalance", lambda cluster: cluster.rebalance(cpu_threshold_pct))
+        return {"status": "ok", "message": f"Moved {len(result['moves'])} pods off {len(result['hot_nodes'])} hot nodes.",
+                "result": result}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+@instrumented_tool
 def deploy_service(name: str, replicas: int, cpu_request: float, memory_request: float) -> dict:
     """Deploys a new service to the cluster.
     
@@ -63,11 +244,116 @@ def deploy_service(name: str, replicas: int, cpu_request: float, memory_request:
         memory_request: Memory units required per pod.
     
     Returns:
-        dict: Status message.
+        dict: Status message and, under `result`, the placement report.
     """
-    print(f"\n[Tool Call] deploy_service(name='{name}', ...)")
     try:
-        cluster.deploy_service(name, replicas, cpu_request, memory_request)
-        return {"status": "ok", "message": f"Successfully deployed service '{name}'."}
+        report = _mutate("deploy_service", lambda cluster: cluster.deploy_service(name, replicas, cpu_request, memory_request))
+        return {"status": "ok", "message": _placement_message(f"Deployed service '{name}'", report),
+                "result": report}
     except Exception as e:
-        return {"status": "error", "error": str(e)}
\ No newline at end of file
+        return {"status": "error", "error": str(e)}
+
+@instrumented_tool
+def apply_manifest(services: list[dict]) -> dict:
+    """Deploys or scales several services in a single call.
+    
+    Args:
+        services: One entry per service, e.g. {"name": "backend", "replicas": 5}.
+                  New services also need "cpu_request" and "memory_request".
+    
+    Returns:
+        dict: A status-aware response. On success `result` holds a placement
+              report per service plus the total running and pending pods.
+    """
+    try:
+        result = _mutate("apply_manifest", lambda cluster: cluster.apply_manifest(services))
+        message = f"Applied manifest for {len(services)} services."
+        if result["pending"]:
+            message += f" {result['pending']} pods could not be placed (insufficient capacity) and are Pending."
+        return {"status": "ok", "message": message, "result": result}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+@instrumented_tool
+def apply_plan(actions: list[dict]) -> dict:
+    """Applies an ordered list of actions as one atomic change and returns the resulting cluster state.
+    
+    Use it for multi-step fixes instead of separate `scale_service()`/`move_pod()` calls.
+    The whole plan is tried on a copy of the cluster first; if any step fails, nothing is
+    changed and the error names the step. Actions have the same format as
+    `evaluate_what_if()` candidates, so its recommendation can be applied as is.
+    
+    Args:
+        actions: Steps to apply in order, e.g.
+                 [{"action": "scale_service", "service_name": "backend", "replicas": 6},
+                  {"action": "move_pod", "pod_id": "1a2b3c4d", "target_node": "node-3"},
+                  {"action": "rebalance_cluster", "cpu_threshold_pct": 80.0},
+                  {"action": "apply_manifest", "services": [{"name": "frontend", "replicas": 4}]}].
+    
+    Returns:
+        dict: A status-aware response. On success `result` has the outcome of each of the
+              `steps`, the cluster `summary` afterwards (as from `get_cluster_summary()`)
+              and the remaining `sla_violations`, so no follow-up metrics call is needed.
+    """
+    try:
+        # A bad step is found on a copy, before the live state is locked or touched
+        what_if.run_plan(store.read().fork(), actions)
+        steps = _mutate("apply_plan", lambda cluster: what_if.run_plan(cluster, actions))
+        metrics = store.read().get_metrics()
+        nodes = sla.node_violations(metrics, slas)
+        pending = sum(step.get("pending", 0) for step in steps)
+        message = f"Applied all {len(steps)} actions."
+        if pending:
+            message += f" {pending} pods could not be placed (insufficient capacity) and are Pending."
+        return {"status": "ok", "message": message, "result": _compact({
+            "steps": steps,
+            "summary": _summary(metrics),
+            "sla_violations": {"services": sla.service_violations(metrics, slas), "nodes": nodes[:10],
+                               "total_nodes": len(nodes)},
+        })}
+    except ValueError as e:
+        return {"status": "error", "error": f"{e}. Nothing was changed."}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+@instrumented_tool
+@cached_tool(tool_cache, state=_state_key)
+def evaluate_what_if(candidates: list[dict], top_k: int = 5) -> dict:
+    """Predicts the outcome of several candidate actions without changing the cluster, best first.
+    
+    Each candidate is tried on its own copy of the cluster and ranked by predicted nodes
+    above the CPU SLA, then all SLA violations, Pending pods, how far latency/CPU exceed
+    the SLAs, the busiest node's CPU and pod count. Use it to compare options before
+    acting, then apply the best one.
+    
+    Args:
+        candidates: Actions to compare, each with an "action" and its arguments:
+                    {"action": "scale_service", "service_name": "backend", "replicas": 6},
+                    {"action": "move_pod", "pod_id": "1a2b3c4d", "target_node": "node-3"},
+                    {"action": "rebalance_cluster", "cpu_threshold_pct": 80.0},
+                    {"action": "apply_manifest", "services": [{"name": "backend", "replicas": 6}]}.
+        top_k: Number of ranked candidates to return.
+    
+    Returns:
+        dict: A status-aware response. On success `result` holds the `baseline` (no action)
+              outcome, the `ranked` top candidates with their predicted `outcome` and whether
+              each `improves` on the baseline, and the `recommendation` (best improving
+              candidate, or None if no candidate beats doing nothing).
+    """
+    try:
+        result = what_if.evaluate(store.read(), candidates, slas)
+        ranked = result["ranked"]
+        best = ranked[0] if ranked and ranked[0]["improves"] else None
+        return {"status": "ok", "result": _compact({
+            "baseline": result["baseline"],
+            "ranked": ranked[:max(top_k, 1)],
+            "recommendation": best["candidate"] if best else None,
+        })}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+def _placement_message(action: str, report: dict) -> str:
+    if report["pending"]:
+        return (f"{action}: {report['running']} running, {report['pending']} pending "
+                f"(insufficient capacity).")
+    return f"{action}: {report['running']} running."
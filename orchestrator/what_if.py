@@ -0,0 +1,162 @@
+"""What-if evaluation of candidate actions on forks of the cluster state.
+
+Candidates are applied to a fork of the cluster restored from one `Cluster.snapshot()`
+and scored without touching the live cluster; between candidates the fork is rolled
+back through its undo journal (`checkpoint`/`rollback`), so each candidate only pays
+for the changes it makes. Predicted service latency is the jitter-free `get_metrics`
+latency plus, for services with a known request rate (`Cluster.request_rates`), the
+steady-state queueing delay of `des.queueing_delay_ms`. Large batches are spread over
+a process pool; candidates are ranked by nodes above the CPU SLA, then all SLA
+violations, Pending pods, SLA overshoot, the busiest node's CPU and pod count. Nodes
+come first so that no candidate buys a service's latency with saturated nodes.
+
+A candidate is a dict with an `action` and that action's arguments:
+    {"action": "scale_service", "service_name": "backend", "replicas": 6}
+    {"action": "move_pod", "pod_id": "1a2b3c4d", "target_node": "node-3"}
+    {"action": "rebalance_cluster", "cpu_threshold_pct": 80.0}
+    {"action": "apply_manifest", "services": [{"name": "backend", "replicas": 6}, ...]}
+
+`run_plan` applies an ordered list of such actions, which is how the `apply_plan` tool
+carries out a multi-step remediation in one call.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from orchestrator import sla
+from orchestrator.des import POD_CAPACITY_RPS, queueing_delay_ms
+from orchestrator.k8s_sim import Cluster
+
+# Below this many candidates the pool's IPC and snapshot pickling cost more than they save
+MIN_PARALLEL_CANDIDATES = 32
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+def apply_action(cluster: Cluster, candidate: Dict):
+    """Applies one candidate action and returns what the cluster operation returned."""
+    action = candidate.get("action")
+    if action == "none":
+        return None
+    if action == "scale_service":
+        return cluster.scale_service(candidate["service_name"], candidate["replicas"])
+    if action == "move_pod":
+        return cluster.move_pod(candidate["pod_id"], candidate["target_node"])
+    if action == "rebalance_cluster":
+        return cluster.rebalance(candidate.get("cpu_threshold_pct", 80.0))
+    if action == "apply_manifest":
+        return cluster.apply_manifest(candidate["services"])
+    raise ValueError(f"Unknown action {action}")
+
+def run_plan(cluster: Cluster, plan: List[Dict]) -> List[Dict]:
+    """Applies the actions of `plan` in order and returns one result entry per step.
+
+    A failing step raises ValueError naming the step; run it inside `StateStore.mutate` (or
+    on a fork) so the steps before it are rolled back too.
+    """
+    if not plan:
+        raise ValueError("The plan has no actions")
+    steps = []
+    for i, action in enumerate(plan, 1):
+        if not isinstance(action, dict):
+            raise ValueError(f"Step {i} is not an action object: {action!r}")
+        try:
+            result = apply_action(cluster, action)
+        except KeyError as e:
+            raise ValueError(f"Step {i} {action}: missing argument {e}") from e
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Step {i} {action}: {e}") from e
+        step = {"step": i, "action": action.get("action")}
+        if isinstance(result, dict):
+            # Placement reports and rebalance results, without the per-node detail
+            step.update({key: result[key] for key in ("running", "pending") if key in result})
+            if "moves" in result:
+                step.update(moves=len(result["moves"]), still_hot=len(result["still_hot"]))
+        steps.append(step)
+    return steps
+
+def predict(cluster: Cluster, slas: Dict = sla.DEFAULT_SLAS, pod_capacity_rps: float = POD_CAPACITY_RPS) -> Dict:
+    """Predicted SLA and utilization outcome of the cluster's current state."""
+    metrics = cluster.get_metrics(jitter=False)
+    for name, rps in cluster.request_rates.items():
+        svc = metrics["services"].get(name)
+        if svc is not None:
+            svc["avg_latency_ms"] += queueing_delay_ms(rps, svc["running_pods"], pod_capacity_rps)
+    report = sla.evaluate(metrics, slas)
+    overshoot = sum(v["avg_latency_ms"] / v["threshold_ms"] - 1
+                    for v in report["services"] if v["reason"] == "latency")
+    overshoot += sum(v["cpu_utilization_pct"] / v["threshold_pct"] - 1 for v in report["nodes"])
+    services = metrics["services"].values()
+    return {
+        "sla_ok": report["ok"],
+        "violations": len(report["services"]) + len(report["nodes"]),
+        "node_violations": len(report["nodes"]),
+        "sla_overshoot": overshoot,
+        "latency_ms": {name: svc["avg_latency_ms"] for name, svc in metrics["services"].items()},
+        "pending_pods": sum(svc["pod_count"] - svc["running_pods"] for svc in services),
+        "total_pods": sum(svc["pod_count"] for svc in services),
+        "max_node_cpu_pct": max((node["cpu_utilization_pct"] for node in metrics["nodes"].values()), default=0),
+        "overall_cpu_pct": metrics["cluster"]["overall_cpu_utilization_pct"],
+    }
+
+def rank_key(outcome: Dict) -> tuple:
+    if "error" in outcome:
+        return (1,)
+    return (0, outcome["node_violations"], outcome["violations"], outcome["pending_pods"],
+            round(outcome["sla_overshoot"], 6), round(outcome["max_node_cpu_pct"], 6), outcome["total_pods"])
+
+def _evaluate_chunk(snapshot: Dict, candidates: List[Dict], slas: Dict, pod_capacity_rps: float) -> List[Dict]:
+    # One fork per chunk; each candidate's changes are rolled back before the next one
+    fork = Cluster()
+    fork.restore(snapshot)
+    outcomes = []
+    for candidate in candidates:
+        fork.checkpoint()
+        try:
+            apply_action(fork, candidate)
+            outcomes.append(predict(fork, slas, pod_capacity_rps))
+        except (KeyError, TypeError, ValueError) as e:
+            outcomes.append({"error": f"{type(e).__name__}: {e}"})
+        finally:
+            fork.rollback()
+    return outcomes
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    # One long-lived pool; spawn rather than fork, since the A2A server runs other threads
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        _pool_workers = workers
+    return _pool
+
+def evaluate(cluster: Cluster, candidates: List[Dict], slas: Optional[Dict] = None, workers: Optional[int] = None,
+             pod_capacity_rps: float = POD_CAPACITY_RPS) -> Dict:
+    """Scores every candidate on a fork of `cluster` and ranks them, best first.
+
+    Returns the `baseline` outcome (no action) and `ranked` entries of `candidate`,
+    `outcome` and `improves` (whether it ranks better than doing nothing). Candidates
+    that fail (e.g. an unknown pod) are ranked last with an `error` outcome.
+    """
+    slas = slas or sla.DEFAULT_SLAS
+    snapshot = cluster.snapshot()
+    batch = [{"action": "none"}] + list(candidates)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(batch) < MIN_PARALLEL_CANDIDATES:
+        outcomes = _evaluate_chunk(snapshot, batch, slas, pod_capacity_rps)
+    else:
+        size = -(-len(batch) // workers)
+        chunks = [batch[i:i + size] for i in range(0, len(batch), size)]
+        pool = _get_pool(workers)
+        futures = [pool.submit(_evaluate_chunk, snapshot, chunk, slas, pod_capacity_rps) for chunk in chunks]
+        outcomes = [outcome for future in futures for outcome in future.result()]
+
+    baseline, outcomes = outcomes[0], outcomes[1:]
+    ranked = sorted(
+        ({"candidate": candidate, "outcome": outcome, "improves": rank_key(outcome) < rank_key(baseline)}
+         for candidate, outcome in zip(candidates, outcomes)),
+        key=lambda entry: rank_key(entry["outcome"]),
+    )
+    return {"baseline": baseline, "ranked": ranked}
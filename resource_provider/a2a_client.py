@@ -0,0 +1,281 @@
+"""Shared HTTP plumbing for the RPA's A2A calls to orchestrator agents.
+
+All remote orchestrator agents share one pooled `httpx.AsyncClient` per set of
+endpoints: keep-alive connections, connection limits and timeouts come from
+configuration (DEFAULT_HTTP_CONFIG, overridable through the agent config's "http"
+entry). Agent cards are cached for `card_ttl_s`, so new agents and sessions reuse a
+resolved card instead of fetching it again.
+
+With several orchestrator endpoints, `BalancingTransport` sends each request to the
+healthy endpoint with the fewest requests in flight. Endpoints are health-checked in
+the background by fetching their agent card; one that refuses connections or answers
+with a 5xx is taken out of rotation until a later check passes, and requests that
+failed to connect are retried on another endpoint. An orchestrator shedding load answers
+503 with a Retry-After header (see orchestrator.admission): such a request goes to
+another endpoint, or, once every endpoint shed it, is retried after the time asked for
+(at most `max_retry_after_s`, `shed_retries` times) before the 503 is returned.
+
+Cards are served by the endpoints: a fetched card's RPC URLs are re-pointed at the origin
+it was fetched from, so requests stay on the pool even when the orchestrator advertises
+another name for itself (0.0.0.0, localhost, a public host name). Loopback aliases
+(localhost, 127.0.0.1, ::1, 0.0.0.0) count as one host when matching endpoints.
+
+Every request carries the current trace context, and each remote agent turn is timed as
+a2a_round_trip_seconds (see shared.instrumentation).
+
+A shared client's connection pool and the card cache's locks belong to the event loop
+that first uses them, so each process should drive its agents from a single loop, as
+run_RPA.py and run_RPA_batch.py do. An agent used from another loop needs its own
+client (a different `http_config`, or a SharedClient of its own).
+"""
+import asyncio
+import ipaddress
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from a2a.client import A2ACardResolver
+from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH, RemoteA2aAgent
+
+from shared.instrumentation import inject_trace_context, metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HTTP_CONFIG = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry_s": 30.0,
+    "connect_timeout_s": 5.0,
+    # Orchestrator turns include LLM calls, so reads get a generous timeout
+    "read_timeout_s": 600.0,
+    "write_timeout_s": 30.0,
+    "pool_timeout_s": 30.0,
+    "card_ttl_s": 300.0,
+    "health_interval_s": 10.0,
+    "health_timeout_s": 2.0,
+    "shed_retries": 2,
+    "max_retry_after_s": 10.0,
+}
+
+def _is_local(host: str) -> bool:
+    if host == "localhost" or host.endswith(".localhost"):
+        return True
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return address.is_loopback or address.is_unspecified
+
+def _origin(url: httpx.URL) -> Tuple[str, str, Optional[int]]:
+    return url.scheme, "localhost" if _is_local(url.host) else url.host, url.port
+
+def _repoint(card, url: str):
+    """`card` with every RPC URL moved to the origin of `url`, the one it was fetched from."""
+    source = httpx.URL(url)
+    for interface in card.supported_interfaces:
+        interface.url = str(httpx.URL(interface.url).copy_with(scheme=source.scheme, host=source.host,
+                                                                 port=source.port))
+    return card
+
+class Endpoint:
+    def __init__(self, base_url: str):
+        self.url = httpx.URL(base_url)
+        self.healthy = True
+        self.in_flight = 0
+        self.requests = 0
+
+    def __repr__(self):
+        return f"<Endpoint {self.url} {'healthy' if self.healthy else 'down'} in_flight={self.in_flight}>"
+
+class BalancingTransport(httpx.AsyncBaseTransport):
+    """Spreads requests addressed to any of `endpoints` over the healthy ones."""
+
+    def __init__(self, endpoints: List[str], transport: httpx.AsyncBaseTransport,
+                 health_path: str = AGENT_CARD_WELL_KNOWN_PATH, health_interval_s: float = 10.0,
+                 health_timeout_s: float = 2.0, shed_retries: int = 2, max_retry_after_s: float = 10.0):
+        self.endpoints = [Endpoint(url) for url in endpoints]
+        self._by_origin = {_origin(endpoint.url): endpoint for endpoint in self.endpoints}
+        self._transport = transport
+        self._health_path = health_path
+        self._health_interval_s = health_interval_s
+        self._health_timeout_s = health_timeout_s
+        self._shed_retries = shed_retries
+        self._max_retry_after_s = max_retry_after_s
+        self._health_task: Optional[asyncio.Task] = None
+        self._turn = itertools.count()
+
+    def _pick(self, exclude: set) -> Endpoint:
+        candidates = [e for e in self.endpoints if e.healthy and e not in exclude]
+        if not candidates:
+            # Everything looks down: try the endpoints anyway rather than failing without a request
+            candidates = [e for e in self.endpoints if e not in exclude] or self.endpoints
+        least = min(e.in_flight for e in candidates)
+        candidates = [e for e in candidates if e.in_flight == least]
+        return candidates[next(self._turn) % len(candidates)]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if _origin(request.url) not in self._by_origin:
+            return await self._transport.handle_async_request(request)
+        if self._health_task is None and self._health_interval_s > 0 and len(self.endpoints) > 1:
+            self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+
+        tried = set()
+        retries = self._shed_retries
+        while True:
+            endpoint = self._pick(tried)
+            tried.add(endpoint)
+            request.url = request.url.copy_with(scheme=endpoint.url.scheme, host=endpoint.url.host,
+                                                port=endpoint.url.port)
+            request.headers["Host"] = request.url.netloc.decode("ascii")
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+            try:
+                response = await self._transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                # Nothing was sent, so another endpoint can safely take the request
+                endpoint.healthy = False
+                logger.warning("Orchestrator endpoint %s unreachable, taking it out of rotation", endpoint.url)
+                if len(tried) == len(self.endpoints):
+                    raise
+                continue
+            finally:
+                endpoint.in_flight -= 1
+            retry_after = _retry_after_s(response)
+            if retry_after is not None:
+                # Overloaded rather than down; the request was not processed, so it can be sent again
+                if len(tried) == len(self.endpoints) and retries == 0:
+                    return response
+                await response.aclose()
+                if len(tried) == len(self.endpoints):
+                    retries -= 1
+                    tried.clear()
+                    await asyncio.sleep(min(retry_after, self._max_retry_after_s))
+                continue
+            if response.status_code in (502, 503, 504):
+                endpoint.healthy = False
+            return response
+
+    async def check_health(self):
+        async def probe(endpoint: Endpoint):
+            request = httpx.Request("GET", endpoint.url.join(self._health_path),
+                                    extensions={"timeout": httpx.Timeout(self._health_timeout_s).as_dict()})
+            try:
+                response = await self._transport.handle_async_request(request)
+                await response.aread()
+                healthy = response.status_code < 500
+            except httpx.HTTPError:
+                healthy = False
+            if healthy != endpoint.healthy:
+                logger.info("Orchestrator endpoint %s is %s", endpoint.url, "back up" if healthy else "down")
+            endpoint.healthy = healthy
+        await asyncio.gather(*(probe(endpoint) for endpoint in self.endpoints))
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self._health_interval_s)
+            await self.check_health()
+
+    async def aclose(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        await self._transport.aclose()
+
+class AgentCardCache:
+    """Agent cards by URL, re-fetched once they are older than `ttl_s`."""
+
+    def __init__(self, client: httpx.AsyncClient, ttl_s: float):
+        self.client = client
+        self.ttl_s = ttl_s
+        self._cards: Dict[str, Tuple[float, object]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def expired(self, url: str) -> bool:
+        entry = self._cards.get(url)
+        return entry is None or time.monotonic() - entry[0] > self.ttl_s
+
+    async def get(self, url: str):
+        if not self.expired(url):
+            return self._cards[url][1]
+        # One fetch per URL even when many sessions need the card at once
+        async with self._locks.setdefault(url, asyncio.Lock()):
+            if self.expired(url):
+                parsed = httpx.URL(url)
+                resolver = A2ACardResolver(httpx_client=self.client, base_url=f"{parsed.scheme}://{parsed.netloc.decode()}")
+                card = await resolver.get_agent_card(relative_card_path=parsed.path)
+                self._cards[url] = (time.monotonic(), _repoint(card, url))
+            return self._cards[url][1]
+
+def _retry_after_s(response: httpx.Response) -> Optional[float]:
+    """The Retry-After of a 503 shedding the request, in seconds, or None for any other response."""
+    if response.status_code != 503 or "retry-after" not in response.headers:
+        return None
+    try:
+        return max(0.0, float(response.headers["retry-after"]))
+    except ValueError:
+        return None
+
+async def _propagate_trace(request: httpx.Request):
+    inject_trace_context(request.headers)
+
+class SharedClient:
+    def __init__(self, endpoints: List[str], config: Dict):
+        limits = httpx.Limits(max_connections=config["max_connections"],
+                              max_keepalive_connections=config["max_keepalive_connections"],
+                              keepalive_expiry=config["keepalive_expiry_s"])
+        timeout = httpx.Timeout(connect=config["connect_timeout_s"], read=config["read_timeout_s"],
+                                write=config["write_timeout_s"], pool=config["pool_timeout_s"])
+        self.transport = BalancingTransport(endpoints, httpx.AsyncHTTPTransport(limits=limits),
+                                            health_interval_s=config["health_interval_s"],
+                                            health_timeout_s=config["health_timeout_s"],
+                                            shed_retries=config["shed_retries"],
+                                            max_retry_after_s=config["max_retry_after_s"])
+        self.http = httpx.AsyncClient(transport=self.transport, timeout=timeout,
+                                      event_hooks={"request": [_propagate_trace]})
+        self.cards = AgentCardCache(self.http, config["card_ttl_s"])
+
+    async def aclose(self):
+        await self.http.aclose()
+
+# Single event loop only (see the module docstring)
+_shared: Dict[Tuple, SharedClient] = {}
+
+def shared_client(endpoints: List[str], http_config: Optional[Dict] = None) -> SharedClient:
+    """The process-wide client for this set of endpoints and settings, created on first use."""
+    config = {**DEFAULT_HTTP_CONFIG, **(http_config or {})}
+    key = (tuple(endpoints), tuple(sorted(config.items())))
+    client = _shared.get(key)
+    if client is None:
+        client = _shared[key] = SharedClient(list(endpoints), config)
+    return client
+
+class PooledRemoteA2aAgent(RemoteA2aAgent):
+    """A RemoteA2aAgent on a shared client whose agent card comes from the shared TTL cache."""
+
+    def __init__(self, name: str, agent_card: str, client: SharedClient, **kwargs):
+        super().__init__(name=name, agent_card=agent_card, httpx_client=client.http, **kwargs)
+        self._card_cache = client.cards
+
+    async def _resolve_agent_card_from_url(self, url: str, ctx=None):
+        # Reached through RemoteA2aAgent._resolve_agent_card, which checks the URL (https, or http on
+        # loopback) first. Cards fetched with per-invocation credentials are not shared.
+        if self._config.card_request_interceptors:
+            return _repoint(await super()._resolve_agent_card_from_url(url, ctx), url)
+        return await self._card_cache.get(url)
+
+    async def _ensure_resolved(self, ctx=None):
+        if self._is_resolved and self._card_cache.expired(self._agent_card_source):
+            self._agent_card, self._a2a_client, self._is_resolved = None, None, False
+        return await super()._ensure_resolved(ctx)
+
+    async def _run_async_impl(self, ctx):
+        start = time.perf_counter()
+        status = "error"
+        try:
+            async for event in super()._run_async_impl(ctx):
+                yield event
+            status = "ok"
+        finally:
+            metrics.observe("a2a_round_trip_seconds", time.perf_counter() - start, agent=self.name, status=status)
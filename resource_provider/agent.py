@@ -1,37 +1,55 @@
+import os
+
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
-from google.adk.runners import InMemoryRunner
 from resource_provider import tools
-from google.adk.agents.remote_a2a_agent import (
-    RemoteA2aAgent,
-    AGENT_CARD_WELL_KNOWN_PATH,
-)
-from google.adk.a2a.utils.agent_to_a2a import to_a2a
+from resource_provider.a2a_client import PooledRemoteA2aAgent, shared_client
+from shared.cache import CachingLlm, from_spec
+from shared.instrumentation import InstrumentedLlm
+from shared.lazy_llm import lazy_lite_llm
+from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH
 
 MODEL = 'gpt-oss:120b-cloud'
 
+# Model responses per request, shared by every RPA in the process ($RPA_LLM_CACHE: "memory",
+# "sqlite:///path.db" or "off"; a config's "llm_cache" entry overrides it). Off by default: the
+# RPA's turns include the orchestrator's answers, which depend on cluster state the RPA cannot
+# see, so a cached turn could replay a stale cost or placement answer after the cluster changed.
+# Turn it on only for workloads that repeat requests against a cluster that does not change.
+llm_cache = from_spec(os.environ.get("RPA_LLM_CACHE", "off"))
+
 # --- Resource Provider Agent (RPA) ---
 class ResourceProviderAgent(LlmAgent):
     def __init__(self,config):
-        orchestrator_agent = RemoteA2aAgent(
+        # One or more orchestrator endpoints ("oa_endpoints": ["http://host:port", ...]); requests are
+        # load-balanced over the healthy ones through a client shared by every RPA in the process
+        endpoints = config.get("oa_endpoints") or [f"http://{config['oa_host']}:{config['oa_port']}"]
+        client = shared_client(endpoints, config.get("http"))
+        orchestrator_agent = PooledRemoteA2aAgent(
                 name="orchestrator_agent",
                 description="Remote orchestrator agent from external vendor that is responsible for orchestrating the cluster.",
                 # Point to the agent card URL - this is where the A2A protocol metadata lives
-                agent_card=f"http://{config['oa_host']}:{config['oa_port']}{AGENT_CARD_WELL_KNOWN_PATH}",
+                agent_card=f"{endpoints[0]}{AGENT_CARD_WELL_KNOWN_PATH}",
+                client=client,
             )
+        # "model" overrides the LiteLLM model, e.g. "mock/rpa" for the benchmarks' scripted model;
+        # LiteLLM itself is imported by the first model call
+        model = lazy_lite_llm(config.get("model") or f"ollama_chat/{MODEL}")
+        cache = from_spec(config["llm_cache"]) if "llm_cache" in config else llm_cache
+        if cache is not None:
+            model = CachingLlm(model, cache)
         super().__init__(
             name="ResourceProvider",
-            model=LiteLlm(model=f"ollama_chat/{MODEL}"),
+            model=InstrumentedLlm(model, agent="resource_provider"),
             instruction="""
             You are a Resource Provider Agent (RPA).
             Your goal is to evaluate service deployment requests based on cost and energy, and then request their deployment to the Orchestrator.
 
             Capabilities:
-            1.  Evaluate: When given service specs (CPU, Memory), use `evaluate_service_cost()` to see if they are viable.
+            1.  Evaluate: When given service specs (CPU, Memory), use `evaluate_service_cost()` to see if they are viable. For several requests at once, evaluate them all with a single `evaluate_service_costs()` call.
             2.  Deploy: If a service is viable (Cost < $100/hr, or as requested), use orchestrator_agent subagent to ask the Orchestrator to deploy it. Provide the given requirements (Latency, Request rate, Availability) to the Orchestrator clearly.
 
             If the user asks you to deploy something, evaluate it first. If good, contact the Orchestrator.
             """,
-            tools=[tools.evaluate_service_cost],
+            tools=[tools.evaluate_service_cost, tools.evaluate_service_costs],
             sub_agents=[orchestrator_agent]
         )
\ No newline at end of file
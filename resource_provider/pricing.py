@@ -0,0 +1,133 @@
+"""Pricing and energy model for service deployment requests.
+
+Prices come from configuration rather than code: a JSON file (pointed to by
+$RPA_PRICING_CONFIG) of the same shape as DEFAULT_PRICING, merged over it. Each node
+type has its own per-CPU/per-GB cost and power draw; time-of-day tariffs multiply the
+cost for the hours they cover (the last matching tariff wins). For example:
+
+    {
+        "default_node_type": "standard",
+        "node_types": {"arm": {"cost_per_cpu": 7.0, "cost_per_mem": 4.0,
+                               "energy_per_cpu": 30.0, "energy_per_mem": 8.0}},
+        "tariffs": [{"start_hour": 8, "end_hour": 20, "multiplier": 1.25},
+                    {"start_hour": 22, "end_hour": 6, "multiplier": 0.8}]
+    }
+
+Specs are scored in one vectorised NumPy pass, and results are kept in an LRU keyed
+by (cpu, memory, node type, hour) so repeated specs in a backlog are computed once.
+"""
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_PRICING = {
+    "default_node_type": "standard",
+    "node_types": {
+        # $/hour per CPU unit and per memory unit; Watts per CPU unit and per memory unit
+        "standard": {"cost_per_cpu": 10.0, "cost_per_mem": 5.0, "energy_per_cpu": 50.0, "energy_per_mem": 10.0},
+    },
+    "tariffs": [],
+    # Specs cheaper than this ($/hour) are rated "High" viability, the rest "Medium"
+    "viability_threshold": 100.0,
+}
+
+def load_pricing(path: Optional[str] = None) -> Dict:
+    """DEFAULT_PRICING, overridden by the JSON file at `path` (default: $RPA_PRICING_CONFIG) if any."""
+    path = path or os.environ.get("RPA_PRICING_CONFIG")
+    config = {**DEFAULT_PRICING, "node_types": dict(DEFAULT_PRICING["node_types"])}
+    if path:
+        with open(path) as f:
+            overrides = json.load(f)
+        config["node_types"].update(overrides.pop("node_types", {}))
+        config.update(overrides)
+    return config
+
+class PricingModel:
+    def __init__(self, config: Optional[Dict] = None, cache_size: int = 4096):
+        config = config or DEFAULT_PRICING
+        self.default_node_type = config["default_node_type"]
+        self.viability_threshold = config["viability_threshold"]
+        self.node_types = list(config["node_types"])
+        self._type_index = {name: i for i, name in enumerate(self.node_types)}
+        # Per node type rows of [cost_per_cpu, cost_per_mem, energy_per_cpu, energy_per_mem]
+        self._rates = np.array([[rates["cost_per_cpu"], rates["cost_per_mem"], rates["energy_per_cpu"],
+                                 rates["energy_per_mem"]] for rates in config["node_types"].values()], dtype=float)
+        if self.default_node_type not in self._type_index:
+            raise ValueError(f"Default node type {self.default_node_type} has no rates")
+        # Cost multiplier per hour of the day
+        self._tariff = np.ones(24)
+        for tariff in config["tariffs"]:
+            start, end = tariff["start_hour"] % 24, tariff["end_hour"] % 24
+            hours = range(start, end) if start < end else [*range(start, 24), *range(0, end)]
+            self._tariff[list(hours)] = tariff["multiplier"]
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self.hits = self.misses = 0
+
+    def evaluate(self, cpu_request: float, memory_request: float, node_type: Optional[str] = None,
+                 hour: Optional[int] = None) -> Dict:
+        return self.evaluate_batch([{"cpu_request": cpu_request, "memory_request": memory_request}],
+                                   node_type=node_type, hour=hour)[0]
+
+    def evaluate_batch(self, specs: List[Dict], node_type: Optional[str] = None,
+                       hour: Optional[int] = None) -> List[Dict]:
+        """Cost and energy estimates for each spec, in input order.
+
+        A spec needs `cpu_request` and `memory_request` and may set its own `node_type`
+        and `hour`; otherwise the call's (or the default node type and the current hour)
+        apply. Raises ValueError for an unknown node type or a negative request.
+        """
+        default_hour = time.localtime().tm_hour if hour is None else hour
+        keys = []
+        for spec in specs:
+            cpu, memory = float(spec["cpu_request"]), float(spec["memory_request"])
+            if cpu < 0 or memory < 0:
+                raise ValueError(f"Invalid spec {spec}: resource requests must be non-negative")
+            spec_type = spec.get("node_type") or node_type or self.default_node_type
+            if spec_type not in self._type_index:
+                raise ValueError(f"Unknown node type {spec_type}; known types: {', '.join(self.node_types)}")
+            keys.append((cpu, memory, spec_type, int(spec.get("hour", default_hour)) % 24))
+
+        results: Dict[Tuple, Dict] = {}
+        missing = []
+        for key in keys:
+            if key in results:
+                self.hits += 1
+                continue
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                results[key] = cached
+                self.hits += 1
+            else:
+                results[key] = None
+                missing.append(key)
+        self.misses += len(missing)
+
+        if missing:
+            cpu = np.array([key[0] for key in missing])
+            memory = np.array([key[1] for key in missing])
+            rates = self._rates[[self._type_index[key[2]] for key in missing]]
+            multiplier = self._tariff[[key[3] for key in missing]]
+            cost = (cpu * rates[:, 0] + memory * rates[:, 1]) * multiplier
+            power = cpu * rates[:, 2] + memory * rates[:, 3]
+            for key, key_cost, key_power in zip(missing, cost.tolist(), power.tolist()):
+                results[key] = self._cache[key] = {
+                    "estimated_cost_per_hour": key_cost,
+                    "estimated_power_watts": key_power,
+                    "viability": "High" if key_cost < self.viability_threshold else "Medium",
+                    "node_type": key[2],
+                    "hour": key[3],
+                }
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return [dict(results[key]) for key in keys]
+
+    def cache_info(self) -> Dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache), "max_size": self.cache_size}
@@ -1,31 +1,59 @@
 # --- RPA Tools ---
+from resource_provider.pricing import PricingModel, load_pricing
+from shared.instrumentation import instrumented_tool
 
+pricing = PricingModel(load_pricing())
+
+@instrumented_tool
 def evaluate_service_cost(cpu_request: float, memory_request: float) -> dict:
     """Evaluates the cost and energy consumption of a service based on its resource requirements.
-    
+
     Args:
         cpu_request: CPU units requested.
         memory_request: Memory units requested.
-        
+
     Returns:
         dict: Estimated cost and energy metrics.
     """
-    print(f"\n[Tool Call] evaluate_service_cost(cpu={cpu_request}, mem={memory_request})")
-    
-    # Theoretical pricing/energy model
-    cost_per_cpu = 10.0
-    cost_per_mem = 5.0
-    energy_per_cpu = 50.0 # Watts
-    energy_per_mem = 10.0 # Watts
-    
-    estimated_cost = (cpu_request * cost_per_cpu) + (memory_request * cost_per_mem)
-    estimated_energy = (cpu_request * energy_per_cpu) + (memory_request * energy_per_mem)
-    
-    return {
-        "status": "ok",
-        "result": {
-            "estimated_cost_per_hour": estimated_cost,
-            "estimated_power_watts": estimated_energy,
-            "viability": "High" if estimated_cost < 100 else "Medium" # Simple logic
+    try:
+        estimate = pricing.evaluate(cpu_request, memory_request)
+        return {
+            "status": "ok",
+            "result": {key: estimate[key] for key in ("estimated_cost_per_hour", "estimated_power_watts", "viability")}
         }
-    }
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+@instrumented_tool
+def evaluate_service_costs(specs: list[dict], node_type: str = "", hour: int = -1) -> dict:
+    """Evaluates the cost and energy of many service specs in one call, cheapest first.
+
+    Args:
+        specs: One entry per service, e.g. {"name": "web", "cpu_request": 2, "memory_request": 2}.
+               An entry may also set its own "node_type" and "hour" (0-23).
+        node_type: Node type to price the specs on; empty for the default node type.
+        hour: Hour of the day (0-23) whose tariff applies; -1 for the current hour.
+
+    Returns:
+        dict: A status-aware response. On success `result` holds the `ranked` estimates
+              (each with the spec's `index` in the input, its `name` if given, cost,
+              power and viability), the number of `viable` specs and their
+              `total_viable_cost_per_hour`.
+    """
+    try:
+        estimates = pricing.evaluate_batch(specs, node_type=node_type or None, hour=hour if hour >= 0 else None)
+        for index, (spec, estimate) in enumerate(zip(specs, estimates)):
+            estimate["index"] = index
+            if "name" in spec:
+                estimate["name"] = spec["name"]
+            estimate["estimated_cost_per_hour"] = round(estimate["estimated_cost_per_hour"], 2)
+            estimate["estimated_power_watts"] = round(estimate["estimated_power_watts"], 2)
+        ranked = sorted(estimates, key=lambda e: (e["viability"] != "High", e["estimated_cost_per_hour"]))
+        viable = [e for e in ranked if e["viability"] == "High"]
+        return {"status": "ok", "result": {
+            "ranked": ranked,
+            "viable": len(viable),
+            "total_viable_cost_per_hour": round(sum(e["estimated_cost_per_hour"] for e in viable), 2),
+        }}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
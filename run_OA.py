@@ -1,6 +1,98 @@
-from orchestrator.agent import OrchestratorAgent
-from google.adk.a2a.utils.agent_to_a2a import to_a2a
+import contextlib
+import os
 
-oa = OrchestratorAgent()
+from shared.startup import DeferredApp, minimal_card, preload
 
-app = to_a2a(oa, port=8001)
\ No newline at end of file
+PORT = int(os.environ.get("OA_PORT", 8001))
+# The RPC URL the agent card advertises
+CARD_URL = f"http://localhost:{PORT}"
+
+def create_app():
+    """Builds the OA's A2A app; everything heavy (ADK, the agent, the cluster state) is imported here."""
+    from google.adk.a2a.utils.agent_to_a2a import to_a2a
+    from orchestrator import tools
+    from orchestrator.admission import AdmissionMiddleware
+    from orchestrator.agent import OrchestratorAgent
+    from shared.instrumentation import instrument_app, setup_tracing
+
+    setup_tracing("orchestrator")
+    oa = OrchestratorAgent()
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        # With $OA_SLA_WATCHER=1 the agent is also called, in process, whenever an SLA is crossed
+        watcher = None
+        if os.environ.get("OA_SLA_WATCHER", "0") == "1":
+            from orchestrator import sla_watcher
+            watcher = sla_watcher.SlaWatcher(tools.store, tools.slas, sla_watcher.runner_trigger(oa))
+            watcher.start()
+        try:
+            yield
+        finally:
+            if watcher is not None:
+                await watcher.stop()
+            # A file:/// store folds its change log into the snapshot, so the next start only loads that
+            tools.store.close()
+
+    # Prometheus metrics at /metrics; spans continue the caller's trace ($OTEL_TRACES_EXPORTER)
+    app = instrument_app(to_a2a(oa, host="localhost", port=PORT, lifespan=lifespan))
+    # At most $OA_MAX_CONCURRENT agent runs at a time (0: no admission control), $OA_MAX_QUEUED waiting
+    max_concurrent = int(os.environ.get("OA_MAX_CONCURRENT", 4))
+    if max_concurrent > 0:
+        app.add_middleware(AdmissionMiddleware, max_concurrent=max_concurrent,
+                           max_queued=int(os.environ.get("OA_MAX_QUEUED", 32)),
+                           coalesce=os.environ.get("OA_COALESCE", "on") == "on",
+                           services=lambda: {*tools.store.read().services, *tools.slas["service_latency_ms"]},
+                           version=lambda: tools.store.version)
+    return app
+
+# Serves at once and answers the agent card while create_app runs: the copy the last start on
+# this port cached ($OA_CARD_CACHE, "off" to disable), else a minimal card. Other requests wait
+# for the app. Then, with $OA_PRELOAD=on, LiteLLM is imported in a thread before the first
+# request needs it ("off" leaves that to the first request)
+card_cache = os.environ.get("OA_CARD_CACHE", "oa_agent_card.json")
+app = DeferredApp(create_app, card_cache=None if card_cache == "off" else card_cache,
+                  on_ready=preload if os.environ.get("OA_PRELOAD", "on") == "on" else None,
+                  card_url=CARD_URL, fallback_card=minimal_card("Orchestrator", CARD_URL, "An ADK Agent"))
+
+if __name__ == "__main__":
+    # Several workers only make sense with shared cluster state: each worker process
+    # re-imports this module and builds its tools' store from $OA_STATE_STORE
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the Orchestrator Agent over A2A")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("OA_PORT", 8001)))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--watch", action="store_true",
+                        help="Run the SLA watcher, which calls the agent whenever an SLA is crossed")
+    parser.add_argument("--state", default=os.environ.get("OA_STATE_STORE"),
+                        help="'memory', 'sqlite:///path.db' or 'file:///path.snap' to warm-start from and keep the "
+                             "state on disk (default: sqlite:///oa_state.db with several workers)")
+    parser.add_argument("--preload", choices=("on", "off"), default=os.environ.get("OA_PRELOAD", "on"),
+                        help="Import LiteLLM and build the model client at startup (on) or on the first request")
+    parser.add_argument("--max-concurrent", type=int, default=int(os.environ.get("OA_MAX_CONCURRENT", 4)),
+                        help="Agent runs at a time per worker; more requests queue by priority (0: no limit)")
+    parser.add_argument("--max-queued", type=int, default=int(os.environ.get("OA_MAX_QUEUED", 32)),
+                        help="Requests waiting per worker before new ones are shed with 503 and Retry-After")
+    parser.add_argument("--coalesce", choices=("on", "off"), default=os.environ.get("OA_COALESCE", "on"),
+                        help="Answer concurrent requests about the same service or SLA with one agent run")
+    args = parser.parse_args()
+    os.environ["OA_PORT"] = str(args.port)
+    os.environ["OA_MAX_CONCURRENT"] = str(args.max_concurrent)
+    os.environ["OA_MAX_QUEUED"] = str(args.max_queued)
+    os.environ["OA_COALESCE"] = args.coalesce
+    os.environ["OA_PRELOAD"] = args.preload
+    os.environ["OA_STATE_STORE"] = args.state or ("sqlite:///oa_state.db" if args.workers > 1 else "memory")
+    if args.workers > 1 and os.environ["OA_STATE_STORE"] == "memory":
+        parser.error("--workers > 1 needs a shared --state, e.g. sqlite:///oa_state.db")
+    if args.workers > 1 and os.environ["OA_STATE_STORE"].startswith("file:///"):
+        # Each worker would append its own changes to the one log
+        parser.error("a file:/// state belongs to one process; use sqlite:///oa_state.db with --workers > 1")
+    if args.watch and args.workers > 1:
+        # One watcher per worker would alert every worker about the same violation
+        parser.error("with --workers > 1 run the watcher on its own: python -m orchestrator.sla_watcher")
+    if args.watch:
+        os.environ["OA_SLA_WATCHER"] = "1"
+    uvicorn.run("run_OA:app", host=args.host, port=args.port, workers=args.workers)
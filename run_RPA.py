@@ -1,11 +1,13 @@
 from resource_provider.agent import ResourceProviderAgent
 from google.adk.a2a.utils.agent_to_a2a import to_a2a
 from google.adk.runners import InMemoryRunner
+from shared.instrumentation import setup_tracing
 
 config = {
-    "oa_host": "0.0.0.0",
+    "oa_host": "127.0.0.1",
     "oa_port": 8001
 }
+setup_tracing("resource_provider")
 rpa = ResourceProviderAgent(config)
 
 runner = InMemoryRunner(agent=rpa)
@@ -0,0 +1,152 @@
+"""Streams deployment requests through the Resource Provider Agent concurrently.
+
+Requests are read lazily, one JSON object per line, from a file or stdin; the prompt is
+taken from the first of the "prompt", "request", "body" or "text" fields (or the line
+itself if it is a JSON string), and "request_id"/"id" is carried over when present. At
+most --concurrency requests are in flight, and each result is appended to the output
+JSONL as soon as it finishes, with its latency and token usage.
+
+    python run_RPA_batch.py requests.jsonl -o results.jsonl --concurrency 8
+    cat requests.jsonl | python run_RPA_batch.py - > results.jsonl
+"""
+import argparse
+import asyncio
+import functools
+import json
+import sys
+import time
+from typing import IO, Dict, Iterator
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from resource_provider.agent import ResourceProviderAgent
+from shared.cache import CachingLlm
+from shared.instrumentation import metrics, setup_tracing, unwrap_llm
+
+PROMPT_FIELDS = ("prompt", "request", "body", "text")
+
+def read_requests(stream: IO[str]) -> Iterator[Dict]:
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"id": str(line_no), "error": f"Invalid JSON on line {line_no}: {e}"}
+            continue
+        if isinstance(entry, str):
+            yield {"id": str(line_no), "prompt": entry}
+            continue
+        prompt = next((entry[field] for field in PROMPT_FIELDS if entry.get(field)), None)
+        request_id = next((entry[field] for field in ("request_id", "id") if entry.get(field) is not None), line_no)
+        request_id = str(request_id)
+        if prompt is None:
+            yield {"id": request_id, "error": f"No prompt field ({', '.join(PROMPT_FIELDS)}) on line {line_no}"}
+        else:
+            yield {"id": request_id, "prompt": prompt}
+
+async def run_request(runner: InMemoryRunner, request: Dict) -> Dict:
+    result = {"id": request["id"]}
+    if "error" in request:
+        return {**result, "status": "error", "error": request["error"], "latency_s": 0.0}
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "llm_calls": 0, "cached_llm_calls": 0}
+    answer = []
+    session = None
+    message = types.Content(role="user", parts=[types.Part(text=request["prompt"])])
+    start = time.perf_counter()
+    try:
+        session = await runner.session_service.create_session(app_name=runner.app_name, user_id="batch")
+        async for event in runner.run_async(user_id="batch", session_id=session.id, new_message=message):
+            if (event.custom_metadata or {}).get("cache") == "hit":
+                usage["cached_llm_calls"] += 1
+            elif event.usage_metadata is not None:
+                usage["llm_calls"] += 1
+                usage["prompt_tokens"] += event.usage_metadata.prompt_token_count or 0
+                usage["completion_tokens"] += event.usage_metadata.candidates_token_count or 0
+                usage["total_tokens"] += event.usage_metadata.total_token_count or 0
+            if event.is_final_response() and event.content and event.content.parts:
+                answer.extend(part.text for part in event.content.parts if part.text)
+        result.update(status="ok", response="\n".join(answer))
+    except Exception as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+    finally:
+        result["latency_s"] = round(time.perf_counter() - start, 3)
+        if session is not None:
+            await runner.session_service.delete_session(app_name=runner.app_name, user_id="batch",
+                                                        session_id=session.id)
+    result["usage"] = usage
+    return result
+
+async def run_batch(runner: InMemoryRunner, requests: Iterator[Dict], out: IO[str], concurrency: int) -> Dict:
+    """Runs `requests` with at most `concurrency` in flight, writing each result to `out` as it completes."""
+    semaphore = asyncio.Semaphore(concurrency)
+    in_flight = set()
+    totals = {"requests": 0, "errors": 0, "total_tokens": 0}
+
+    def write(request_id: str, task: asyncio.Task):
+        in_flight.discard(task)
+        semaphore.release()
+        if task.cancelled():
+            result = {"id": request_id, "status": "error", "error": "CancelledError"}
+        elif task.exception() is not None:
+            # run_request reports the run's own errors; this is anything that escaped it
+            error = task.exception()
+            result = {"id": request_id, "status": "error", "error": f"{type(error).__name__}: {error}"}
+        else:
+            result = task.result()
+        totals["requests"] += 1
+        totals["errors"] += result["status"] != "ok"
+        totals["total_tokens"] += result["usage"]["total_tokens"] if "usage" in result else 0
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+    start = time.perf_counter()
+    # Acquiring before pulling the next request keeps the generator (and memory) bounded too.
+    # Lines are read in a thread, so a slow input (e.g. a pipe) does not stall the requests in flight.
+    while True:
+        await semaphore.acquire()
+        request = await asyncio.to_thread(next, requests, None)
+        if request is None:
+            semaphore.release()
+            break
+        task = asyncio.create_task(run_request(runner, request))
+        in_flight.add(task)
+        task.add_done_callback(functools.partial(write, request["id"]))
+    while in_flight:
+        await asyncio.wait(list(in_flight))
+    totals["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSONL file of requests, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file for results, or - for stdout")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("--oa-host", default="127.0.0.1")
+    parser.add_argument("--oa-port", type=int, default=8001)
+    parser.add_argument("--oa-endpoint", action="append", default=[],
+                        help="Orchestrator base URL (repeat to load-balance); overrides --oa-host/--oa-port")
+    args = parser.parse_args()
+
+    setup_tracing("resource_provider")
+    rpa = ResourceProviderAgent({"oa_host": args.oa_host, "oa_port": args.oa_port, "oa_endpoints": args.oa_endpoint})
+    runner = InMemoryRunner(agent=rpa)
+    source = sys.stdin if args.input == "-" else open(args.input)
+    out = sys.stdout if args.output == "-" else open(args.output, "a")
+    try:
+        totals = asyncio.run(run_batch(runner, read_requests(source), out, max(args.concurrency, 1)))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    cached = unwrap_llm(rpa.model, CachingLlm)
+    if cached is not None:
+        totals["llm_cache"] = cached.cache.cache_info()
+    totals["metrics"] = metrics.snapshot()
+    print(json.dumps(totals), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Response caches for the agents' model calls and read-only tools.
+
+Two backends with the same small interface (`get`, `put`, `clear`, `cache_info`):
+
+* `LRUCache`: in-process, bounded by entry count, least recently used evicted first.
+* `SQLiteCache`: on disk, so answers survive restarts and are shared by every process
+  that opens the same file.
+
+Both store JSON strings and expire entries `ttl_s` seconds after they were written.
+`from_spec` builds one from a configuration string such as "memory?ttl_s=300",
+"sqlite:///llm_cache.db?max_entries=50000" or "off".
+
+`CachingLlm` wraps a model and `cached_tool` wraps a read-only tool. Both key entries on
+everything the answer depends on. For the model that is the conversation, system
+instruction and tool declarations. For a tool it is the arguments. Both can also take a
+`state` callable, e.g. the cluster state key, so a changed cluster never gets a stale
+answer. When `state()` returns None the state cannot be keyed, and the call bypasses the
+cache.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_S = 300.0
+
+def make_key(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+class Cache:
+    # Whether entries outlive the process (and are shared with others), so keys must too
+    persistent = False
+
+    def __init__(self, max_entries: int, ttl_s: float):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.hits = self.misses = self.evictions = self.expired = 0
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def put(self, key: str, value: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def cache_info(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions, "expired": self.expired, "size": len(self),
+                "max_size": self.max_entries}
+
+class LRUCache(Cache):
+    def __init__(self, max_entries: int = 1024, ttl_s: float = DEFAULT_TTL_S):
+        super().__init__(max_entries, ttl_s)
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SQLiteCache(Cache):
+    persistent = True
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_s: float = DEFAULT_TTL_S):
+        super().__init__(max_entries, ttl_s)
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache ("
+                         "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_used_at ON cache (used_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        # Wall-clock time, since entries outlive the process that wrote them
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is not None and row[1] < now:
+            with conn:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self.expired += 1
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        with conn:
+            conn.execute("UPDATE cache SET used_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                         (key, value, now + self.ttl_s, now))
+            excess = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute("DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY used_at LIMIT ?)",
+                             (excess,))
+                self.evictions += excess
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+def from_spec(spec: Optional[str]) -> Optional[Cache]:
+    """A cache from "memory[?options]", "sqlite:///path[?options]" or "off"/"" (no cache).
+
+    Options are `ttl_s` and `max_entries`, e.g. "memory?ttl_s=60&max_entries=256".
+    """
+    if not spec or spec == "off":
+        return None
+    parts = urlsplit(spec)
+    options = {name: float(value) for name, value in parse_qsl(parts.query)}
+    unknown = set(options) - {"ttl_s", "max_entries"}
+    if unknown:
+        raise ValueError(f"Unknown cache options {sorted(unknown)} in {spec}")
+    kwargs = {"ttl_s": options.get("ttl_s", DEFAULT_TTL_S)}
+    if "max_entries" in options:
+        kwargs["max_entries"] = int(options["max_entries"])
+    if parts.scheme == "" and parts.path == "memory":
+        return LRUCache(**kwargs)
+    if parts.scheme == "sqlite" and len(parts.path) > 1:
+        # sqlite:///rel.db or sqlite:////abs/path.db, as for $OA_STATE_STORE
+        return SQLiteCache(parts.path[1:], **kwargs)
+    raise ValueError(f"Unknown cache {spec}; use 'memory', 'sqlite:///path.db' or 'off'")
+
+def _strip_ids(data: Dict) -> Dict:
+    """Drops function call IDs from dumped contents/responses; ADK makes them up per call."""
+    content = data.get("content")
+    if content is None and "parts" in data:
+        content = data
+    for part in (content or {}).get("parts", []):
+        for field in ("function_call", "function_response"):
+            if field in part:
+                part[field].pop("id", None)
+    return data
+
+class CachingLlm(BaseLlm):
+    """A model whose responses are served from `cache` when the same request was answered before.
+
+    Cached responses report zero token usage (no tokens were spent) and are marked with
+    custom_metadata {"cache": "hit"}. Streaming requests and error responses bypass the cache.
+    """
+    inner: BaseLlm
+    cache: Any
+    state: Optional[Callable[[], Optional[str]]] = None
+
+    def __init__(self, inner: BaseLlm, cache: Cache, state: Optional[Callable[[], Optional[str]]] = None,
+                 **kwargs):
+        super().__init__(model=inner.model, inner=inner, cache=cache, state=state, **kwargs)
+
+    def request_key(self, llm_request: LlmRequest) -> Optional[str]:
+        state = self.state() if self.state else ""
+        if state is None:
+            return None
+        contents = [_strip_ids(content.model_dump(mode="json", exclude_none=True))
+                    for content in llm_request.contents]
+        # The config holds the system instruction and the tool declarations
+        config = llm_request.config.model_dump(exclude_none=True) if llm_request.config else None
+        return make_key("llm", llm_request.model or self.model, contents, config, state)
+
+    async def generate_content_async(self, llm_request: LlmRequest,
+                                     stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        key = None if stream else self.request_key(llm_request)
+        if key is None:
+            async for response in self.inner.generate_content_async(llm_request, stream):
+                yield response
+            return
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug("LLM cache hit %s", key[:12])
+            for data in json.loads(cached):
+                yield LlmResponse.model_validate(data)
+            return
+
+        responses, cacheable = [], True
+        async for response in self.inner.generate_content_async(llm_request, stream):
+            # Dumped before yielding: ADK fills in call IDs on the object it is handed
+            data = _strip_ids(response.model_dump(mode="json", exclude_none=True))
+            data["custom_metadata"] = {**data.get("custom_metadata", {}), "cache": "hit"}
+            data["usage_metadata"] = {"prompt_token_count": 0, "candidates_token_count": 0, "total_token_count": 0}
+            responses.append(data)
+            cacheable &= response.error_code is None
+            yield response
+        if responses and cacheable:
+            self.cache.put(key, json.dumps(responses))
+
+def cached_tool(cache: Optional[Cache], state: Optional[Callable[[], Optional[str]]] = None):
+    """Decorator for read-only tools: "ok" results are cached per arguments and `state()`.
+
+    The wrapper keeps the tool's name, docstring and signature, so ADK declares it as before.
+    """
+    def decorate(fn: Callable[..., Dict]) -> Callable[..., Dict]:
+        if cache is None:
+            return fn
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs) -> Dict:
+            key_state = state() if state else ""
+            if key_state is None:
+                return fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = make_key("tool", fn.__name__, bound.arguments, key_state)
+            cached = cache.get(key)
+            if cached is not None:
+                return json.loads(cached)
+            result = fn(*args, **kwargs)
+            # Not cached if a concurrent mutation may have changed the state the result reflects
+            if result.get("status") == "ok" and (state() if state else "") == key_state:
+                try:
+                    cache.put(key, json.dumps(result))
+                except TypeError:
+                    pass
+            return result
+        return wrapper
+    return decorate
@@ -0,0 +1,287 @@
+"""Metrics and tracing for the agents' hot paths: tools, model calls, the A2A hop and cluster operations.
+
+Recording is cheap: `inc` and `observe` only append to a buffer, and a background thread
+folds the buffer into counters and histograms every `flush_interval_s`. Readers fold
+what is left first, so `snapshot()` and the /metrics page include everything recorded so
+far. Each process has its own registry, `metrics`; with several uvicorn workers each
+worker serves its own numbers.
+
+Recorded series:
+
+* tool_call_seconds{tool}, tool_calls_total{tool,status}: every tool call, cache hits included
+* llm_call_seconds{agent}, llm_calls_total{agent,cache}, llm_tokens_total{agent,kind}
+* a2a_round_trip_seconds{agent,status}: a remote agent's turn, from request to last event
+* cluster_operation_seconds{op}, cluster_operations_total{op,status}: changes to the cluster state
+* sla_watcher_evaluation_seconds, sla_watcher_triggers_total: see orchestrator.sla_watcher
+* admission_requests_total{priority,outcome}, admission_wait_seconds{priority}: see orchestrator.admission
+
+Tracing uses OpenTelemetry, which ADK already calls for its agent, model and tool spans.
+`setup_tracing` installs an exporter for them ($OTEL_TRACES_EXPORTER: "console", "otlp" or
+"none", the default). The RPA's A2A client sends the current trace context as a
+`traceparent` header, and `instrument_app` continues it on the orchestrator, so the OA's
+tool calls appear in the trace of the RPA request that caused them.
+"""
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import AsyncGenerator, Callable, Dict, MutableMapping, Optional, Tuple, Union
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from opentelemetry import context, propagate, trace
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, from in-memory tools (sub-millisecond) to model turns (minutes)
+LATENCY_BUCKETS_S = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                     1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_S) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_S, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (the largest bound for the overflow bucket)."""
+        rank, seen = q * self.count, 0
+        for bound, count in zip(LATENCY_BUCKETS_S, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return LATENCY_BUCKETS_S[-1]
+
+def _series(name: str, labels: Labels) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+class Metrics:
+    def __init__(self, flush_interval_s: float = 1.0):
+        self.flush_interval_s = flush_interval_s
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        # Series keys as recorded (labels in call order) -> with sorted labels
+        self._keys: Dict[Tuple[str, Labels], Tuple[str, Labels]] = {}
+        # deque.append is atomic, so recording threads never wait for each other or the flusher
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str):
+        self._buffer.append((False, name, tuple(labels.items()), value))
+        if self._flusher is None:
+            self._start()
+
+    def observe(self, name: str, value: float, **labels: str):
+        self._buffer.append((True, name, tuple(labels.items()), value))
+        if self._flusher is None:
+            self._start()
+
+    def _start(self):
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+                self._flusher.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval_s)
+            self.flush()
+
+    def _after_fork(self):
+        # The flusher thread does not survive a fork; the child starts its own on first use
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def flush(self):
+        with self._lock:
+            buffer = self._buffer
+            while buffer:
+                is_histogram, name, labels, value = buffer.popleft()
+                key = self._keys.get((name, labels))
+                if key is None:
+                    key = self._keys[(name, labels)] = (name, tuple(sorted(labels)))
+                if is_histogram:
+                    histogram = self.histograms.get(key)
+                    if histogram is None:
+                        histogram = self.histograms[key] = Histogram()
+                    histogram.observe(value)
+                else:
+                    self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def reset(self):
+        with self._lock:
+            self._buffer.clear()
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> Dict:
+        """Counters and histogram summaries (count, mean, approximate p50/p99) by series name."""
+        self.flush()
+        with self._lock:
+            return {
+                "counters": {_series(name, labels): value for (name, labels), value in sorted(self.counters.items())},
+                "histograms": {
+                    _series(name, labels): {"count": h.count, "sum_s": round(h.sum, 6),
+                                            "mean_s": round(h.sum / h.count, 6) if h.count else 0.0,
+                                            "p50_s": h.quantile(0.5), "p99_s": h.quantile(0.99)}
+                    for (name, labels), h in sorted(self.histograms.items())
+                },
+            }
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format."""
+        self.flush()
+        lines, typed = [], set()
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{_series(name, labels)} {value:g}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} histogram")
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS_S + (float("inf"),), h.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{_series(name + '_bucket', labels + (('le', le),))} {cumulative}")
+                lines.append(f"{_series(name + '_sum', labels)} {h.sum:.6f}")
+                lines.append(f"{_series(name + '_count', labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+def instrumented_tool(fn: Callable[..., Dict]) -> Callable[..., Dict]:
+    """Decorator recording a tool's latency and result status.
+
+    The wrapper keeps the tool's name, docstring and signature, so ADK declares it as before.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs) -> Dict:
+        start = time.perf_counter()
+        status = "error"
+        try:
+            result = fn(*args, **kwargs)
+            status = result.get("status", "ok") if isinstance(result, dict) else "ok"
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.observe("tool_call_seconds", elapsed, tool=name)
+            metrics.inc("tool_calls_total", tool=name, status=status)
+            logger.debug("tool %s args=%s kwargs=%s: %s in %.2f ms", name, args, kwargs, status, elapsed * 1e3)
+    return wrapper
+
+class InstrumentedLlm(BaseLlm):
+    """A model whose calls' duration, token usage and cache hits are recorded under `agent`."""
+    inner: BaseLlm
+    agent: str
+
+    def __init__(self, inner: BaseLlm, agent: str, **kwargs):
+        super().__init__(model=inner.model, inner=inner, agent=agent, **kwargs)
+
+    async def generate_content_async(self, llm_request: LlmRequest,
+                                     stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        start = time.perf_counter()
+        cache, prompt_tokens, completion_tokens = "miss", 0, 0
+        try:
+            async for response in self.inner.generate_content_async(llm_request, stream):
+                if (response.custom_metadata or {}).get("cache") == "hit":
+                    cache = "hit"
+                usage = response.usage_metadata
+                if usage is not None:
+                    # Streamed responses report running totals, so the last one counts
+                    prompt_tokens = usage.prompt_token_count or 0
+                    completion_tokens = usage.candidates_token_count or 0
+                yield response
+        finally:
+            metrics.observe("llm_call_seconds", time.perf_counter() - start, agent=self.agent)
+            metrics.inc("llm_calls_total", agent=self.agent, cache=cache)
+            if prompt_tokens or completion_tokens:
+                metrics.inc("llm_tokens_total", prompt_tokens, agent=self.agent, kind="prompt")
+                metrics.inc("llm_tokens_total", completion_tokens, agent=self.agent, kind="completion")
+
+def unwrap_llm(model, kind: type):
+    """The first model of type `kind` in a chain of wrappers (InstrumentedLlm, CachingLlm, ...), or None."""
+    while model is not None and not isinstance(model, kind):
+        model = getattr(model, "inner", None)
+    return model
+
+def inject_trace_context(headers: MutableMapping[str, str]):
+    """Adds the current trace context (traceparent/tracestate) to outgoing request headers."""
+    propagate.inject(headers)
+
+class TraceContextMiddleware:
+    """ASGI middleware continuing the trace context of incoming requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]
+                   if key in (b"traceparent", b"tracestate")}
+        if not carrier:
+            return await self.app(scope, receive, send)
+        token = context.attach(propagate.extract(carrier))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            context.detach(token)
+
+def instrument_app(app):
+    """Adds GET /metrics and trace context propagation to a Starlette app, e.g. one from `to_a2a`."""
+    from starlette.responses import PlainTextResponse
+
+    async def metrics_page(request):
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    app.add_route("/metrics", metrics_page, methods=["GET"])
+    app.add_middleware(TraceContextMiddleware)
+    return app
+
+def setup_tracing(service_name: str, exporter: Union[str, object, None] = None) -> bool:
+    """Exports the process's spans through `exporter`: "console", "otlp", "none" or a SpanExporter.
+
+    Defaults to $OTEL_TRACES_EXPORTER, and to "none" without it. Returns whether tracing is on.
+    """
+    exporter = exporter if exporter is not None else os.environ.get("OTEL_TRACES_EXPORTER", "none")
+    if exporter == "none":
+        return False
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if exporter == "console":
+        exporter = ConsoleSpanExporter()
+    elif exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError as e:
+            raise ImportError("The otlp exporter needs `pip install opentelemetry-exporter-otlp-proto-http`") from e
+        exporter = OTLPSpanExporter()
+    elif isinstance(exporter, str):
+        raise ValueError(f"Unknown trace exporter {exporter}; use 'console', 'otlp' or 'none'")
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return True
@@ -0,0 +1,37 @@
+"""A model built on its first call, so its client library is imported then rather than at startup."""
+import threading
+from typing import AsyncGenerator, Callable, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from pydantic import PrivateAttr
+
+class LazyLlm(BaseLlm):
+    """Stands in for the model `factory()` returns, building it when it is first needed."""
+    factory: Callable[[], BaseLlm]
+    _inner: Optional[BaseLlm] = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def inner(self) -> BaseLlm:
+        if self._inner is None:
+            with self._lock:
+                if self._inner is None:
+                    self._inner = self.factory()
+        return self._inner
+
+    @property
+    def loaded(self) -> bool:
+        return self._inner is not None
+
+    async def generate_content_async(self, llm_request: LlmRequest,
+                                     stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        async for response in self.inner.generate_content_async(llm_request, stream):
+            yield response
+
+def _lite_llm(model: str) -> BaseLlm:
+    from google.adk.models.lite_llm import LiteLlm
+    return LiteLlm(model=model)
+
+def lazy_lite_llm(model: str) -> LazyLlm:
+    """A LiteLlm for `model` (e.g. "ollama_chat/..."), imported and built on its first call."""
+    return LazyLlm(model=model, factory=lambda: _lite_llm(model))
@@ -0,0 +1,231 @@
+"""Fast startup for the agent servers: preloading deferred imports and serving a cached agent card.
+
+Importing ADK and building an agent takes seconds, and LiteLLM, imported by the first
+model call, several more; an autoscaled orchestrator replica is not discoverable until
+all of that is done. This module imports nothing heavy itself, so a server module can
+hand uvicorn a `DeferredApp` right away:
+
+* `DeferredApp` builds the real app (`factory`, e.g. ADK's `to_a2a`) in a thread once the
+  server is up. Meanwhile it answers the agent card and holds every other request until
+  the real app is ready. The card is the copy cached by the previous start if that copy
+  advertises the URL being served (`card_url`), else a minimal card (`minimal_card`:
+  name and RPC URL, no skills). The card is cached again from the real app each time it
+  starts.
+* The agents' models are `lazy_llm.LazyLlm`s, which import their client library on their
+  first call. `preload` does that ahead of time, so the first request does not pay for
+  it; as DeferredApp's `on_ready` it runs in a worker thread once the real app has
+  answered the requests that waited for it, so requests keep being served meanwhile.
+  LiteLLM attaches logging filters to uvicorn's and asyncio's loggers that import more of
+  LiteLLM, so a record the event loop logs halfway through the import would run a half
+  imported filter and break the import. Until `on_ready` returns, records logged by
+  other threads are held back and then logged.
+
+A cached card can be one start out of date after the agent's tools or instructions
+changed; the real app's card replaces it (and a minimal one) as soon as that app is ready.
+"""
+import asyncio
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import AsyncExitStack, contextmanager
+from typing import Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# As google.adk's AGENT_CARD_WELL_KNOWN_PATH, without importing it
+AGENT_CARD_PATH = "/.well-known/agent-card.json"
+
+# What the first model call would import
+DEFERRED_MODULES = ("litellm", "google.adk.models.lite_llm")
+
+def preload(models: Iterable = (), modules: Iterable[str] = DEFERRED_MODULES) -> float:
+    """Imports `modules` and builds the lazy models among `models`; returns the seconds it took."""
+    from shared.instrumentation import metrics, unwrap_llm
+    from shared.lazy_llm import LazyLlm
+
+    start = time.perf_counter()
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            logger.warning("Preloading %s failed; it is imported on first use instead", name, exc_info=True)
+    for model in models:
+        lazy = unwrap_llm(model, LazyLlm)
+        if lazy is not None:
+            lazy.inner
+    elapsed = time.perf_counter() - start
+    metrics.observe("startup_preload_seconds", elapsed)
+    logger.info("Preloaded %s in %.2fs", ", ".join(modules), elapsed)
+    return elapsed
+
+def minimal_card(name: str, url: str, description: str = "", version: str = "0.0.1") -> bytes:
+    """An A2A agent card with only what a client needs to call the agent at `url` over JSON-RPC."""
+    return json.dumps({
+        "name": name,
+        "description": description,
+        "supportedInterfaces": [{"url": url, "protocolBinding": "JSONRPC", "protocolVersion": "1.0"}],
+        "version": version,
+        "capabilities": {"streaming": True},
+        "defaultInputModes": ["text/plain"],
+        "defaultOutputModes": ["text/plain"],
+    }).encode()
+
+def _card_urls(card: bytes) -> List[str]:
+    """The RPC URLs a cached card advertises; none if it does not parse."""
+    try:
+        parsed = json.loads(card)
+        return [interface["url"] for interface in parsed.get("supportedInterfaces") or []]
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return []
+
+@contextmanager
+def _hold_other_threads_logs():
+    """Holds back the records that loggers existing now get from other threads, and logs them at the end."""
+    owner = threading.get_ident()
+    held: List[logging.LogRecord] = []
+
+    class Hold(logging.Filter):
+        def filter(self, record):
+            if threading.get_ident() == owner:
+                return True
+            held.append(record)
+            return False
+
+    hold = Hold()
+    loggers = [logging.getLogger(), *(logger for logger in list(logging.Logger.manager.loggerDict.values())
+                                      if isinstance(logger, logging.Logger))]
+    for logger in loggers:
+        # First, so filters added meanwhile do not see the held records
+        logger.filters.insert(0, hold)
+    try:
+        yield
+    finally:
+        for logger in loggers:
+            logger.removeFilter(hold)
+        for record in held:
+            logging.getLogger(record.name).handle(record)
+
+def _run_holding_logs(fn: Callable[[], object]):
+    with _hold_other_threads_logs():
+        return fn()
+
+async def _get(app, path: str) -> Optional[bytes]:
+    """The body of an in-process GET `path` on an ASGI app, or None unless it answered 200."""
+    status: List[int] = []
+    body: List[bytes] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+             "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"", "headers": [],
+             "client": None, "server": ("localhost", 80)}
+    await app(scope, receive, send)
+    return b"".join(body) if status == [200] else None
+
+class DeferredApp:
+    """ASGI app that starts serving at once and hands over to the Starlette app `factory()` builds.
+
+    Before the real app is ready the agent card comes from `card_cache` (a file path), if
+    it advertises `card_url`, or else from `fallback_card`. `on_ready()` runs in a worker
+    thread once the real app took over, e.g. `preload`.
+    """
+
+    def __init__(self, factory: Callable[[], object], card_cache: Optional[str] = None,
+                 on_ready: Optional[Callable[[], object]] = None, card_url: Optional[str] = None,
+                 fallback_card: Optional[bytes] = None):
+        self.factory = factory
+        self.card_cache = card_cache
+        self.on_ready = on_ready
+        self.card_url = card_url
+        self.fallback_card = fallback_card
+        self.app = None
+        self.ready_s: Optional[float] = None
+        self._card: Optional[bytes] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._error: Optional[BaseException] = None
+        self._stack = AsyncExitStack()
+        self._task: Optional[asyncio.Task] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if self.app is None:
+            if scope["type"] == "http" and scope["path"] == AGENT_CARD_PATH and self._card is not None:
+                return await self._send(send, 200, self._card, b"application/json")
+            await self._ready.wait()
+            if self.app is None:
+                return await self._send(send, 503, f"Agent failed to start: {self._error}".encode(), b"text/plain")
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _send(send, status: int, body: bytes, content_type: bytes):
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        await receive()
+        self._ready = asyncio.Event()
+        self._card = self.fallback_card
+        if self.card_cache and os.path.exists(self.card_cache):
+            with open(self.card_cache, "rb") as f:
+                cached = f.read()
+            # A card cached by a start on another host or port would send clients there
+            if self.card_url is None or _card_urls(cached) == [self.card_url]:
+                self._card = cached
+            else:
+                logger.info("Ignoring the cached agent card %s: it does not advertise %s", self.card_cache,
+                            self.card_url)
+        self._task = asyncio.get_running_loop().create_task(self._start())
+        await send({"type": "lifespan.startup.complete"})
+        await receive()
+        if not self._task.done():
+            self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        await self._stack.aclose()
+        await send({"type": "lifespan.shutdown.complete"})
+
+    async def _start(self):
+        start = time.perf_counter()
+        try:
+            app = await asyncio.to_thread(self.factory)
+            await self._stack.enter_async_context(app.router.lifespan_context(app))
+            if self.card_cache:
+                await self._cache_card(app)
+            self.app = app
+            self.ready_s = time.perf_counter() - start
+            logger.info("Agent app ready in %.2fs", self.ready_s)
+        except Exception as e:
+            self._error = e
+            logger.exception("Agent app failed to start")
+        finally:
+            self._ready.set()
+        if self.app is not None and self.on_ready is not None:
+            # Lets the requests that waited for the app through first
+            await asyncio.sleep(0)
+            try:
+                await asyncio.to_thread(_run_holding_logs, self.on_ready)
+            except Exception:
+                logger.exception("on_ready failed; the app keeps serving")
+
+    async def _cache_card(self, app):
+        card = await _get(app, AGENT_CARD_PATH)
+        if card is None or card == self._card:
+            return
+        tmp = f"{self.card_cache}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(card)
+        os.replace(tmp, self.card_cache)
@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+import httpx
+from a2a.types import AgentCard, AgentInterface
+from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH
+from google.protobuf import json_format
+
+from resource_provider.a2a_client import AgentCardCache, BalancingTransport
+
+ENDPOINTS = ["http://127.0.0.1:18100", "http://127.0.0.1:18101"]
+
+
+def orchestrators(advertised: str, served: list) -> httpx.MockTransport:
+    card = AgentCard(name="Orchestrator", description="OA", version="1", supported_interfaces=[
+        AgentInterface(url=advertised, protocol_binding="JSONRPC", protocol_version="1.0")])
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path == AGENT_CARD_WELL_KNOWN_PATH:
+            return httpx.Response(200, json=json_format.MessageToDict(card))
+        served.append(str(request.url))
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": json.loads(request.content)["id"], "result": {}})
+
+    return httpx.MockTransport(handle)
+
+
+def test_rpc_to_a_card_advertising_another_host_is_balanced():
+    served = []
+
+    async def run():
+        transport = BalancingTransport(ENDPOINTS, orchestrators("http://0.0.0.0:18100/", served), health_interval_s=0)
+        async with httpx.AsyncClient(transport=transport) as client:
+            card = await AgentCardCache(client, ttl_s=60).get(f"{ENDPOINTS[0]}{AGENT_CARD_WELL_KNOWN_PATH}")
+            rpc_url = card.supported_interfaces[0].url
+            for i in range(4):
+                await client.post(rpc_url, json={"jsonrpc": "2.0", "id": i, "method": "SendMessage"})
+        return rpc_url, transport
+
+    rpc_url, transport = asyncio.run(run())
+    assert rpc_url == f"{ENDPOINTS[0]}/"
+    assert [endpoint.requests for endpoint in transport.endpoints] == [3, 2]
+    assert {url.rsplit(":", 1)[1] for url in served} == {"18100/", "18101/"}
+
+
+def test_loopback_aliases_match_the_endpoints():
+    served = []
+
+    async def run():
+        transport = BalancingTransport(ENDPOINTS, orchestrators("http://localhost:18100/", served), health_interval_s=0)
+        async with httpx.AsyncClient(transport=transport) as client:
+            for i, host in enumerate(("localhost", "0.0.0.0", "[::1]", "127.0.0.1")):
+                await client.post(f"http://{host}:18100/", json={"jsonrpc": "2.0", "id": i, "method": "SendMessage"})
+        return transport
+
+    transport = asyncio.run(run())
+    assert sum(endpoint.requests for endpoint in transport.endpoints) == 4
+    assert all(url.startswith("http://127.0.0.1:") for url in served)
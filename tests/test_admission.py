@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from orchestrator.admission import AdmissionMiddleware, _parse, _rewrite_id, classify, coalesce_key
+
+SERVICES = ("frontend", "backend")
+
+
+def key(text: str):
+    return coalesce_key("SendMessage", text, classify(text), lambda: SERVICES)
+
+
+def test_sla_checks_about_the_same_services_coalesce():
+    assert key("Service frontend violates its latency SLA: p95 300ms.") == \
+        key("Service frontend violates its latency SLA: p95 800ms.")
+    assert key("Service frontend violates its latency SLA.") != key("Service backend violates its latency SLA.")
+
+
+@pytest.mark.parametrize("text", [
+    "Deploy service web with 2 replicas, 0.5 CPU and 1 GiB memory each.",
+    "Scale frontend to 10 replicas, we expect a latency spike",
+    "Move the backend pods off node-1, its CPU is overloaded",
+])
+def test_actions_never_coalesce(text):
+    assert classify(text) == "change"
+    assert key(text) is None
+
+
+def test_sla_remedies_never_coalesce():
+    assert key("Add two replicas of backend to fix its latency.") is None
+    assert key("Add five replicas of backend to fix its latency.") is None
+    assert key("Service backend violates its latency SLA. Please resolve the violation.") is None
+
+
+def test_sla_questions_coalesce_on_identical_text():
+    assert key("Why does backend violate its latency SLA?") != key("Why does frontend violate its latency SLA?")
+    assert key("Why does backend violate its latency SLA?") == key("why does backend violate its latency SLA?")
+
+
+def test_other_requests_coalesce_on_identical_text():
+    assert key("Give me a short status report.") == key("give me a   short status report.")
+    assert key("Give me a short status report.") != key("Give me a long status report.")
+
+
+@pytest.mark.parametrize("params", [
+    {"message": {"parts": ["not a part", {"text": "Check node CPU utilization."}]}},
+    {"message": {"parts": "not a list"}},
+    {"message": "not a message"},
+    "not params",
+])
+def test_malformed_messages_parse(params):
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "SendMessage", "params": params}).encode()
+    method, rpc_id, text, new_conversation = _parse(body)
+    assert (method, rpc_id, new_conversation) == ("SendMessage", 1, True)
+    assert text in ("", "Check node CPU utilization.")
+
+
+def test_service_names_are_looked_up_once_per_state_version():
+    lookups, state = [], {"version": 1}
+
+    def services():
+        lookups.append(state["version"])
+        return SERVICES
+
+    middleware = AdmissionMiddleware(None, services=services, version=lambda: state["version"])
+    for _ in range(3):
+        assert middleware._service_names() == SERVICES
+    state["version"] = 2
+    assert middleware._service_names() == SERVICES
+    assert lookups == [1, 2]
+
+
+def test_followers_get_their_own_task_and_context_ids():
+    task = {"id": "task-1", "contextId": "ctx-1", "status": {"state": "TASK_STATE_COMPLETED"},
+            "history": [{"messageId": "m-1", "taskId": "task-1", "contextId": "ctx-1"}]}
+    events = [{"jsonrpc": "2.0", "id": 7, "result": {"task": task}},
+              {"jsonrpc": "2.0", "id": 7, "result": {"statusUpdate": {"taskId": "task-1", "contextId": "ctx-1"}}}]
+    body = b"".join(b"data: " + json.dumps(event).encode() + b"\n\n" for event in events)
+    recorded = [{"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/event-stream")]},
+                {"type": "http.response.body", "body": body}]
+
+    rewritten = _rewrite_id(recorded, 7, 8)[1]["body"]
+    first, second = (json.loads(line[5:]) for line in rewritten.split(b"\n") if line.startswith(b"data:"))
+    assert first["id"] == second["id"] == 8
+    task = first["result"]["task"]
+    assert task["id"] not in ("task-1", "ctx-1") and task["contextId"] not in ("task-1", "ctx-1")
+    assert task["history"][0] == {"messageId": "m-1", "taskId": task["id"], "contextId": task["contextId"]}
+    assert second["result"]["statusUpdate"] == {"taskId": task["id"], "contextId": task["contextId"]}
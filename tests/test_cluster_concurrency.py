@@ -0,0 +1,94 @@
+import random
+import threading
+
+import pytest
+
+from orchestrator.k8s_sim import Cluster
+
+ROUNDS = 150
+
+
+def build() -> Cluster:
+    cluster = Cluster(seed=0)
+    for i in range(12):
+        cluster.add_node(f"node-{i}", cpu_capacity=16.0, memory_capacity=64.0)
+    for name in ("frontend", "backend", "batch"):
+        cluster.deploy_service(name, 20, cpu_request=0.5, memory_request=1.0, strategy="spread")
+    return cluster
+
+
+def run_threads(*workers):
+    errors = []
+
+    def guarded(worker, seed):
+        try:
+            worker(random.Random(seed))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=guarded, args=(worker, seed)) for seed, worker in enumerate(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+
+
+def assert_consistent(cluster: Cluster):
+    cluster.verify_consistency()
+    for node in cluster.nodes.values():
+        cpu, memory = node.recount()
+        assert node.cpu_usage == pytest.approx(cpu) and node.memory_usage == pytest.approx(memory)
+    for service in cluster.services.values():
+        for pod_id, pod in service.pods.items():
+            found, node = cluster.get_pod(pod_id)
+            assert found is pod
+            assert (node.name if node else None) == pod.node_id
+
+
+def scaler(cluster: Cluster, service: str, final: int):
+    def work(rng: random.Random):
+        for _ in range(ROUNDS):
+            cluster.scale_service(service, rng.randint(5, 40))
+        cluster.scale_service(service, final)
+    return work
+
+
+def mover(cluster: Cluster):
+    def work(rng: random.Random):
+        names = list(cluster.nodes)
+        for _ in range(ROUNDS):
+            pods = list(cluster.services[rng.choice(("frontend", "backend"))].pods)
+            try:
+                cluster.move_pod(rng.choice(pods), rng.choice(names))
+            except ValueError:
+                # Deleted by a scaler or Pending meanwhile, or the target is full
+                pass
+    return work
+
+
+def test_concurrent_mutations_keep_the_cluster_consistent():
+    cluster = build()
+    run_threads(scaler(cluster, "frontend", 17), scaler(cluster, "backend", 23), mover(cluster), mover(cluster))
+    assert_consistent(cluster)
+    assert len(cluster.services["frontend"].pods) == 17
+    assert len(cluster.services["backend"].pods) == 23
+    assert sum(len(node.pods) for node in cluster.nodes.values()) == 17 + 23 + 20
+
+
+def test_rollback_undoes_only_its_own_changes_under_concurrent_mutations():
+    cluster = build()
+
+    def rolled_back(rng: random.Random):
+        for _ in range(ROUNDS // 3):
+            before = {pod_id: pod.node_id for pod_id, pod in cluster.services["batch"].pods.items()}
+            cluster.checkpoint()
+            cluster.scale_service("batch", rng.randint(0, 40))
+            cluster.rollback()
+            after = {pod_id: pod.node_id for pod_id, pod in cluster.services["batch"].pods.items()}
+            assert after == before
+
+    run_threads(rolled_back, scaler(cluster, "frontend", 11), mover(cluster))
+    assert_consistent(cluster)
+    assert len(cluster.services["batch"].pods) == 20
+    assert len(cluster.services["frontend"].pods) == 11
@@ -0,0 +1,67 @@
+import math
+
+import pytest
+
+from orchestrator.k8s_sim import Cluster
+
+
+@pytest.fixture
+def cluster():
+    cluster = Cluster(consistency_checks=True, seed=0)
+    for i in range(6):
+        cluster.add_node(f"node-{i}", cpu_capacity=8.0, memory_capacity=32.0)
+    cluster.deploy_service("frontend", 12, cpu_request=0.5, memory_request=1.0)
+    cluster.deploy_service("backend", 8, cpu_request=0.7, memory_request=2.5)
+    return cluster
+
+
+def assert_counters_match(cluster: Cluster):
+    for node in cluster.nodes.values():
+        cpu, memory = node.recount()
+        assert math.isclose(node.cpu_usage, cpu, abs_tol=1e-9), node.name
+        assert math.isclose(node.memory_usage, memory, abs_tol=1e-9), node.name
+
+
+def test_scaling_keeps_counters_in_sync(cluster):
+    cluster.scale_service("frontend", 40)
+    assert_counters_match(cluster)
+    cluster.scale_service("frontend", 3)
+    cluster.scale_service("backend", 0)
+    assert_counters_match(cluster)
+    assert sum(len(node.pods) for node in cluster.nodes.values()) == 3
+
+
+def test_move_pod_keeps_counters_in_sync(cluster):
+    target = min(cluster.nodes.values(), key=lambda node: node.cpu_usage)
+    pod = next(p for p in cluster.services["backend"].pods.values() if p.node_id != target.name)
+    source = cluster.nodes[pod.node_id]
+    cluster.move_pod(pod.id, target.name)
+    assert pod.node_id == target.name and pod.id not in source.pods
+    assert_counters_match(cluster)
+
+
+def test_fail_and_recover_node_keep_counters_in_sync(cluster):
+    evicted = cluster.fail_node("node-1")
+    assert evicted and not cluster.nodes["node-1"].pods
+    assert_counters_match(cluster)
+    cluster.schedule_pending()
+    cluster.recover_node("node-1")
+    cluster.schedule_pending()
+    assert_counters_match(cluster)
+    assert all(pod.node_id is not None for service in cluster.services.values() for pod in service.pods.values())
+
+
+def test_rebalance_keeps_counters_in_sync():
+    cluster = Cluster(consistency_checks=True, seed=0)
+    for i in range(4):
+        cluster.add_node(f"node-{i}", cpu_capacity=4.0, memory_capacity=16.0)
+    cluster.deploy_service("web", 7, cpu_request=0.5, memory_request=1.0, strategy="first-fit")
+    report = cluster.rebalance(cpu_threshold_pct=50.0)
+    assert report["moves"] and not report["still_hot"]
+    assert_counters_match(cluster)
+
+
+def test_consistency_checks_catch_a_drifted_counter(cluster):
+    cluster.nodes["node-2"]._cpu_usage += 0.25
+    with pytest.raises(AssertionError, match="node-2"):
+        cluster.scale_service("frontend", 13)
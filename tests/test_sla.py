@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from orchestrator import sla, tools
+from orchestrator.agent import SlaPrecheck
+from orchestrator.k8s_sim import Cluster
+from orchestrator.state_store import InProcessStore
+
+
+@pytest.fixture
+def healthy_cluster(monkeypatch):
+    cluster = Cluster(seed=0)
+    for i in range(4):
+        cluster.add_node(f"node-{i}", cpu_capacity=8.0, memory_capacity=32.0)
+    cluster.deploy_service("frontend", 2, cpu_request=0.5, memory_request=1.0)
+    cluster.deploy_service("backend", 2, cpu_request=0.5, memory_request=1.0)
+    monkeypatch.setattr(tools, "store", InProcessStore(cluster))
+
+
+def context(text: str) -> SimpleNamespace:
+    return SimpleNamespace(user_content=types.Content(role="user", parts=[types.Part(text=text)]),
+                           invocation_id="test")
+
+
+@pytest.mark.parametrize("text", [
+    "There seems to be an issue with the cluster performance. Check for SLA violations.",
+    "Is the frontend latency within its SLA?",
+    "Check node CPU utilization.",
+])
+def test_checks_are_sla_requests(text):
+    assert sla.is_sla_request(text)
+    assert sla.is_sla_check(text)
+
+
+def test_remediation_requests_are_prechecked_but_not_checks():
+    text = "There seems to be an issue with the cluster performance. Identify and resolve any SLA violations."
+    assert sla.is_sla_request(text) and sla.is_action_request(text)
+    assert not sla.is_sla_check(text)
+
+
+@pytest.mark.parametrize("text", [
+    "Scale backend to 10 replicas, we expect a latency spike",
+    "Move pod 1a2b3c4d to node-2 to free CPU",
+    "Migrate the frontend pods off node-1, its CPU is overloaded",
+    "Delete the database service, its latency does not matter",
+    "Apply this manifest to fix the SLA violation",
+    "Deploy a cache to lower the backend latency",
+    "Add two replicas of backend to fix latency",
+    "Increase backend replicas to fix latency",
+    "Identify and resolve any SLA violations by adding capacity",
+])
+def test_actions_are_not_sla_requests(text):
+    assert sla.is_action_request(text)
+    assert not sla.is_sla_request(text)
+
+
+def test_precheck_answers_a_check_on_a_healthy_cluster(healthy_cluster):
+    answer = SlaPrecheck(sla.DEFAULT_SLAS).before_agent(context("Are all SLAs met? Check the latency."))
+    assert answer is not None and "No action needed" in answer.parts[0].text
+
+
+def test_action_mentioning_latency_reaches_the_agent(healthy_cluster):
+    precheck = SlaPrecheck(sla.DEFAULT_SLAS)
+    assert precheck.before_agent(context("Scale backend to 10 replicas, we expect a latency spike")) is None
+    assert precheck.stats["sla_requests"] == 0
+
+
+@pytest.mark.parametrize("text", [
+    "Add two replicas of backend to fix latency",
+    "Increase backend replicas to fix latency",
+    "Identify and resolve any SLA violations by adding capacity",
+    "Fix the frontend latency",
+    "What is the current CPU utilization of node-3?",
+    "Show me the latency of the database service",
+])
+def test_precheck_leaves_instructions_and_questions_to_the_model(healthy_cluster, text):
+    precheck = SlaPrecheck(sla.DEFAULT_SLAS)
+    assert precheck.before_agent(context(text)) is None
+    assert precheck.stats["answered_directly"] == 0
+
+
+@pytest.mark.parametrize("failure", ["pending", "down", "missing"])
+def test_unavailable_service_is_a_violation(failure):
+    cluster = Cluster(seed=0)
+    cluster.add_node("node-0", cpu_capacity=2.0, memory_capacity=8.0)
+    cluster.deploy_service("frontend", 2, cpu_request=0.5, memory_request=1.0)
+    if failure == "pending":
+        cluster.deploy_service("backend", 4, cpu_request=0.5, memory_request=1.0)
+    elif failure == "down":
+        cluster.deploy_service("backend", 2, cpu_request=0.5, memory_request=1.0)
+        cluster.fail_node("node-0")
+    report = sla.evaluate(cluster.get_metrics(jitter=False))
+    assert not report["ok"]
+    assert {v["service"]: v["reason"] for v in report["services"]}["backend"] == failure
+
+
+def test_precheck_hands_a_down_service_to_the_model(healthy_cluster):
+    for name in list(tools.store.read().nodes):
+        tools.store.read().fail_node(name)
+    precheck = SlaPrecheck(sla.DEFAULT_SLAS)
+    assert precheck.before_agent(context("Are all SLAs met?")) is None
+    assert precheck.stats["handed_to_model"] == 1
+
+
+def test_precheck_does_not_call_a_service_within_the_jitter_healthy(healthy_cluster):
+    threshold = tools.store.read().get_metrics(jitter=False)["services"]["frontend"]["avg_latency_ms"] + 1
+    slas = {**sla.DEFAULT_SLAS, "service_latency_ms": {"frontend": threshold}}
+    precheck = SlaPrecheck(slas)
+    assert precheck.before_agent(context("Are all SLAs met?")) is None
+    assert precheck.stats["handed_to_model"] == 1
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import threading
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from shared.startup import AGENT_CARD_PATH, DeferredApp, minimal_card
+
+URL = "http://localhost:18001"
+
+
+def real_app() -> Starlette:
+    async def card(request):
+        return JSONResponse(json.loads(minimal_card("Real", URL)))
+    return Starlette(routes=[Route(AGENT_CARD_PATH, card)])
+
+
+async def get(app, path: str):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app({"type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "query_string": b"",
+               "headers": [], "scheme": "http", "server": ("localhost", 80), "root_path": ""}, receive, send)
+    return messages[0]["status"], b"".join(m.get("body", b"") for m in messages[1:])
+
+
+async def first_card(app: DeferredApp) -> bytes:
+    """The card `app` answers while its factory is still running, then shuts it down."""
+    events = asyncio.Queue()
+    await events.put({"type": "lifespan.startup"})
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    lifespan = asyncio.create_task(app({"type": "lifespan"}, events.get, send))
+    while not sent:
+        await asyncio.sleep(0.01)
+    status, body = await get(app, AGENT_CARD_PATH)
+    assert status == 200
+    await events.put({"type": "lifespan.shutdown"})
+    await lifespan
+    return body
+
+
+def slow_factory(release: threading.Event):
+    def build():
+        release.wait(5)
+        return real_app()
+    return build
+
+
+def test_cached_card_for_another_url_is_not_served(tmp_path):
+    cache = tmp_path / "card.json"
+    cache.write_bytes(minimal_card("Stale", "http://localhost:9999"))
+    release = threading.Event()
+    app = DeferredApp(slow_factory(release), card_cache=str(cache), card_url=URL,
+                      fallback_card=minimal_card("Fallback", URL))
+
+    async def run():
+        try:
+            return await first_card(app)
+        finally:
+            release.set()
+
+    assert json.loads(asyncio.run(run()))["name"] == "Fallback"
+
+
+def test_cached_card_for_this_url_is_served(tmp_path):
+    cache = tmp_path / "card.json"
+    cache.write_bytes(minimal_card("Cached", URL))
+    release = threading.Event()
+    app = DeferredApp(slow_factory(release), card_cache=str(cache), card_url=URL,
+                      fallback_card=minimal_card("Fallback", URL))
+
+    async def run():
+        try:
+            return await first_card(app)
+        finally:
+            release.set()
+
+    assert json.loads(asyncio.run(run()))["name"] == "Cached"
+
+
+def test_on_ready_runs_off_the_event_loop():
+    loop_threads, ready_threads = [], []
+    app = DeferredApp(real_app, on_ready=lambda: ready_threads.append(threading.get_ident()))
+
+    async def run():
+        loop_threads.append(threading.get_ident())
+        events = asyncio.Queue()
+        await events.put({"type": "lifespan.startup"})
+        lifespan = asyncio.create_task(app({"type": "lifespan"}, events.get, lambda message: asyncio.sleep(0)))
+        while not ready_threads:
+            await asyncio.sleep(0.01)
+        assert (await get(app, AGENT_CARD_PATH))[0] == 200
+        await events.put({"type": "lifespan.shutdown"})
+        await lifespan
+
+    asyncio.run(run())
+    assert ready_threads and ready_threads != loop_threads
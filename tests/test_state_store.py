@@ -0,0 +1,36 @@
+from orchestrator.k8s_sim import Cluster
+from orchestrator.state_store import SQLiteStore
+
+
+def seeded() -> Cluster:
+    cluster = Cluster(seed=0)
+    for i in range(3):
+        cluster.add_node(f"node-{i}", cpu_capacity=8.0, memory_capacity=32.0)
+    cluster.deploy_service("backend", 4, cpu_request=0.5, memory_request=1.0)
+    return cluster
+
+
+def test_reload_leaves_a_cluster_being_read_untouched(tmp_path):
+    path = str(tmp_path / "state.db")
+    reader, writer = SQLiteStore(path, initial=seeded()), SQLiteStore(path)
+    before = reader.read()
+    writer.mutate(lambda cluster: cluster.scale_service("backend", 9))
+
+    after = reader.read()
+    assert after is not before
+    assert len(before.services["backend"].pods) == 4
+    before.verify_consistency()
+    assert len(after.services["backend"].pods) == 9
+    after.verify_consistency()
+
+
+def test_mutations_from_two_processes_both_land(tmp_path):
+    path = str(tmp_path / "state.db")
+    first, second = SQLiteStore(path, initial=seeded()), SQLiteStore(path)
+    first.read()
+    second.mutate(lambda cluster: cluster.scale_service("backend", 6))
+    # first's cached state is stale: its mutation is retried on the reloaded cluster
+    first.mutate(lambda cluster: cluster.deploy_service("frontend", 2, cpu_request=0.5, memory_request=1.0))
+    cluster = SQLiteStore(path).read()
+    assert len(cluster.services["backend"].pods) == 6 and len(cluster.services["frontend"].pods) == 2
+    assert first.version == second.version == 2
@@ -0,0 +1,33 @@
+from orchestrator import what_if
+from orchestrator.k8s_sim import Cluster
+
+
+def near_saturation() -> Cluster:
+    cluster = Cluster(seed=0)
+    for i in range(8):
+        cluster.add_node(f"node-{i}", cpu_capacity=32.0, memory_capacity=128.0)
+    for name in ("frontend", "backend", "database"):
+        cluster.deploy_service(name, 120, cpu_request=0.5, memory_request=1.0, strategy="spread")
+    # Per-pod load near saturation, so the latency SLAs are broken
+    cluster.request_rates.update({"frontend": 360 * 15.0, "backend": 360 * 14.0})
+    return cluster
+
+
+def test_plan_saturating_nodes_is_not_recommended():
+    cluster = near_saturation()
+    saturating = {"action": "scale_service", "service_name": "backend", "replicas": 140}
+    moderate = {"action": "scale_service", "service_name": "backend", "replicas": 125}
+    result = what_if.evaluate(cluster, [saturating, moderate], workers=1)
+    by_replicas = {entry["candidate"]["replicas"]: entry for entry in result["ranked"]}
+    # Scaling to 140 fixes backend's latency, but only by pushing a node to 100% CPU
+    assert by_replicas[140]["outcome"]["max_node_cpu_pct"] > 80
+    assert by_replicas[140]["outcome"]["node_violations"] > result["baseline"]["node_violations"]
+    assert not by_replicas[140]["improves"]
+    assert result["ranked"][0]["candidate"] == moderate
+
+
+def test_candidates_do_not_touch_the_cluster():
+    cluster = near_saturation()
+    version = cluster.version
+    what_if.evaluate(cluster, [{"action": "scale_service", "service_name": "backend", "replicas": 200}], workers=1)
+    assert cluster.version == version